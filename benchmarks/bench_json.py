@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+JSON codec benchmark for DirectAdmin MCP.
+
+Compares the stdlib codec, orjson and raw passthrough on large synthetic
+payloads shaped like DirectAdmin responses (email logs by default), both on
+the codec alone and through the `api_email_logs` tool (HTTP response to MCP
+result content, with the DirectAdmin server replaced by an in-process transport).
+
+Usage:
+    python benchmarks/bench_json.py --entries 50000 --rounds 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Awaitable, Callable
+
+# Allow running from the repository root without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# da.py reads its settings at import time; the benchmark never connects
+os.environ.setdefault("DA_URL", "http://127.0.0.1:2222")
+os.environ.setdefault("DA_USERNAME", "admin")
+os.environ.setdefault("DA_LOGIN_KEY", "benchmark")
+
+import httpx
+import pydantic_core
+
+import da
+from fake_da import make_email_logs
+
+EMAIL_LOGS_ARGS = {"e_from": "", "e_to": "", "address": "", "domain": "", "state": "", "type": ""}
+
+
+def timed(func: Callable[[], Any], rounds: int) -> float:
+    """Best wall time in milliseconds of `rounds` calls to `func`."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def timed_async(func: Callable[[], Awaitable[Any]], rounds: int) -> float:
+    """Best wall time in milliseconds of `rounds` awaited calls to `func`."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def bench_tool(body: bytes, rounds: int) -> dict:
+    """Time `api_email_logs` through FastMCP with raw passthrough off and on."""
+    import tools
+    from config import settings
+    from mcp_instance import mcp
+
+    tools.load_all_tools()
+    # Serve every DirectAdmin request from memory, the way cassette replay does
+    da.replay_transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, content=body, headers={"Content-Type": "application/json"})
+    )
+    call = lambda: mcp.call_tool("api_email_logs", EMAIL_LOGS_ARGS)
+
+    results = {}
+    try:
+        for label, raw in (("parsed", False), ("passthrough", True)):
+            settings.JSON_RAW_PASSTHROUGH = raw
+            results[f"tool api_email_logs ({label})"] = await timed_async(call, rounds)
+    finally:
+        await da.close_clients()
+    return results
+
+
+def main():
+    """Main entry point for the benchmark."""
+    parser = argparse.ArgumentParser(description="DirectAdmin MCP JSON codec benchmark")
+    parser.add_argument("--entries", "-n", type=int, default=50000, help="Email log entries in the payload")
+    parser.add_argument("--rounds", "-r", type=int, default=5, help="Rounds per measurement (best is reported)")
+    args = parser.parse_args()
+    
+    payload = make_email_logs(args.entries)
+    body = json.dumps(payload).encode()
+    print(f"Payload: {args.entries} entries, {len(body) / 1024 / 1024:.1f} MiB")
+    print(f"orjson available: {da.orjson is not None}")
+    print()
+    
+    # Decode: baseline parsed the body twice (error_data and result)
+    results = {
+        "decode stdlib x2 (before)": timed(lambda: (json.loads(body), json.loads(body)), args.rounds),
+        "decode stdlib x1": timed(lambda: json.loads(body), args.rounds),
+        "decode json_loads": timed(lambda: da.json_loads(body), args.rounds),
+        "encode stdlib": timed(lambda: json.dumps(payload), args.rounds),
+        "encode json_dumps": timed(lambda: da.json_dumps(payload), args.rounds),
+        # What the transport does with a parsed result vs a passed-through one
+        "round trip to transport (before)": timed(
+            lambda: pydantic_core.to_json(
+                {"success": True, "data": json.loads(body)}, fallback=str, indent=2
+            ),
+            args.rounds,
+        ),
+        "round trip to transport (passthrough)": timed(
+            lambda: da.RawJSON('{"success":true,"data":' + body.decode() + "}"),
+            args.rounds,
+        ),
+    }
+    results.update(asyncio.run(bench_tool(body, args.rounds)))
+    
+    width = max(len(name) for name in results)
+    for name, ms in results.items():
+        print(f"{name:<{width}}  {ms:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Fake DirectAdmin API for benchmarks.
+
+A small Starlette application serving canned, DirectAdmin-shaped payloads
+with injectable latency and errors, so the MCP server can be measured
+without a real DirectAdmin installation.
+
+Usage:
+    python benchmarks/fake_da.py --port 2223 --latency 20 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import random
+import time
+from typing import Any, Dict, List
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+
+def make_email_logs(entries: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Generate a synthetic `/api/email-logs` payload.
+
+    Args:
+        entries: Number of log entries
+        seed: Random seed for reproducible payloads
+
+    Returns:
+        List of email log entries
+    """
+    rng = random.Random(seed)
+    states = ["sent", "deferred", "bounced", "rejected"]
+    domains = [f"example{i}.com" for i in range(50)]
+    return [
+        {
+            "id": f"1q{i:08x}-000{rng.randint(0, 9)}",
+            "time": 1700000000 + i * 7,
+            "from": f"user{rng.randint(1, 500)}@{rng.choice(domains)}",
+            "to": f"rcpt{rng.randint(1, 5000)}@{rng.choice(domains)}",
+            "state": rng.choice(states),
+            "type": rng.choice(["incoming", "outgoing"]),
+            "size": rng.randint(500, 5_000_000),
+            "host": f"mx{rng.randint(1, 9)}.{rng.choice(domains)}",
+            "message": "Completed" if rng.random() > 0.1 else "451 Temporary local problem",
+        }
+        for i in range(entries)
+    ]
+
+
+def make_login_history(username: str, entries: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Generate a synthetic login history for one user.
+
+    Args:
+        username: User the events belong to
+        entries: Number of login events
+        seed: Random seed for reproducible payloads
+
+    Returns:
+        List of login events
+    """
+    rng = random.Random(f"{seed}-{username}")
+    now = int(time.time())
+    return [
+        {
+            "username": username,
+            "ip": f"203.0.113.{rng.randint(1, 40)}",
+            "timestamp": now - rng.randint(0, 30 * 86400),
+            "success": rng.random() > 0.2,
+            "method": rng.choice(["password", "login-key", "sso"]),
+        }
+        for _ in range(entries)
+    ]
+
+
+def make_services(count: int = 40) -> Dict[str, Any]:
+    """Generate a synthetic `/api/system-info/services` payload."""
+    return {
+        f"service{i}": {"status": "running", "pid": 1000 + i, "enabled": True}
+        for i in range(count)
+    }
+
+
+def make_processes(count: int = 30) -> List[Dict[str, Any]]:
+    """Generate a synthetic `/api/db-monitor/processes` payload."""
+    queries = [
+        "SELECT * FROM wp_options WHERE autoload = 'yes'",
+        "SELECT ID FROM wp_posts WHERE post_status = 'publish' AND ID IN (1, 2, 3)",
+        "UPDATE wp_options SET option_value = '123' WHERE option_name = 'cron'",
+    ]
+    processes = []
+    for i in range(count):
+        sleeping = random.random() < 0.5
+        processes.append({
+            "Id": 100 + i,
+            "User": f"user{random.randint(1, 5)}_wp",
+            "Host": "localhost",
+            "db": f"user{random.randint(1, 5)}_wp",
+            "Command": "Sleep" if sleeping else "Query",
+            "Time": random.randint(0, 120),
+            "State": "" if sleeping else random.choice(["Sending data", "Locked", "executing"]),
+            "Info": None if sleeping else random.choice(queries),
+        })
+    return processes
+
+
+def make_wordpress_locations(domain: str) -> List[Dict[str, Any]]:
+    """Generate a synthetic `/api/wordpress/locations` payload for one domain."""
+    rng = random.Random(domain)
+    locations = [{"id": f"{rng.getrandbits(32):08x}", "domain": domain, "path": "/public_html/tmp", "wordpress": None}]
+    for position in range(rng.randint(0, 2)):
+        path = "/public_html" if position == 0 else f"/public_html/blog{position}"
+        locations.append({
+            "id": f"{rng.getrandbits(32):08x}",
+            "domain": domain,
+            "path": path,
+            "wordpress": {"version": rng.choice(["6.4.3", "6.5.2", "6.6.1"])},
+        })
+    return locations
+
+
+def make_wordpress_info(location_id: str) -> Dict[str, Any]:
+    """Generate a synthetic `/api/wordpress/locations/{id}/wordpress` payload."""
+    version = random.Random(location_id).choice(["6.4.3", "6.5.2", "6.6.1"])
+    return {"version": version, "updateAvailable": version != "6.6.1"}
+
+
+def make_da_conf(keys: int = 300) -> Dict[str, Dict[str, str]]:
+    """Generate synthetic default, local and active directadmin.conf values."""
+    default = {f"option_{i}": str(i % 7) for i in range(keys)}
+    local = {"option_1": "9", "option_2": "9", "custom_option": "yes"}
+    active = dict(default, **local, option_3="8")
+    return {"default": default, "local": local, "active": active}
+
+
+def make_custombuild_versions() -> Dict[str, Any]:
+    """Generate synthetic CustomBuild versions, custom versions, updates and log listing."""
+    now = int(time.time())
+    return {
+        "versions": {"php": "8.2.20", "apache": "2.4.62", "openssl": "3.0.14", "mariadb": "10.11.8", "exim": "4.98"},
+        "versions_custom": {"php": "8.2.18"},
+        "software": [{"name": name} for name in ("php", "apache", "openssl", "mariadb", "exim", "curl")],
+        "updates": [
+            {"name": "openssl", "current": "3.0.13", "available": "3.0.14"},
+            {"name": "apache", "current": "2.4.61", "available": "2.4.62"},
+            {"name": "php", "current": "8.2.17", "available": "8.2.20"},
+            {"name": "exim", "current": "4.98", "available": "4.98"},
+        ],
+        "logs": [
+            {"name": f"{name}_build_{i}.log", "created": now - 86400 * (i + 1), "modified": now - 86400 * (i + 1) + seconds}
+            for i, (name, seconds) in enumerate([("php", 640), ("php", 700), ("apache", 210), ("openssl", 95)])
+        ],
+    }
+
+
+def make_build_log(name: str, lines: int = 3000) -> List[str]:
+    """Generate a synthetic CustomBuild log; logs of odd-numbered builds contain a failed compile."""
+    software = name.split("_")[0]
+    failed = os.path.splitext(name)[0].endswith(("1", "3", "5", "7", "9"))
+    log = [f"Building {software}...", "checking for gcc... gcc", "checking whether the C compiler works... yes"]
+    for i in range(lines):
+        log.append(f"gcc -O2 -Wno-error -c ext/{software}/src/file{i}.c -o ext/{software}/src/file{i}.o")
+        if failed and i == lines // 2:
+            log.append(f"ext/{software}/src/file{i}.c:42:10: fatal error: libxml/parser.h: No such file or directory")
+            log.append(f"make: *** [Makefile:1234: ext/{software}/src/file{i}.o] Error 1")
+    log.append(f"{software} build failed" if failed else f"{software} installed successfully")
+    return log
+
+
+def make_certificate(common_name: str, days: int) -> str:
+    """
+    Generate a self-signed PEM certificate valid for `days` days.
+
+    Needs `cryptography`; returns an empty string without it.
+    """
+    try:
+        from datetime import datetime, timedelta, timezone
+
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.x509.oid import NameOID
+    except ImportError:
+        return ""
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, common_name)])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=days))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName(common_name)]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    return cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+class FakeDirectAdmin:
+    """Canned DirectAdmin responses with configurable latency and errors."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        users: int = 50,
+        log_entries: int = 5000,
+        history_entries: int = 200,
+        sse_events: int = 200,
+    ):
+        """
+        Initialize the fake API.
+
+        Args:
+            latency_ms: Fixed latency added to every response
+            jitter_ms: Random extra latency (uniform 0..jitter_ms)
+            error_rate: Fraction of requests answered with HTTP 500
+            users: Number of users served by the user endpoints
+            log_entries: Number of entries in `/api/email-logs`
+            history_entries: Number of login events per user
+            sse_events: Number of events sent by SSE endpoints before closing
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.sse_events = sse_events
+        self.history_entries = history_entries
+        self.requests = 0
+
+        self.users = [f"user{i}" for i in range(1, users + 1)]
+        self.email_logs = make_email_logs(log_entries)
+        self.services = make_services()
+        self.clamav: Dict[str, Dict[str, Any]] = {}
+        self.certificate = make_certificate("bench.example.com", days=20)
+        self.da_conf = make_da_conf()
+        self.custombuild = make_custombuild_versions()
+        self.custombuild_options = {"php1_release": "8.2", "php2_release": "no", "webserver": "apache", "mysql_inst": "mariadb"}
+
+    async def delay(self):
+        """Sleep for the configured latency."""
+        latency = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000)
+
+    def should_fail(self) -> bool:
+        """Whether the current request should get an injected error."""
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+    def endpoint(self, payload_factory):
+        """
+        Wrap a payload factory into a Starlette endpoint applying latency and errors.
+
+        Args:
+            payload_factory: Callable taking the request and returning the payload
+
+        Returns:
+            Starlette endpoint
+        """
+        async def handler(request: Request):
+            self.requests += 1
+            await self.delay()
+            if self.should_fail():
+                return JSONResponse({"error": "Injected error"}, status_code=500)
+            return JSONResponse(payload_factory(request))
+        return handler
+
+    def session(self, request: Request) -> Dict[str, Any]:
+        """Session of the Basic auth identity, "admin|user" being a login-as session."""
+        try:
+            username = base64.b64decode(request.headers["Authorization"].split()[-1]).decode().split(":")[0]
+        except (KeyError, ValueError):
+            username = ""
+        real, _, login_as = username.partition("|")
+        return {"username": login_as or real, "loginAs": bool(login_as), "realUsername": real}
+
+    async def sse(self, request: Request):
+        """Stream numbered log lines as Server-Sent Events, then close."""
+        self.requests += 1
+        await self.delay()
+        start = int(request.headers.get("Last-Event-Id") or 0)
+
+        async def events():
+            for i in range(start, self.sse_events):
+                yield f"id: {i + 1}\ndata: line {i + 1} of {self.sse_events}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def custombuild_log_sse(self, request: Request):
+        """Stream a synthetic CustomBuild log as Server-Sent Events, one line per event."""
+        self.requests += 1
+        await self.delay()
+        start = int(request.headers.get("Last-Event-Id") or 0)
+        lines = make_build_log(request.path_params["logname"])
+
+        async def events():
+            for i in range(start, len(lines)):
+                yield f"id: {i + 1}\ndata: {lines[i]}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def clamav_scan(self, request: Request):
+        """Start a fake ClamAV scan finishing after a short random time."""
+        self.requests += 1
+        await self.delay()
+        data = await request.json()
+        pid = str(4000 + len(self.clamav))
+        path = data.get("path", "/home")
+        infected = [f"{path}/public_html/wp-content/uploads/shell{i}.php: Php.Webshell-{i % 2} FOUND" for i in range(random.randint(0, 2))]
+        self.clamav[pid] = {
+            "pid": pid,
+            "path": path,
+            "ends": time.monotonic() + random.uniform(0.2, 1.0),
+            "output": "\n".join(infected + [f"{path}/public_html/wp-content/uploads/shell0.php: Php.Webshell-0 FOUND"] * bool(infected)),
+        }
+        return JSONResponse({"pid": pid})
+
+    async def clamav_list(self, request: Request):
+        """List fake ClamAV scans with their state."""
+        self.requests += 1
+        await self.delay()
+        now = time.monotonic()
+        return JSONResponse([
+            {
+                "pid": scan["pid"],
+                "path": scan["path"],
+                "status": "running" if now < scan["ends"] else "finished",
+                "output": "" if now < scan["ends"] else scan["output"],
+            }
+            for scan in self.clamav.values()
+        ])
+
+    async def da_conf_write(self, request: Request):
+        """Patch or replace the local directadmin.conf; "readonly_*" keys are silently ignored."""
+        self.requests += 1
+        await self.delay()
+        data = (await request.json()).get("data", {})
+        local = dict(self.da_conf["local"]) if request.method == "PATCH" else {}
+        local.update({key: str(value) for key, value in data.items() if not key.startswith("readonly_")})
+        self.da_conf["local"] = local
+        self.da_conf["active"] = dict(self.da_conf["default"], **local)
+        return JSONResponse({"success": True})
+
+    async def custombuild_options_patch(self, request: Request):
+        """Patch CustomBuild options."""
+        self.requests += 1
+        await self.delay()
+        self.custombuild_options.update({key: str(value) for key, value in (await request.json()).items()})
+        return JSONResponse({"success": True})
+
+    def custombuild_validate(self, request: Request) -> Dict[str, Any]:
+        """Validate CustomBuild options: PHP releases must be 7.4 or newer."""
+        errors = [
+            f"{key}: unsupported release {value}"
+            for key, value in self.custombuild_options.items()
+            if key.endswith("_release") and value not in ("no",) and tuple(map(int, value.split("."))) < (7, 4)
+        ]
+        return {"valid": not errors, "errors": errors}
+
+    async def configure(self, request: Request):
+        """Change latency/error injection at runtime (`POST /_bench/config`)."""
+        data = await request.json()
+        for key in ("latency_ms", "jitter_ms", "error_rate"):
+            if key in data:
+                setattr(self, key, float(data[key]))
+        return JSONResponse({
+            "latency_ms": self.latency_ms,
+            "jitter_ms": self.jitter_ms,
+            "error_rate": self.error_rate,
+            "requests": self.requests,
+        })
+
+    def create_app(self) -> Starlette:
+        """Build the Starlette application."""
+        user = lambda request: request.path_params["username"]
+        routes = [
+            Route("/api/version", self.endpoint(lambda r: {"version": "1.680", "channel": "stable"})),
+            Route("/api/info", self.endpoint(lambda r: {"hostname": "bench.example.com", "users": len(self.users)})),
+            Route("/CMD_API_SHOW_ALL_USERS", self.endpoint(lambda r: self.users)),
+            Route("/api/login-history", self.endpoint(
+                lambda r: make_login_history("admin", self.history_entries)
+            )),
+            Route("/api/users/{username}/config", self.endpoint(
+                lambda r: {"username": user(r), "domain": f"{user(r)}.example.com", "package": "default"}
+            )),
+            Route("/api/users/{username}/usage", self.endpoint(
+                lambda r: {"bandwidth": 1024, "quota": 2048, "inode": 5000, "domains": 1}
+            )),
+            Route("/api/users/{username}/login-history", self.endpoint(
+                lambda r: make_login_history(user(r), self.history_entries)
+            )),
+            Route("/api/email-logs", self.endpoint(lambda r: self.email_logs)),
+            Route("/api/system-info/cpu", self.endpoint(
+                lambda r: {"model": "Bench CPU", "cores": 8, "usage": random.uniform(0, 100)}
+            )),
+            Route("/api/system-info/load", self.endpoint(
+                lambda r: {"load1": random.uniform(0, 4), "load5": random.uniform(0, 4), "load15": random.uniform(0, 4)}
+            )),
+            Route("/api/system-info/memory", self.endpoint(
+                lambda r: {"total": 16 * 2**30, "used": random.randint(2**30, 15 * 2**30)}
+            )),
+            Route("/api/system-info/fs", self.endpoint(
+                lambda r: [{"mount": "/", "size": 100 * 2**30, "used": 40 * 2**30}]
+            )),
+            Route("/api/system-info/services", self.endpoint(lambda r: self.services)),
+            Route("/api/system-info/uptime", self.endpoint(lambda r: {"uptime": int(time.monotonic())})),
+            Route("/api/db-monitor/processes", self.endpoint(lambda r: make_processes())),
+            Route("/api/db-monitor/processes/{id}/kill", self.endpoint(lambda r: {"success": True}), methods=["POST"]),
+            Route("/api/wordpress/locations", self.endpoint(
+                lambda r: make_wordpress_locations(r.query_params.get("domain", "example.com"))
+            )),
+            Route("/api/wordpress/locations/{id}/wordpress", self.endpoint(
+                lambda r: make_wordpress_info(r.path_params["id"])
+            )),
+            Route("/api/wordpress/locations/{id}/config", self.endpoint(
+                lambda r: {"dbName": "wp", "dbUser": "wp", "autoUpdateMajor": random.Random(r.path_params["id"]).random() > 0.3}
+            )),
+            Route("/api/wordpress/locations/{id}/config/auto-update", self.endpoint(lambda r: {"success": True}), methods=["PUT"]),
+            Route("/api/wordpress/locations/{id}/options", self.endpoint(lambda r: {"success": True}), methods=["PATCH"]),
+            Route("/api/server-settings/directadmin-conf/local", self.da_conf_write, methods=["PATCH", "PUT"]),
+            Route("/api/custombuild/versions", self.endpoint(lambda r: self.custombuild["versions"])),
+            Route("/api/custombuild/versions-custom", self.endpoint(lambda r: self.custombuild["versions_custom"])),
+            Route("/api/custombuild/software", self.endpoint(lambda r: self.custombuild["software"])),
+            Route("/api/custombuild/updates", self.endpoint(lambda r: self.custombuild["updates"])),
+            Route("/api/custombuild/logs", self.endpoint(lambda r: self.custombuild["logs"])),
+            Route("/api/custombuild/options", self.endpoint(lambda r: self.custombuild_options), methods=["GET"]),
+            Route("/api/custombuild/options", self.custombuild_options_patch, methods=["PATCH"]),
+            Route("/api/custombuild/options/validate", self.endpoint(self.custombuild_validate)),
+            Route("/api/server-settings/directadmin-conf/{kind}", self.endpoint(
+                lambda r: self.da_conf[r.path_params["kind"]]
+            )),
+            Route("/api/server-tls/certificate", self.endpoint(lambda r: {"certificate": self.certificate})),
+            Route("/api/clamav", self.clamav_list, methods=["GET"]),
+            Route("/api/clamav", self.clamav_scan, methods=["POST"]),
+            Route("/api/clamav/{pid}", self.endpoint(lambda r: {"success": True}), methods=["DELETE"]),
+            Route("/api/session", self.endpoint(self.session)),
+            Route("/api/custombuild/state/sse", self.sse),
+            Route("/api/custombuild/logs/{logname}/sse", self.custombuild_log_sse),
+            Route("/_bench/config", self.configure, methods=["POST"]),
+        ]
+        return Starlette(routes=routes)
+
+
+def main():
+    """Run the fake DirectAdmin API standalone."""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake DirectAdmin API for benchmarks")
+    parser.add_argument("--port", "-p", type=int, default=2223, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latency per request in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 500")
+    parser.add_argument("--users", type=int, default=50, help="Number of users")
+    parser.add_argument("--log-entries", type=int, default=5000, help="Entries in /api/email-logs")
+    args = parser.parse_args()
+
+    fake = FakeDirectAdmin(
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        error_rate=args.error_rate,
+        users=args.users,
+        log_entries=args.log_entries,
+    )
+    uvicorn.run(fake.create_app(), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for DirectAdmin MCP.
+
+Starts the fake DirectAdmin API (see fake_da.py) and drives one layer of the
+server against it at a configurable concurrency:
+
+    api    - `call_da_api` directly
+    tools  - the registered tool functions through `mcp.call_tool`
+    sse    - the `/sse` MCP transport of main.py, over one MCP client session
+
+Reports p50/p95/p99 latency, throughput and RSS of the benchmark process
+(which hosts the fake API and the MCP server as well).
+
+Usage:
+    python benchmarks/run.py --layer tools --workload email-logs --requests 500 --concurrency 20
+    python benchmarks/run.py --layer all --workload services --latency 20 --error-rate 0.01 --json
+    python benchmarks/run.py --layer tools --replay da.cassette.gz --latency-scale 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import sys
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+# Allow running from the repository root without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uvicorn
+
+from fake_da import FakeDirectAdmin
+
+# Workload name -> (API path, tool name, tool arguments)
+WORKLOADS: Dict[str, tuple] = {
+    "version": ("/api/version", "api_get_version", {}),
+    "user-usage": ("/api/users/user1/usage", "api_users_username_usage", {"username": "user1"}),
+    "login-history": (
+        "/api/users/user1/login-history",
+        "api_users_username_login_history",
+        {"username": "user1"},
+    ),
+    "email-logs": (
+        "/api/email-logs",
+        "api_email_logs",
+        {"e_from": "", "e_to": "", "address": "", "domain": "", "state": "", "type": ""},
+    ),
+    "services": ("/api/system-info/services", "api_system_info_services", {}),
+    "load": ("/api/system-info/load", "api_system_info_load", {}),
+}
+
+LAYERS = ["api", "tools", "sse"]
+
+
+class ServerThread(threading.Thread):
+    """Run a uvicorn server in a background thread with its own event loop."""
+
+    def __init__(self, app: Any, port: int):
+        super().__init__(daemon=True)
+        self.port = port
+        self.server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+        )
+
+    def run(self):
+        self.server.run()
+
+    def start_and_wait(self, timeout: float = 10.0):
+        """Start the thread and wait until the server accepts connections."""
+        self.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Server on port {self.port} did not start")
+            time.sleep(0.01)
+
+    def stop(self):
+        """Ask the server to exit and wait for the thread."""
+        self.server.should_exit = True
+        self.join(timeout=5)
+
+
+def free_port() -> int:
+    """Find a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def rss_mib() -> Dict[str, float]:
+    """Current and peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+    current = peak
+    try:
+        with open("/proc/self/statm") as statm:
+            current = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        pass
+    return {"rss_mib": round(current, 1), "max_rss_mib": round(peak, 1)}
+
+
+def is_error(result: Any) -> bool:
+    """Whether a call result represents an error."""
+    if isinstance(result, dict):
+        return bool(result.get("error"))
+    return bool(getattr(result, "isError", False))
+
+
+async def drive(
+    call: Callable[[], Awaitable[Any]],
+    total: int,
+    concurrency: int
+) -> Dict[str, Any]:
+    """
+    Run `call` `total` times with at most `concurrency` calls in flight.
+
+    Args:
+        call: Coroutine factory performing one request
+        total: Number of requests
+        concurrency: Number of concurrent workers
+
+    Returns:
+        Latency percentiles, throughput and error count
+    """
+    latencies: List[float] = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                if is_error(await call()):
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        **rss_mib(),
+    }
+
+
+async def bench_api(workload: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Benchmark `call_da_api` directly."""
+    from da import call_da_api
+
+    path = WORKLOADS[workload][0]
+    await drive(lambda: call_da_api(path), args.warmup, args.concurrency)
+    return await drive(lambda: call_da_api(path), args.requests, args.concurrency)
+
+
+async def bench_tools(workload: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Benchmark the tool functions through FastMCP, including result serialization."""
+    import tools
+    from mcp_instance import mcp
+
+    tools.load_all_tools()
+    _, tool, tool_args = WORKLOADS[workload]
+    await drive(lambda: mcp.call_tool(tool, tool_args), args.warmup, args.concurrency)
+    return await drive(lambda: mcp.call_tool(tool, tool_args), args.requests, args.concurrency)
+
+
+# Settings of the background tasks started by main.app's lifespan (0 disables each)
+BACKGROUND_INTERVALS = (
+    "METRICS_SAMPLE_INTERVAL",
+    "SERVICES_WATCH_INTERVAL",
+    "FS_SAMPLE_INTERVAL",
+    "SEARCH_INDEX_REFRESH_INTERVAL",
+    "WP_INVENTORY_REFRESH_INTERVAL",
+    "TLS_WATCH_INTERVAL",
+    "CUSTOMBUILD_LOG_SYNC_INTERVAL",
+)
+
+
+async def bench_sse(workload: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Benchmark the `/sse` transport of main.py over one MCP client session."""
+    from mcp import ClientSession
+    from mcp.client.sse import sse_client
+
+    import main
+
+    server = ServerThread(main.app, free_port())
+    server.start_and_wait()
+    _, tool, tool_args = WORKLOADS[workload]
+    try:
+        async with sse_client(f"http://127.0.0.1:{server.port}/sse") as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                call = lambda: session.call_tool(tool, tool_args)
+                await drive(call, args.warmup, args.concurrency)
+                return await drive(call, args.requests, args.concurrency)
+    finally:
+        server.stop()
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Run the selected layers and workloads."""
+    benches = {"api": bench_api, "tools": bench_tools, "sse": bench_sse}
+    layers = LAYERS if args.layer == "all" else [args.layer]
+    workloads = list(WORKLOADS) if args.workload == "all" else [args.workload]
+
+    results = []
+    for layer in layers:
+        for workload in workloads:
+            result = await benches[layer](workload, args)
+            results.append({"layer": layer, "workload": workload, **result})
+            if not args.json:
+                print(
+                    f"{layer:<6} {workload:<14} {result['throughput_rps']:>9.1f} req/s  "
+                    f"p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  "
+                    f"p99 {result['p99_ms']:>8.2f} ms  errors {result['errors']:>4}  "
+                    f"rss {result['rss_mib']:>7.1f} MiB"
+                )
+    return results
+
+
+def main():
+    """Main entry point for the benchmark."""
+    parser = argparse.ArgumentParser(description="DirectAdmin MCP load benchmark")
+    parser.add_argument("--layer", choices=LAYERS + ["all"], default="all", help="Layer to drive")
+    parser.add_argument("--workload", choices=list(WORKLOADS) + ["all"], default="all", help="Request to send")
+    parser.add_argument("--requests", "-n", type=int, default=200, help="Requests per workload")
+    parser.add_argument("--concurrency", "-c", type=int, default=10, help="Requests in flight")
+    parser.add_argument("--warmup", type=int, default=10, help="Warmup requests (not measured)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake API latency per request in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Fake API random extra latency in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fake API fraction of failing requests")
+    parser.add_argument("--users", type=int, default=50, help="Fake API number of users")
+    parser.add_argument("--log-entries", type=int, default=5000, help="Fake API entries in /api/email-logs")
+    parser.add_argument("--record", help="Record the DirectAdmin calls to this cassette")
+    parser.add_argument("--replay", help="Answer DirectAdmin calls from this cassette instead of the fake API")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Factor for recorded latencies with --replay")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    fake = FakeDirectAdmin(
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        error_rate=args.error_rate,
+        users=args.users,
+        log_entries=args.log_entries,
+    )
+    fake_server = ServerThread(fake.create_app(), free_port())
+    fake_server.start_and_wait()
+
+    # Point the DirectAdmin client at the fake API before it is imported
+    os.environ["DA_URL"] = f"http://127.0.0.1:{fake_server.port}"
+    os.environ.setdefault("DA_USERNAME", "admin")
+    os.environ.setdefault("DA_LOGIN_KEY", "benchmark")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # main.app's lifespan starts the background samplers and watchers; keep them
+    # from adding DirectAdmin traffic to the measured /sse requests
+    for name in BACKGROUND_INTERVALS:
+        os.environ.setdefault(name, "0")
+    if args.record:
+        os.environ["DA_RECORD_CASSETTE"] = args.record
+    if args.replay:
+        os.environ["DA_REPLAY_CASSETTE"] = args.replay
+        os.environ["DA_REPLAY_LATENCY_SCALE"] = str(args.latency_scale)
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        fake_server.stop()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
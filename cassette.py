@@ -0,0 +1,214 @@
+"""
+Recording and replay of DirectAdmin API calls.
+
+A cassette is a gzip compressed JSONL file with one entry per request: method,
+path, query or body, status, response body and elapsed time. Credentials are
+never written and sensitive fields are redacted. The replay transport serves
+a cassette back to httpx with the recorded (or scaled) latency, so the tools
+can be exercised offline with real payload shapes.
+"""
+import asyncio
+import atexit
+import gzip
+import itertools
+import json
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Words of a key (split at separators and camelCase) marking its value as sensitive
+SENSITIVE_WORDS = frozenset({
+    "pass", "passwd", "password", "passwords", "passphrase", "key", "keys", "loginkey", "apikey",
+    "token", "tokens", "secret", "secrets", "hash", "hashes", "cookie", "cookies", "credential", "credentials",
+})
+# Whole keys that are sensitive although none of their words are
+SENSITIVE_KEYS = frozenset({"sid", "sessionid", "session_id", "csrf", "otp", "totp"})
+
+REDACTED = "********"
+
+_KEY_WORD = re.compile(r"[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])")
+# key=value pairs of form encoded or query string bodies
+_FORM_PAIR = re.compile(r"(?P<key>[A-Za-z0-9_.\-\[\]]+)=(?P<value>[^&\s]*)")
+
+
+def _sensitive(key: str) -> bool:
+    if key.lower() in SENSITIVE_KEYS:
+        return True
+    return any(word.lower() in SENSITIVE_WORDS for word in _KEY_WORD.findall(key))
+
+
+def sanitize_text(text: str) -> str:
+    """Copy of a non-JSON body with the values of sensitive `key=value` pairs redacted."""
+    return _FORM_PAIR.sub(
+        lambda match: f"{match['key']}={REDACTED}" if _sensitive(match["key"]) else match.group(),
+        text,
+    )
+
+
+def sanitize(data: Any) -> Any:
+    """
+    Copy of `data` with the values of sensitive keys redacted, at any depth.
+
+    Keys are sensitive when one of their words is (`login_key`, `ssh_keys`,
+    `apiToken`), so `keyword` or `bypass_cache` are kept. The whole value of
+    a sensitive key is redacted, whatever its type.
+
+    Args:
+        data: Parsed JSON data
+
+    Returns:
+        Sanitized copy
+    """
+    if isinstance(data, dict):
+        return {key: REDACTED if _sensitive(str(key)) else sanitize(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [sanitize(item) for item in data]
+    return data
+
+
+def _canonical(data: Any) -> str:
+    """Stable string form of request parameters, used to match requests."""
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), default=str) if data else ""
+
+
+def request_data(request: httpx.Request) -> Any:
+    """Query parameters (GET) or JSON body of a request, as recorded and matched."""
+    if request.method == "GET":
+        return dict(parse_qsl(request.url.query.decode(), keep_blank_values=True))
+    try:
+        return json.loads(request.content) if request.content else None
+    except ValueError:
+        return request.content.decode("utf-8", errors="replace")
+
+
+class CassetteRecorder:
+    """Appends sanitized request/response pairs to a cassette."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.handle = gzip.open(path, "at", encoding="utf-8")
+        atexit.register(self.close)
+        logger.info(f"Recording DirectAdmin calls to {path}")
+
+    def record(self, response: httpx.Response, elapsed: float):
+        """
+        Write one request/response pair.
+
+        Args:
+            response: Read response (with its request)
+            elapsed: Seconds until the response was complete
+        """
+        request = response.request
+        data = request_data(request)
+        content = response.content
+        text = content.decode("utf-8", errors="replace")
+        try:
+            body: Any = sanitize(json.loads(text)) if text else None
+            encoded = True
+        except ValueError:
+            body, encoded = sanitize_text(text), False
+        if isinstance(data, str):
+            data = sanitize_text(data)
+        entry = {
+            "method": request.method,
+            "path": request.url.path,
+            "data": sanitize(data) if data else None,
+            "status": response.status_code,
+            "json": encoded,
+            "body": body,
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "recorded_at": time.time(),
+        }
+        line = json.dumps(entry, separators=(",", ":"), default=str) + "\n"
+        with self.lock:
+            self.handle.write(line)
+            self.handle.flush()
+
+    def close(self):
+        with self.lock:
+            if not self.handle.closed:
+                self.handle.close()
+
+
+def load_cassette(path: str) -> List[Dict[str, Any]]:
+    """
+    All entries of a cassette, in recording order.
+
+    A cassette whose recorder was not closed (e.g. a killed process) ends in
+    an unterminated gzip stream; the entries flushed before are still read.
+    """
+    entries = []
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        try:
+            for line in handle:
+                if line.endswith("\n"):
+                    entries.append(json.loads(line))
+        except EOFError:
+            logger.warning(f"Cassette {path} is truncated, using the {len(entries)} complete entries")
+    return entries
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport serving recorded responses.
+
+    Requests are matched on method, path and parameters, falling back to
+    method and path alone; repeated requests cycle through the responses
+    recorded for them. Unrecorded requests get a 404.
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]], latency_scale: float = 1.0):
+        self.latency_scale = latency_scale
+        exact: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+        loose: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for entry in entries:
+            exact.setdefault((entry["method"], entry["path"], _canonical(entry.get("data"))), []).append(entry)
+            loose.setdefault((entry["method"], entry["path"]), []).append(entry)
+        self.exact = {key: itertools.cycle(values) for key, values in exact.items()}
+        self.loose = {key: itertools.cycle(values) for key, values in loose.items()}
+        self.misses = 0
+
+    @classmethod
+    def from_file(cls, path: str, latency_scale: float = 1.0) -> "ReplayTransport":
+        entries = load_cassette(path)
+        logger.info(f"Replaying {len(entries)} recorded DirectAdmin calls from {path}")
+        return cls(entries, latency_scale)
+
+    def lookup(self, request: httpx.Request) -> Optional[Dict[str, Any]]:
+        """Recorded entry for a request, if any."""
+        method, path = request.method, request.url.path
+        # Recorded parameters were sanitized, so sanitize before matching
+        data = request_data(request)
+        data = sanitize_text(data) if isinstance(data, str) else sanitize(data)
+        entries = self.exact.get((method, path, _canonical(data))) or self.loose.get((method, path))
+        return next(entries) if entries else None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        entry = self.lookup(request)
+        if entry is None:
+            self.misses += 1
+            logger.warning(f"No recorded response for {request.method} {request.url.path}")
+            return httpx.Response(404, json={"error": "No recorded response", "path": request.url.path}, request=request)
+
+        if self.latency_scale > 0:
+            await asyncio.sleep(entry["elapsed_ms"] / 1000 * self.latency_scale)
+        body = entry["body"]
+        if entry.get("json"):
+            content = json.dumps(body).encode() if body is not None else b""
+        else:
+            content = (body or "").encode()
+        content_type = "application/json" if entry.get("json") else "text/plain"
+        return httpx.Response(
+            entry["status"],
+            content=content,
+            headers={"Content-Type": content_type},
+            request=request,
+        )
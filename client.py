@@ -2,204 +2,465 @@
 """
 DirectAdmin MCP Client
 
-A command-line client for interacting with the DirectAdmin MCP server.
+A command-line client for the DirectAdmin MCP server. It speaks the MCP
+protocol over SSE through the MCP client SDK and reuses a single session for
+all tool calls of a run.
 """
 
+import argparse
 import asyncio
 import json
 import logging
 import os
+import statistics
 import sys
-import argparse
-from typing import Dict, Any, List, Optional
-import aiohttp
-import sseclient
+import time
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
 from dotenv import load_dotenv
+from mcp import ClientSession
+from mcp.client.sse import sse_client
 
 # Load .env file
 load_dotenv()
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO,
+    level=logging.WARNING,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     handlers=[logging.StreamHandler()]
 )
 logger = logging.getLogger("directadmin-mcp-client")
 
+
+def _http_error(error: BaseException) -> Optional[httpx.HTTPError]:
+    """The first httpx error in `error` or the exception groups it is nested in."""
+    if isinstance(error, httpx.HTTPError):
+        return error
+    if isinstance(error, BaseExceptionGroup):
+        for inner in error.exceptions:
+            found = _http_error(inner)
+            if found is not None:
+                return found
+    return None
+
+
 class DirectAdminMCPClient:
-    """Client for the DirectAdmin MCP Server."""
-    
+    """
+    Client for the DirectAdmin MCP Server.
+
+    Use it as an async context manager: the MCP session is opened once on
+    entry and shared by all calls, including concurrent ones.
+    """
+
     def __init__(
-        self, 
-        server_url: str = None, 
-        api_key: str = None,
+        self,
+        server_url: Optional[str] = None,
+        api_key: Optional[str] = None,
         timeout: int = 60,
         verify_ssl: bool = True
     ):
         """
         Initialize the MCP client.
-        
+
         Args:
             server_url: MCP server URL (default: from environment variable)
-            api_key: API key for authentication (default: from environment variable)
+            api_key: Bearer token for authentication (default: from environment variable)
             timeout: Request timeout in seconds
             verify_ssl: Whether to verify SSL certificates
         """
-        self.server_url = server_url or os.environ.get("MCP_SERVER_URL", "http://localhost:8888")
+        self.server_url = (server_url or os.environ.get("MCP_SERVER_URL", "http://localhost:8888")).rstrip("/")
         self.api_key = api_key or os.environ.get("MCP_API_KEY", "")
         self.timeout = timeout
         self.verify_ssl = verify_ssl
-        
-        # Strip trailing slash from server URL
-        self.server_url = self.server_url.rstrip("/")
-        
-        # Setup headers
-        self.headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        }
+
+        self.headers = {}
         if self.api_key:
             self.headers["Authorization"] = f"Bearer {self.api_key}"
-            
+
+        self.session: Optional[ClientSession] = None
+        self._stack: Optional[AsyncExitStack] = None
+
         logger.info(f"Initialized client for server: {self.server_url}")
-    
+
+    def _http_client(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[httpx.Timeout] = None,
+        auth: Optional[httpx.Auth] = None
+    ) -> httpx.AsyncClient:
+        """HTTP client honouring the SSL verification setting (also used by the SSE transport)."""
+        return httpx.AsyncClient(
+            headers=headers,
+            timeout=timeout or httpx.Timeout(self.timeout),
+            auth=auth,
+            verify=self.verify_ssl,
+            follow_redirects=True,
+        )
+
+    async def __aenter__(self) -> "DirectAdminMCPClient":
+        self._stack = AsyncExitStack()
+        try:
+            read, write = await self._stack.enter_async_context(sse_client(
+                f"{self.server_url}/sse",
+                headers=self.headers,
+                timeout=self.timeout,
+                httpx_client_factory=self._http_client,
+            ))
+            self.session = await self._stack.enter_async_context(ClientSession(read, write))
+            await self.session.initialize()
+        except BaseException as e:
+            await self._stack.aclose()
+            # sse_client raises HTTP errors (e.g. 401 for a bad token) inside its task group's ExceptionGroup
+            error = _http_error(e)
+            if error is not None and error is not e:
+                raise error from e
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.session = None
+        await self._stack.aclose()
+
+    async def _get(self, path: str) -> Dict[str, Any]:
+        async with self._http_client(headers=self.headers) as client:
+            response = await client.get(f"{self.server_url}{path}")
+            response.raise_for_status()
+            return response.json()
+
     async def check_server_health(self) -> Dict[str, Any]:
         """
         Check if the MCP server is healthy.
-        
+
         Returns:
             Health check information
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            try:
-                async with session.get(
-                    f"{self.server_url}/health",
-                    timeout=self.timeout,
-                    ssl=self.verify_ssl
-                ) as response:
-                    response.raise_for_status()
-                    return await response.json()
-            except aiohttp.ClientError as e:
-                logger.error(f"Health check failed: {str(e)}")
-                return {"status": "unhealthy", "error": str(e)}
-    
+        try:
+            return await self._get("/health")
+        except httpx.HTTPError as e:
+            logger.error(f"Health check failed: {str(e)}")
+            return {"status": "unhealthy", "error": str(e)}
+
     async def get_server_info(self) -> Dict[str, Any]:
         """
         Get information about the MCP server.
-        
+
         Returns:
             Server information
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            try:
-                async with session.get(
-                    f"{self.server_url}/about",
-                    timeout=self.timeout,
-                    ssl=self.verify_ssl
-                ) as response:
-                    response.raise_for_status()
-                    return await response.json()
-            except aiohttp.ClientError as e:
-                logger.error(f"Failed to get server info: {str(e)}")
-                return {"error": str(e)}
-    
-    async def connect_sse(self, message: str) -> None:
+        try:
+            return await self._get("/about")
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to get server info: {str(e)}")
+            return {"error": str(e)}
+
+    async def list_tools(self) -> List[Dict[str, Any]]:
         """
-        Connect to the SSE endpoint and process events.
-        
+        List the tools of the server.
+
+        Returns:
+            Tools with name, description and input schema
+        """
+        tools = []
+        cursor = None
+        while True:
+            result = await self.session.list_tools(cursor=cursor)
+            tools.extend(
+                {"name": tool.name, "description": tool.description, "input_schema": tool.inputSchema}
+                for tool in result.tools
+            )
+            cursor = result.nextCursor
+            if not cursor:
+                return tools
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Call a tool over the shared session.
+
         Args:
-            message: Message to send to the MCP server
+            name: Tool name
+            arguments: Tool arguments
+
+        Returns:
+            `ok` and the tool result, parsed from JSON when possible
         """
-        url = f"{self.server_url}/sse"
-        
-        # Initial data
-        initial_data = {
-            "message": {
-                "role": "user",
-                "content": message
-            }
-        }
-        
-        # Headers for SSE connection
-        headers = {
-            "Accept": "text/event-stream",
-            "Content-Type": "application/json",
-        }
-        if self.api_key:
-            headers["Authorization"] = f"Bearer {self.api_key}"
-        
+        result = await self.session.call_tool(name, arguments or {})
+        texts = [item.text for item in result.content if getattr(item, "type", None) == "text"]
+        if result.structuredContent is not None:
+            data = result.structuredContent.get("result", result.structuredContent)
+        elif len(texts) == 1:
+            try:
+                data = json.loads(texts[0])
+            except json.JSONDecodeError:
+                data = texts[0]
+        else:
+            data = texts
+        ok = not result.isError and not (isinstance(data, dict) and data.get("error"))
+        return {"ok": ok, "result": data}
+
+
+def parse_tool_args(values: List[str]) -> Dict[str, Any]:
+    """
+    Tool arguments from the command line.
+
+    Either a single JSON object, or `key=value` pairs whose values are parsed
+    as JSON when possible (`limit=10`, `refresh=true`) and kept as strings
+    otherwise.
+    """
+    if len(values) == 1 and values[0].lstrip().startswith("{"):
+        return json.loads(values[0])
+    arguments = {}
+    for value in values:
+        key, sep, raw = value.partition("=")
+        if not sep:
+            raise ValueError(f"Expected key=value, got: {value}")
         try:
-            # Initialize session and post initial message
-            async with aiohttp.ClientSession() as session:
-                # Convert data to JSON
-                json_data = json.dumps(initial_data)
-                
-                # Initial POST request
-                async with session.post(
-                    url, 
-                    data=json_data,
-                    headers=headers,
-                    timeout=self.timeout,
-                    ssl=self.verify_ssl
-                ) as response:
-                    response.raise_for_status()
-                    
-                    # Process SSE events
-                    client = sseclient.SSEClient(response.content)
-                    
-                    # Process events
-                    for event in client.events():
-                        if event.event == "message":
-                            try:
-                                data = json.loads(event.data)
-                                if "message" in data:
-                                    if data["message"]["role"] == "assistant":
-                                        print(f"\nASSISTANT: {data['message']['content']}")
-                                elif "error" in data:
-                                    print(f"\nERROR: {data['error']}")
-                            except json.JSONDecodeError:
-                                print(f"\nRaw event data: {event.data}")
-                        elif event.event == "context":
-                            try:
-                                data = json.loads(event.data)
-                                # Process context data
-                                if data.get("items"):
-                                    print("\nContext items received:")
-                                    for item in data["items"]:
-                                        print(f"  - Type: {item.get('type', 'unknown')}")
-                            except json.JSONDecodeError:
-                                print(f"\nRaw context data: {event.data}")
-                        elif event.event == "done":
-                            print("\nConversation complete")
-                            break
-                        else:
-                            print(f"\nEvent: {event.event}, Data: {event.data}")
-        
-        except aiohttp.ClientError as e:
-            logger.error(f"SSE connection error: {str(e)}")
-            print(f"\nError connecting to MCP server: {str(e)}")
-        except KeyboardInterrupt:
-            print("\nConnection closed by user")
+            arguments[key] = json.loads(raw)
+        except json.JSONDecodeError:
+            arguments[key] = raw
+    return arguments
+
+
+def latency_summary(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    """Latency percentiles (ms) and throughput of a load run."""
+    ordered = sorted(latencies)
+
+    def percentile(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 2) if ordered else 0.0
+
+    return {
+        "calls": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "calls_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "min_ms": round(ordered[0], 2) if ordered else 0.0,
+        "mean_ms": round(statistics.fmean(ordered), 2) if ordered else 0.0,
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+    }
+
+
+async def run_load(
+    client: DirectAdminMCPClient,
+    name: str,
+    arguments: Dict[str, Any],
+    repeat: int,
+    concurrency: int
+) -> Dict[str, Any]:
+    """
+    Call a tool `repeat` times with at most `concurrency` calls in flight.
+
+    Returns:
+        Latency summary and the first error, if any
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result = await client.call_tool(name, arguments)
+                if not result["ok"]:
+                    errors.append(json.dumps(result["result"], default=str)[:200])
+            except Exception as e:
+                errors.append(str(e))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(repeat)))
+    summary = latency_summary(latencies, len(errors), time.perf_counter() - started)
+    summary.update(tool=name, concurrency=concurrency)
+    if errors:
+        summary["first_error"] = errors[0]
+    return summary
+
+
+async def run_bulk(
+    client: DirectAdminMCPClient,
+    lines: AsyncIterator[str],
+    write: Callable[[str], None],
+    parallel: int,
+    ordered: bool = True
+) -> Dict[str, Any]:
+    """
+    Execute JSONL tool calls over the shared session.
+
+    Every input line is a `{"tool": ..., "args": {...}}` object, optionally
+    with an `id` that is copied to its result. Results are written as JSONL
+    in input order, or as soon as they complete. Input is read only as fast as
+    results are written, so memory stays bounded for any number of calls.
+
+    Args:
+        client: Connected client
+        lines: Input lines
+        write: Called with every output line
+        parallel: Calls in flight at once
+        ordered: Write results in input order instead of as they complete
+
+    Returns:
+        Latency and throughput summary of the executed calls, with the
+        number of input lines that were not valid calls
+    """
+    parallel = max(1, parallel)
+    # Lines read but not written yet; bounds the reorder buffer behind a slow call
+    window = asyncio.Semaphore(parallel * 4)
+    calls: "asyncio.Queue[Optional[tuple]]" = asyncio.Queue(maxsize=parallel)
+    pending: Dict[int, Dict[str, Any]] = {}
+    next_index = 0
+    latencies: List[float] = []
+    errors = 0
+    invalid = 0
+
+    def emit(item: Dict[str, Any]):
+        nonlocal next_index
+        pending[item["index"]] = item
+        while (next_index if ordered else item["index"]) in pending:
+            index = next_index if ordered else item["index"]
+            write(json.dumps(pending.pop(index), default=str))
+            window.release()
+            if not ordered:
+                break
+            next_index += 1
+
+    async def execute(index: int, line: str) -> Dict[str, Any]:
+        nonlocal errors, invalid
+        item: Dict[str, Any] = {"index": index}
+        try:
+            call = json.loads(line)
+            if not isinstance(call, dict) or not call.get("tool"):
+                raise ValueError("expected {\"tool\": ..., \"args\": {...}}")
+        except ValueError as e:
+            invalid += 1
+            item.update(ok=False, error=f"Invalid call: {str(e)}")
+            return item
+        if "id" in call:
+            item["id"] = call["id"]
+        item["tool"] = call["tool"]
+        start = time.perf_counter()
+        try:
+            item.update(await client.call_tool(call["tool"], call.get("args") or {}))
         except Exception as e:
-            logger.error(f"Unexpected error: {str(e)}", exc_info=True)
-            print(f"\nUnexpected error: {str(e)}")
+            item.update(ok=False, error=str(e))
+        item["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        latencies.append(item["elapsed_ms"])
+        errors += not item["ok"]
+        return item
+
+    async def worker():
+        while (call := await calls.get()) is not None:
+            emit(await execute(*call))
+
+    async def reader():
+        index = 0
+        async for line in lines:
+            if not line.strip():
+                continue
+            await window.acquire()
+            await calls.put((index, line))
+            index += 1
+        for _ in range(parallel):
+            await calls.put(None)
+
+    started = time.perf_counter()
+    await asyncio.gather(reader(), *(worker() for _ in range(parallel)))
+    summary = latency_summary(latencies, errors, time.perf_counter() - started)
+    summary.update(invalid=invalid, parallel=parallel)
+    return summary
+
+
+async def stdin_lines() -> AsyncIterator[str]:
+    """Lines of stdin, read without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    while line := await loop.run_in_executor(None, sys.stdin.readline):
+        yield line
+
+
+def print_result(data: Any, as_json: bool):
+    """Print a result as compact JSON (--json) or indented for reading."""
+    print(json.dumps(data, default=str) if as_json else json.dumps(data, indent=2, default=str))
+
+
+async def run_command(args: argparse.Namespace, client: DirectAdminMCPClient, parser: argparse.ArgumentParser) -> int:
+    """Run the command selected on the command line and return the exit code."""
+    if args.health:
+        print_result(await client.check_server_health(), args.json)
+    elif args.info:
+        print_result(await client.get_server_info(), args.json)
+    elif args.command == "tools":
+        async with client:
+            tools = await client.list_tools()
+        if args.json:
+            print_result(tools, True)
+        else:
+            for tool in tools:
+                summary = (tool["description"] or "").strip().splitlines()
+                print(f"{tool['name']:<45} {summary[0] if summary else ''}")
+    elif args.command == "call":
+        try:
+            arguments = parse_tool_args(args.args)
+        except ValueError as e:
+            parser.error(str(e))
+        async with client:
+            if args.repeat > 1:
+                summary = await run_load(client, args.tool, arguments, args.repeat, args.concurrency)
+                print_result(summary, args.json)
+                return 1 if summary["errors"] else 0
+            result = await client.call_tool(args.tool, arguments)
+        print_result(result["result"], args.json)
+        return 0 if result["ok"] else 1
+    elif args.command == "bulk":
+        async with client:
+            summary = await run_bulk(
+                client,
+                stdin_lines(),
+                lambda line: print(line, flush=True),
+                args.parallel,
+                ordered=not args.as_completed,
+            )
+        if not args.quiet:
+            print(json.dumps(summary), file=sys.stderr)
+        return 1 if summary["errors"] or summary["invalid"] else 0
+    else:
+        parser.print_help()
+    return 0
+
 
 async def main():
     """Main entry point for the client."""
     parser = argparse.ArgumentParser(description="DirectAdmin MCP Client")
-    
+    # --json is accepted before and after the subcommand
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--json", action="store_true", default=argparse.SUPPRESS, help="Print compact JSON (one document per line)")
+
     # Add arguments
     parser.add_argument("--server", "-s", help="MCP server URL")
-    parser.add_argument("--key", "-k", help="API key for authentication")
+    parser.add_argument("--key", "-k", help="Bearer token for authentication")
     parser.add_argument("--no-verify", action="store_true", help="Disable SSL verification")
     parser.add_argument("--timeout", "-t", type=int, default=60, help="Request timeout in seconds")
+    parser.add_argument("--json", action="store_true", help="Print compact JSON (one document per line)")
     parser.add_argument("--info", "-i", action="store_true", help="Get server info")
     parser.add_argument("--health", action="store_true", help="Check server health")
-    parser.add_argument("message", nargs="?", help="Message to send to MCP server")
-    
+
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("tools", parents=[output], help="List the tools of the server")
+    call = commands.add_parser("call", parents=[output], help="Call a tool")
+    call.add_argument("tool", help="Tool name")
+    call.add_argument("args", nargs="*", help="Arguments as one JSON object or key=value pairs")
+    call.add_argument("--repeat", "-n", type=int, default=1, help="Call the tool this many times and report latencies")
+    call.add_argument("--concurrency", "-c", type=int, default=1, help="Calls in flight at once with --repeat")
+    bulk = commands.add_parser("bulk", help="Execute JSONL {tool, args} calls from stdin, writing JSONL results")
+    bulk.add_argument("--parallel", "-p", type=int, default=8, help="Calls in flight at once")
+    bulk.add_argument("--as-completed", action="store_true", help="Write results as they complete instead of in input order")
+    bulk.add_argument("--quiet", "-q", action="store_true", help="Do not print the summary to stderr")
+
     args = parser.parse_args()
-    
+
     # Create client
     client = DirectAdminMCPClient(
         server_url=args.server,
@@ -207,39 +468,14 @@ async def main():
         timeout=args.timeout,
         verify_ssl=not args.no_verify
     )
-    
-    # Check what operation to perform
-    if args.health:
-        # Health check
-        health = await client.check_server_health()
-        print(json.dumps(health, indent=2))
-    elif args.info:
-        # Get server info
-        info = await client.get_server_info()
-        print(json.dumps(info, indent=2))
-    elif args.message:
-        # Connect to SSE and send message
-        await client.connect_sse(args.message)
-    else:
-        # Interactive mode
-        print("DirectAdmin MCP Client (Interactive Mode)")
-        print("Enter 'exit' or 'quit' to exit")
-        print("=" * 60)
-        
-        while True:
-            try:
-                message = input("\nYou: ")
-                if message.lower() in ["exit", "quit"]:
-                    break
-                
-                if message.strip():
-                    await client.connect_sse(message)
-            except KeyboardInterrupt:
-                print("\nExiting...")
-                break
-            except Exception as e:
-                logger.error(f"Error: {str(e)}", exc_info=True)
-                print(f"\nError: {str(e)}")
+
+    try:
+        return await run_command(args, client, parser)
+    except httpx.HTTPStatusError as e:
+        print(f"Connection to {client.server_url} failed: {e.response.status_code} {e.response.reason_phrase}", file=sys.stderr)
+    except httpx.HTTPError as e:
+        print(f"Connection to {client.server_url} failed: {str(e) or type(e).__name__}", file=sys.stderr)
+    return 1
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    sys.exit(asyncio.run(main()))
@@ -2,15 +2,74 @@
 DirectAdmin API client with improved error handling and logging.
 """
 import os
+import asyncio
 import httpx
 import base64
 import logging
-from typing import Dict, Any, Optional, Union
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, Any, Iterator, List, Optional, Tuple, Union
 import json
+from cassette import CassetteRecorder, ReplayTransport
 from config import settings
+from tracing import CLIENT, httpx_trace_hook, record_phases, tracer
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib codec
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+class RawJSON(str):
+    """
+    A JSON document kept in its serialized form.
+    
+    Returned for requests made with `raw=True` when raw passthrough is enabled,
+    so responses that are sent to the transport unchanged are never parsed and
+    re-serialized.
+    """
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """
+    Parse a JSON document, using orjson when available.
+    
+    Args:
+        data: JSON document as bytes or string
+        
+    Returns:
+        Parsed data
+    """
+    if isinstance(data, RawJSON):
+        # orjson only accepts exact str instances
+        data = str(data)
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(data: Any) -> str:
+    """
+    Serialize data to a compact JSON string, using orjson when available.
+    
+    Values that are not JSON serializable are converted with `str()`.
+    
+    Args:
+        data: Data to serialize
+        
+    Returns:
+        JSON document
+    """
+    if isinstance(data, RawJSON):
+        return data
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, default=str, separators=(",", ":"))
+
+
 class DirectAdminError(Exception):
     """Custom exception for DirectAdmin API errors."""
     def __init__(self, message: str, status_code: Optional[int] = None, response_data: Optional[Any] = None):
@@ -44,14 +103,65 @@ class DirectAdminClient:
             "Content-Type": "application/json",
         }
         
+        # Pooled HTTP client, created on first use in the running event loop
+        self._http: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Requests in flight, and whether to close the pool once there are none
+        self.active = 0
+        self.last_used = time.monotonic()
+        self._closing = False
+        
         logger.debug(f"DirectAdmin client initialized for {self.base_url} with user {self.username}")
     
+    def _http_client(self) -> httpx.AsyncClient:
+        """
+        HTTP client with a connection pool for this identity.
+        
+        Connections are kept alive between calls; a new pool is created when
+        the event loop changed, since connections are bound to their loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http.is_closed or self._loop is not loop:
+            self._http = httpx.AsyncClient(
+                follow_redirects=False,
+                verify=self.verify_ssl,
+                transport=replay_transport,
+                limits=httpx.Limits(
+                    max_connections=settings.DA_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.DA_MAX_CONNECTIONS,
+                ),
+            )
+            self._loop = loop
+        return self._http
+    
+    async def aclose(self):
+        """Close the pooled connections of this client."""
+        if self._http is not None and self._loop is asyncio.get_running_loop():
+            await self._http.aclose()
+        self._http = None
+    
+    def close_when_idle(self):
+        """Close the pooled connections once the requests in flight are done."""
+        self._closing = True
+        if not self.active and self._http is not None:
+            if self._loop.is_running():
+                self._loop.create_task(self.aclose())
+            else:
+                self._http = None
+    
+    async def _release(self):
+        self.active -= 1
+        self.last_used = time.monotonic()
+        if self._closing and not self.active:
+            await self.aclose()
+    
     async def call_api(
         self, 
         path: str, 
         method: str = "GET", 
         data: Optional[Dict[str, Any]] = None,
-        timeout: int = 30
+        timeout: int = 30,
+        raw: bool = False
     ) -> Dict[str, Any]:
         """
         Make a request to the DirectAdmin API with improved logging and error handling.
@@ -61,9 +171,10 @@ class DirectAdminClient:
             method: HTTP method (GET, POST, PUT, DELETE, PATCH)
             data: Request data/parameters
             timeout: Request timeout in seconds
+            raw: Return a successful response as RawJSON without parsing it
             
         Returns:
-            Response data as dictionary
+            Response data as dictionary, or as RawJSON with `raw`
             
         Raises:
             DirectAdminError: On API errors or unexpected responses
@@ -84,47 +195,59 @@ class DirectAdminClient:
         
         logger.debug(f"API Request: {method} {url} - Data: {log_data}")
         
+        error_data = None
+        span, token = tracer.start_span(
+            f"DirectAdmin {method} {path.split('?', 1)[0]}",
+            kind=CLIENT,
+            attributes={"http.request.method": method, "url.path": path, "directadmin.user": self.username},
+        )
+        self.active += 1
         try:
-            async with httpx.AsyncClient(
-                follow_redirects=False, 
-                verify=self.verify_ssl,
-                timeout=timeout
-            ) as client:
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    headers=self.headers,
-                    params=data if method == "GET" else None,
-                    json=data if method != "GET" else None,
+            started = time.perf_counter()
+            response = await self._http_client().request(
+                method=method,
+                url=url,
+                headers=self.headers,
+                params=data if method == "GET" else None,
+                json=data if method != "GET" else None,
+                timeout=timeout,
+                extensions={"trace": httpx_trace_hook(span)} if span.recording else None,
+            )
+            span.set_attribute("http.response.status_code", response.status_code)
+            if recorder is not None:
+                recorder.record(response, time.perf_counter() - started)
+            
+            # Check for redirects (often auth issues)
+            if response.status_code == 302:
+                location = response.headers.get('location', 'unknown')
+                logger.error(f"API redirect detected: {url} -> {location}")
+                raise DirectAdminError(
+                    f"Redirected! Likely auth issue or HTTP/HTTPS mismatch. Location: {location}",
+                    status_code=302
                 )
-                
-                # Check for redirects (often auth issues)
-                if response.status_code == 302:
-                    location = response.headers.get('location', 'unknown')
-                    logger.error(f"API redirect detected: {url} -> {location}")
-                    raise DirectAdminError(
-                        f"Redirected! Likely auth issue or HTTP/HTTPS mismatch. Location: {location}",
-                        status_code=302
-                    )
-                
+            
+            if response.is_error:
                 # Try to get JSON response for better error messages
-                error_data = None
                 try:
-                    error_data = response.json()
+                    error_data = json_loads(response.content)
                 except Exception:
                     if response.content:
                         error_data = response.text[:200]  # Truncate long error messages
                 
                 # Raise exception for error status codes
                 response.raise_for_status()
-                
-                # Parse JSON response
-                result = response.json()
-                logger.debug(f"API Response: {method} {url} - Status: {response.status_code}")
-                return result
-                
+            
+            # Parse JSON response once, or pass it through untouched
+            if raw and response.content:
+                result = RawJSON(response.text)
+            else:
+                result = json_loads(response.content)
+            logger.debug(f"API Response: {method} {url} - Status: {response.status_code}")
+            return result
+            
         except httpx.HTTPStatusError as e:
             logger.error(f"API HTTP error: {method} {url} - Status: {e.response.status_code} - {str(e)}")
+            span.record_exception(e)
             raise DirectAdminError(
                 f"API error: {str(e)}",
                 status_code=e.response.status_code,
@@ -132,18 +255,239 @@ class DirectAdminClient:
             )
         except httpx.RequestError as e:
             logger.error(f"API request error: {method} {url} - {str(e)}")
+            span.record_exception(e)
             raise DirectAdminError(f"Request error: {str(e)}")
         except Exception as e:
             logger.error(f"API unexpected error: {method} {url} - {str(e)}")
+            span.record_exception(e)
             raise DirectAdminError(f"Unexpected error: {str(e)}")
+        finally:
+            record_phases(span)
+            tracer.end_span(span, token)
+            await self._release()
 
 
+    async def stream_sse(
+        self,
+        path: str,
+        last_event_id: Optional[str] = None,
+        idle_timeout: Optional[float] = None,
+        timeout: int = 30
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream Server-Sent Events from a DirectAdmin endpoint.
+        
+        Args:
+            path: API endpoint path (without base URL)
+            last_event_id: Resume after this event ID (sent as Last-Event-Id)
+            idle_timeout: Stop when no event arrives for this many seconds
+                (for streams that stay open after their last event)
+            timeout: Connect timeout in seconds
+            
+        Yields:
+            Events as {"id", "event", "data"}; multi-line data is joined with newlines
+            
+        Raises:
+            DirectAdminError: On API errors
+        """
+        url = f"{self.base_url}{path}"
+        headers = dict(self.headers, Accept="text/event-stream")
+        if last_event_id:
+            headers["Last-Event-Id"] = str(last_event_id)
+        
+        logger.debug(f"API SSE Request: GET {url} - Last-Event-Id: {last_event_id}")
+        
+        self.active += 1
+        try:
+            async with self._http_client().stream(
+                "GET", url, headers=headers, timeout=httpx.Timeout(timeout, read=None)
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
+                
+                lines = response.aiter_lines()
+                event: Dict[str, Any] = {"id": None, "event": "message", "data": []}
+                while True:
+                    try:
+                        line = await asyncio.wait_for(lines.__anext__(), idle_timeout)
+                    except (StopAsyncIteration, asyncio.TimeoutError):
+                        break
+                    
+                    if not line:
+                        if event["data"]:
+                            yield dict(event, data="\n".join(event["data"]))
+                        event = {"id": event["id"], "event": "message", "data": []}
+                        continue
+                    if line.startswith(":"):
+                        continue
+                    field, _, value = line.partition(":")
+                    value = value[1:] if value.startswith(" ") else value
+                    if field == "data":
+                        event["data"].append(value)
+                    elif field in ("id", "event"):
+                        event[field] = value
+                
+                if event["data"]:
+                    yield dict(event, data="\n".join(event["data"]))
+                    
+        except httpx.HTTPStatusError as e:
+            logger.error(f"API SSE HTTP error: GET {url} - Status: {e.response.status_code} - {str(e)}")
+            raise DirectAdminError(f"API error: {str(e)}", status_code=e.response.status_code)
+        except httpx.RequestError as e:
+            logger.error(f"API SSE request error: GET {url} - {str(e)}")
+            raise DirectAdminError(f"Request error: {str(e)}")
+        finally:
+            await self._release()
+
+
+# Cassette recording of call_api traffic, and replay instead of a real server
+recorder = CassetteRecorder(settings.DA_RECORD_CASSETTE) if settings.DA_RECORD_CASSETTE else None
+replay_transport = (
+    ReplayTransport.from_file(settings.DA_REPLAY_CASSETTE, settings.DA_REPLAY_LATENCY_SCALE)
+    if settings.DA_REPLAY_CASSETTE else None
+)
+
 # Create a default client instance
 client = DirectAdminClient()
 
+# DirectAdmin user the current call acts as (login-as); None for the session's own account
+identity: ContextVar[Optional[str]] = ContextVar("identity", default=None)
+
+# DirectAdmin (username, login key) of the current MCP session; None for the configured account
+credentials: ContextVar[Optional[Tuple[str, str]]] = ContextVar("credentials", default=None)
+
+
+class ClientPool:
+    """
+    Clients by credentials, least recently used first.
+    
+    Clients beyond `max_size`, or unused for `idle_timeout` seconds, are
+    dropped and their connections closed once their requests are done.
+    """
+    
+    def __init__(self, max_size: int, idle_timeout: float):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.clients: "OrderedDict[Tuple[str, str], DirectAdminClient]" = OrderedDict()
+    
+    def get(self, username: str, login_key: str) -> DirectAdminClient:
+        """Client for the credentials, created on first use."""
+        key = (username, login_key)
+        pooled = self.clients.pop(key, None)
+        if pooled is None:
+            pooled = DirectAdminClient(
+                base_url=client.base_url,
+                username=username,
+                login_key=login_key,
+                verify_ssl=client.verify_ssl,
+            )
+        pooled.last_used = time.monotonic()
+        self.clients[key] = pooled
+        self.evict()
+        return pooled
+    
+    def evict(self):
+        """Drop clients over the size limit and idle clients."""
+        now = time.monotonic()
+        while self.clients:
+            key, oldest = next(iter(self.clients.items()))
+            if len(self.clients) <= self.max_size and (oldest.active or now - oldest.last_used < self.idle_timeout):
+                break
+            del self.clients[key]
+            oldest.close_when_idle()
+            logger.debug(f"Evicted DirectAdmin client for {oldest.username}")
+    
+    async def aclose(self):
+        """Close all pooled clients."""
+        for pooled in self.clients.values():
+            await pooled.aclose()
+        self.clients.clear()
+
+
+pool = ClientPool(settings.DA_CLIENT_POOL_SIZE, settings.DA_CLIENT_IDLE_TIMEOUT)
+
+
+def get_client(user: Optional[str] = None) -> DirectAdminClient:
+    """
+    Client for the current MCP session's credentials, acting as `user`.
+    
+    Sessions without their own credentials use the configured account.
+    Impersonation uses DirectAdmin's "admin|user" login-as authentication, so
+    every identity is a separate stateless client with its own connection pool
+    and calls as different users never share a server-side session.
+    
+    Args:
+        user: Username to act as (None or the session's own username for no login-as)
+        
+    Returns:
+        DirectAdmin client
+    """
+    username, login_key = credentials.get() or (client.username, client.login_key)
+    if user and user != username:
+        username = f"{username}|{user}"
+    if username == client.username and login_key == client.login_key:
+        return client
+    return pool.get(username, login_key)
+
+
+@contextmanager
+def login_as(user: Optional[str]) -> Iterator[None]:
+    """Make `call_da_api` and `stream_da_sse` act as `user` inside the block."""
+    token = identity.set(user)
+    try:
+        yield
+    finally:
+        identity.reset(token)
+
+
+# Clients created outside the pool (peer servers), closed with the others
+_standalone_clients: List[DirectAdminClient] = []
+
+
+def register_client(standalone: DirectAdminClient) -> DirectAdminClient:
+    """Have `close_clients()` close a client that was created outside the pool."""
+    _standalone_clients.append(standalone)
+    return standalone
+
+
+async def close_clients():
+    """Close the connection pools of all clients."""
+    await pool.aclose()
+    await client.aclose()
+    for standalone in _standalone_clients:
+        await standalone.aclose()
+    if recorder is not None:
+        recorder.close()
+
+
 # Backwards compatible function for existing code
-async def call_da_api(path: str, method: str = "GET", data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+async def call_da_api(
+    path: str,
+    method: str = "GET",
+    data: Optional[Dict[str, Any]] = None,
+    raw: bool = False
+) -> Dict[str, Any]:
     """
     Backwards compatible function to call the DirectAdmin API.
+    
+    Acts as the user set with `login_as`, if any.
+    
+    With `raw` and `JSON_RAW_PASSTHROUGH` enabled, the response is returned as
+    RawJSON. Only use it for a response the tool returns unchanged; anything
+    that inspects the data needs the parsed response.
+    """
+    raw = raw and settings.JSON_RAW_PASSTHROUGH
+    return await get_client(identity.get()).call_api(path, method, data, raw=raw)
+
+
+def stream_da_sse(
+    path: str,
+    last_event_id: Optional[str] = None,
+    idle_timeout: Optional[float] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream Server-Sent Events from the DirectAdmin API with the default client
+    (or as the user set with `login_as`).
     """
-    return await client.call_api(path, method, data)
\ No newline at end of file
+    return get_client(identity.get()).stream_sse(path, last_event_id, idle_timeout)
@@ -3,8 +3,13 @@ FastAPI application for DirectAdmin MCP with SSE support and improved error hand
 """
 import os
 import sys
+import base64
+import hmac
+import json
 import logging
 from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, JSONResponse
@@ -14,6 +19,8 @@ import uvicorn
 from mcp_instance import mcp
 from mcp.server.sse import SseServerTransport
 from config import settings, setup_logging
+from da import close_clients, credentials
+from tracing import SERVER, find_session_id, sse_session, tracer
 from inspect import getmembers, iscoroutinefunction, signature
 
 # Initialize logger
@@ -43,6 +50,11 @@ async def lifespan(app: FastAPI):
         loaded_modules = tools.load_all_tools()
         logger.info(f"Loaded {len(loaded_modules)} tool modules: {', '.join(loaded_modules)}")
         
+        # Start samplers and watchers registered by the tool modules
+        started_tasks = await tools.start_background_tasks()
+        logger.info(f"Started {len(started_tasks)} background tasks")
+        tracer.start()
+        
         logger.info("Application startup complete")
         yield
     except Exception as e:
@@ -50,6 +62,9 @@ async def lifespan(app: FastAPI):
         sys.exit(1)
     
     # Cleanup phase
+    await tools.stop_background_tasks()
+    await close_clients()
+    await tracer.shutdown()
     logger.info("=" * 60)
     logger.info("DirectAdmin MCP Server - Application Shutting Down")
     logger.info("=" * 60)
@@ -81,8 +96,57 @@ async def global_exception_handler(request: Request, exc: Exception):
         content={"error": "Internal server error", "detail": str(exc)},
     )
 
+async def handle_message(scope, receive, send):
+    """
+    Message endpoint of the SSE transport, traced when tracing is enabled.
+    
+    The span of a `tools/call` message is remembered so the tool span started
+    by the MCP server for it becomes its child.
+    """
+    if not tracer.enabled:
+        return await sse.handle_post_message(scope, receive, send)
+    
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    body = b"".join(chunks)
+    
+    async def replay():
+        return {"type": "http.request", "body": body, "more_body": False}
+    
+    try:
+        payload: Dict[str, Any] = json.loads(body)
+    except ValueError:
+        payload = {}
+    if not isinstance(payload, dict):
+        payload = {}
+    session_id = parse_qs(scope.get("query_string", b"").decode()).get("session_id", [""])[0]
+    method = payload.get("method")
+    attributes = {
+        "rpc.system": "jsonrpc",
+        "rpc.method": method,
+        "rpc.jsonrpc.request_id": payload.get("id"),
+        "mcp.session_id": session_id,
+        "http.request.body.size": len(body),
+    }
+    if method == "tools/call":
+        attributes["mcp.tool.name"] = (payload.get("params") or {}).get("name")
+    
+    async def send_status(message):
+        if message["type"] == "http.response.start":
+            span.set_attribute("http.response.status_code", message["status"])
+        await send(message)
+    
+    with tracer.span(f"mcp.sse.message {method or 'unknown'}", kind=SERVER, attributes=attributes) as span:
+        if method == "tools/call":
+            tracer.remember_message(session_id, payload.get("id"), span)
+        await sse.handle_post_message(scope, replay, send_status)
+
 # Mount the /messages path for SSE
-app.router.routes.append(Mount("/messages", app=sse.handle_post_message))
+app.router.routes.append(Mount("/messages", app=handle_message))
 
 @app.get("/", tags=["General"])
 async def homepage():
@@ -117,6 +181,7 @@ async def about():
             "mcp": "/sse",
             "docs": "/docs",
             "health": "/health",
+            "metrics": "/metrics",
         }
     }
 
@@ -152,6 +217,60 @@ async def health_check():
             }
         )
 
+@app.get("/metrics", tags=["System"])
+async def metrics():
+    """Metrics endpoint with response compaction totals."""
+    from tools.common import get_compaction_stats
+    
+    return {
+        "compaction": get_compaction_stats(),
+    }
+
+def resolve_credentials(authorization: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    DirectAdmin credentials of an MCP session from its Authorization header.
+    
+    Bearer tokens are looked up in `MCP_TOKENS`; Basic auth carries DirectAdmin
+    credentials directly when `MCP_AUTH_PASSTHROUGH` is enabled. Sessions
+    without credentials are rejected when either is configured, unless
+    `MCP_REQUIRE_AUTH` is explicitly false.
+    
+    Args:
+        authorization: Authorization header of the /sse request
+        
+    Returns:
+        (username, login key), or None for the configured account
+        
+    Raises:
+        PermissionError: Credentials are missing or invalid
+    """
+    scheme, _, value = (authorization or "").strip().partition(" ")
+    scheme, value = scheme.lower(), value.strip()
+    
+    if scheme == "bearer" and value:
+        for entry in settings.MCP_TOKENS.split(","):
+            token, _, account = entry.strip().partition("=")
+            username, _, login_key = account.partition(":")
+            if token and username and login_key and hmac.compare_digest(token, value):
+                return username, login_key
+        raise PermissionError("Unknown token")
+    
+    if scheme == "basic" and value and settings.MCP_AUTH_PASSTHROUGH:
+        try:
+            username, _, login_key = base64.b64decode(value).decode().partition(":")
+        except (ValueError, UnicodeDecodeError):
+            raise PermissionError("Malformed Basic credentials")
+        if not username or not login_key:
+            raise PermissionError("Malformed Basic credentials")
+        return username, login_key
+    
+    require_auth = settings.MCP_REQUIRE_AUTH
+    if require_auth is None:
+        require_auth = bool(settings.MCP_TOKENS.strip() or settings.MCP_AUTH_PASSTHROUGH)
+    if require_auth:
+        raise PermissionError("Authentication required")
+    return None
+
 @app.get("/sse", tags=["MCP"])
 async def handle_sse(request: Request):
     """
@@ -162,7 +281,25 @@ async def handle_sse(request: Request):
     """
     logger.info(f"New SSE connection from {request.client.host}")
     try:
-        async with sse.connect_sse(request.scope, request.receive, request._send) as (read, write):
+        session_credentials = resolve_credentials(request.headers.get("authorization"))
+    except PermissionError as e:
+        return JSONResponse(status_code=401, content={"error": str(e)}, headers={"WWW-Authenticate": "Bearer"})
+    # Tool calls of this session run in tasks of the MCP server started below and inherit the credentials
+    credentials.set(session_credentials)
+    send = request._send
+    if tracer.enabled:
+        # Learn the transport's session ID from the endpoint event, so tool spans can find their message spans
+        session: Dict[str, str] = {}
+        sse_session.set(session)
+        
+        async def send(message, send=request._send):
+            if "id" not in session and message.get("type") == "http.response.body":
+                session_id = find_session_id(message.get("body", b""))
+                if session_id:
+                    session["id"] = session_id
+            await send(message)
+    try:
+        async with sse.connect_sse(request.scope, request.receive, send) as (read, write):
             await mcp._mcp_server.run(
                 read,
                 write,
@@ -2,6 +2,7 @@
 DirectAdmin MCP server with improved configuration and logging.
 """
 import logging
+import re
 import sys
 import time
 import os
@@ -13,6 +14,9 @@ from mcp_instance import mcp
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+# User info (username:login_key) of URLs such as those in DA_PEER_SERVERS
+_URL_CREDENTIALS = re.compile(r"(\w+://)[^/@\s,]+@")
+
 def log_startup_info():
     """Log detailed startup information."""
     logger.info("=" * 60)
@@ -24,12 +28,15 @@ def log_startup_info():
     logger.info(f"Python version: {platform.python_version()}")
     logger.info(f"Platform: {platform.platform()}")
     
-    # Log configuration (redact sensitive values)
+    # Log configuration (redact sensitive values and credentials in URLs)
     safe_settings = {
-        k: v if not any(secret in k.lower() for secret in ['key', 'password', 'token', 'secret'])
-        else '********'
+        k: _URL_CREDENTIALS.sub(r"\1********@", v) if isinstance(v, str) else v
         for k, v in settings.model_dump().items()
     }
+    safe_settings.update({
+        k: '********' for k in safe_settings
+        if any(secret in k.lower() for secret in ['key', 'password', 'token', 'secret'])
+    })
     logger.info(f"Configuration: {safe_settings}")
     
     # Log startup message
@@ -45,4 +45,11 @@ def load_all_tools() -> List[str]:
     return loaded_modules
 
 # Import common utilities
-from tools.common import log_tool_call, format_response, parse_args
\ No newline at end of file
+from tools.common import (
+    log_tool_call,
+    compact_response,
+    format_response,
+    parse_args,
+    start_background_tasks,
+    stop_background_tasks,
+)
\ No newline at end of file
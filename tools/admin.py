@@ -19,5 +19,5 @@ Get admin's usage
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/admin-usage", method="GET")
+    response = await call_da_api(f"/api/admin-usage", method="GET", raw=True)
     return format_response(response)
\ No newline at end of file
@@ -2,13 +2,262 @@
 MCP tools for backend search endpoints in DirectAdmin.
 """
 
+import asyncio
+import bisect
 import logging
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from config import settings
 from mcp_instance import mcp
 from da import call_da_api
-from tools.common import log_tool_call, format_response
+from tools.common import (
+    background_task,
+    log_tool_call,
+    format_response,
+    gather_limited,
+    list_usernames,
+    run_periodically,
+    server_account_only,
+)
 
 logger = logging.getLogger(__name__)
 
+KINDS = ("user", "domain", "subdomain", "email", "database")
+
+# Minimum share of the query's trigrams an entry needs for a fuzzy match
+FUZZY_THRESHOLD = 0.5
+# Trigram postings longer than this (or 2% of the index) are skipped by fuzzy search
+FUZZY_MAX_POSTING = 500
+# Substring matches collected before ranking; very common substrings stop early
+SUBSTRING_CANDIDATES = 500
+# Number of best candidates scored by fuzzy search
+FUZZY_CANDIDATES = 200
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Trigrams of a padded, lowercased string."""
+    padded = f"  {text.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """In-memory prefix and trigram index of users and their resources."""
+
+    def __init__(self):
+        self.entries: Dict[int, Dict[str, Any]] = {}
+        self.keys: Dict[Tuple[str, str], int] = {}
+        self.postings: Dict[str, Set[int]] = {}
+        self.sorted_names: List[Tuple[str, int]] = []
+        self.owned: Dict[str, Set[int]] = {}
+        # Username -> time its resources were last fetched
+        self.fetched: Dict[str, float] = {}
+        self.next_id = 0
+        self.built_at: Optional[float] = None
+        self.lock = asyncio.Lock()
+
+    def add(self, kind: str, name: str, owner: Optional[str] = None):
+        """Add or update one entry."""
+        if not name:
+            return
+        key = (kind, name.lower())
+        if key in self.keys:
+            entry_id = self.keys[key]
+            previous = self.entries[entry_id]["owner"]
+            if previous != owner:
+                if previous:
+                    self.owned.get(previous, set()).discard(entry_id)
+                if owner:
+                    self.owned.setdefault(owner, set()).add(entry_id)
+                self.entries[entry_id]["owner"] = owner
+            return
+        entry_id = self.next_id
+        self.next_id += 1
+        self.entries[entry_id] = {"kind": kind, "name": name, "owner": owner}
+        self.keys[key] = entry_id
+        for trigram in _trigrams(name):
+            self.postings.setdefault(trigram, set()).add(entry_id)
+        bisect.insort(self.sorted_names, (name.lower(), entry_id))
+        if owner:
+            self.owned.setdefault(owner, set()).add(entry_id)
+
+    def remove(self, entry_id: int):
+        """Remove one entry."""
+        entry = self.entries.pop(entry_id, None)
+        if entry is None:
+            return
+        self.keys.pop((entry["kind"], entry["name"].lower()), None)
+        for trigram in _trigrams(entry["name"]):
+            self.postings.get(trigram, set()).discard(entry_id)
+        position = bisect.bisect_left(self.sorted_names, (entry["name"].lower(), entry_id))
+        if position < len(self.sorted_names) and self.sorted_names[position][1] == entry_id:
+            del self.sorted_names[position]
+        if entry["owner"]:
+            self.owned.get(entry["owner"], set()).discard(entry_id)
+
+    def remove_user(self, username: str):
+        """Remove a user and everything it owns."""
+        for entry_id in list(self.owned.pop(username, set())):
+            self.remove(entry_id)
+        user_id = self.keys.get(("user", username.lower()))
+        if user_id is not None:
+            self.remove(user_id)
+        self.fetched.pop(username, None)
+
+    def names(self, kind: str) -> List[str]:
+        """All entry names of a kind."""
+        return [entry["name"] for entry in self.entries.values() if entry["kind"] == kind]
+
+    def owners(self, kind: str) -> Dict[str, Optional[str]]:
+        """All entry names of a kind, mapped to their owner."""
+        return {entry["name"]: entry["owner"] for entry in self.entries.values() if entry["kind"] == kind}
+
+    def search(self, query: str, kinds: Optional[Iterable[str]] = None, limit: int = 20, fuzzy: bool = True) -> List[Dict[str, Any]]:
+        """
+        Search entries by exact name, prefix, substring and (optionally) similarity.
+
+        Args:
+            query: Search text
+            kinds: Entry kinds to include (default: all)
+            limit: Maximum number of results
+            fuzzy: Include trigram similarity matches
+
+        Returns:
+            Matching entries with a score, best first
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+        allowed = set(kinds or KINDS)
+        scores: Dict[int, float] = {}
+
+        # Prefix matches from the sorted name list
+        position = bisect.bisect_left(self.sorted_names, (query, -1))
+        while position < len(self.sorted_names) and self.sorted_names[position][0].startswith(query):
+            name, entry_id = self.sorted_names[position]
+            scores[entry_id] = 1.0 if name == query else 0.9
+            position += 1
+
+        query_trigrams = _trigrams(query)
+        if len(query) >= 3:
+            # Substring matches: entries containing every inner trigram of the query
+            inner = {query[i:i + 3] for i in range(len(query) - 2)}
+            rarest = min((self.postings.get(t, set()) for t in inner), key=len)
+            found = 0
+            for entry_id in rarest:
+                if entry_id not in scores and query in self.entries[entry_id]["name"].lower():
+                    scores[entry_id] = 0.8
+                    found += 1
+                    if found >= SUBSTRING_CANDIDATES:
+                        break
+
+        if fuzzy and len(scores) < limit:
+            # Trigrams shared by a large part of the index ("com", "exa", ...) say
+            # little about the match and would make this scan every entry
+            common = max(FUZZY_MAX_POSTING, len(self.entries) // 50)
+            shared: Counter = Counter()
+            for trigram in query_trigrams:
+                posting = self.postings.get(trigram, ())
+                if len(posting) <= common:
+                    shared.update(posting)
+            for entry_id, _ in shared.most_common(FUZZY_CANDIDATES):
+                if entry_id in scores:
+                    continue
+                # Share of the query's trigrams found in the name, so short
+                # queries can match inside long names (like pg_trgm word similarity)
+                found = len(query_trigrams & _trigrams(self.entries[entry_id]["name"]))
+                similarity = found / len(query_trigrams)
+                if similarity >= FUZZY_THRESHOLD:
+                    scores[entry_id] = round(0.7 * similarity, 3)
+
+        ranked = sorted(
+            (entry_id for entry_id in scores if self.entries[entry_id]["kind"] in allowed),
+            key=lambda entry_id: (-scores[entry_id], self.entries[entry_id]["name"]),
+        )
+        return [dict(self.entries[entry_id], score=scores[entry_id]) for entry_id in ranked[:limit]]
+
+    def ingest_user(self, username: str, config: Any):
+        """
+        Index a user and the domains listed in its configuration.
+
+        The listed domains replace the ones previously indexed for the user,
+        so removed domains drop out of the index.
+        """
+        self.add("user", username)
+        if isinstance(config, dict):
+            config = config.get("data", config)
+        if not isinstance(config, dict):
+            return
+        domains: List[str] = []
+        for key in ("domain", "domains"):
+            value = config.get(key)
+            if isinstance(value, str):
+                domains.extend(d.strip() for d in value.replace(",", " ").split())
+            elif isinstance(value, list):
+                domains.extend(str(d) for d in value)
+        listed = {domain.lower() for domain in domains}
+        for entry_id in list(self.owned.get(username, set())):
+            entry = self.entries[entry_id]
+            if entry["kind"] == "domain" and entry["name"].lower() not in listed:
+                self.remove(entry_id)
+        for domain in domains:
+            self.add("domain", domain, owner=username)
+        self.fetched[username] = time.time()
+
+    def ingest_results(self, results: Any):
+        """Index entries returned by the DirectAdmin search backend."""
+        if isinstance(results, dict):
+            results = next((v for v in results.values() if isinstance(v, list)), [])
+        for item in results if isinstance(results, list) else []:
+            if not isinstance(item, dict):
+                continue
+            kind = str(item.get("type") or item.get("kind") or "").lower()
+            name = item.get("name") or item.get("value") or item.get("domain") or item.get("username")
+            if kind in KINDS and name:
+                owner = item.get("owner") or item.get("user") or item.get("username")
+                self.add(kind, str(name), owner=str(owner) if owner and kind != "user" else None)
+
+    async def refresh(self):
+        """
+        Bring the index up to date.
+
+        New users are fetched, deleted users are dropped and a batch of the
+        least recently fetched users is re-fetched, so a full rebuild is never needed.
+        """
+        async with self.lock:
+            usernames = await list_usernames()
+            current = set(usernames)
+            for username in list(self.fetched):
+                if username not in current:
+                    self.remove_user(username)
+
+            new = [u for u in usernames if u not in self.fetched]
+            stale = sorted((u for u in usernames if u in self.fetched), key=self.fetched.get)
+            to_fetch = new + stale[:settings.SEARCH_INDEX_REFRESH_BATCH]
+
+            configs = await gather_limited(
+                (call_da_api(f"/api/users/{username}/config", method="GET") for username in to_fetch),
+                settings.BATCH_CONCURRENCY,
+            )
+            for username, config in zip(to_fetch, configs):
+                if isinstance(config, Exception):
+                    logger.warning(f"Failed to index user {username}: {str(config)}")
+                    self.add("user", username)
+                else:
+                    self.ingest_user(username, config)
+            self.built_at = time.time()
+            logger.info(f"Search index refreshed: {len(to_fetch)} users fetched, {len(self.entries)} entries")
+
+
+index = SearchIndex()
+
+
+@background_task
+async def refresh_search_index():
+    """Background loop keeping the search index up to date."""
+    await run_periodically("search index refresh", settings.SEARCH_INDEX_REFRESH_INTERVAL, index.refresh)
+
 
 @mcp.tool()
 @log_tool_call
@@ -23,7 +272,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/search/multi-user", method="GET")
+    response = await call_da_api(f"/api/search/multi-user", method="GET", data={"q": q, "limit": limit}, raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -38,5 +287,53 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/search/single-user", method="GET")
-    return format_response(response)
\ No newline at end of file
+    response = await call_da_api(f"/api/search/single-user", method="GET", data={"q": q}, raw=True)
+    return format_response(response)
+
+@mcp.tool()
+@log_tool_call
+@server_account_only
+async def search_resources(
+    q: str,
+    kinds: Optional[List[str]] = None,
+    limit: int = 20,
+    fuzzy: bool = True,
+    upstream: bool = True
+):
+    """
+Search users, domains and other resources in the local index (prefix, substring and fuzzy).
+
+The index is built on first use and refreshed incrementally in the background.
+When nothing matches locally, the DirectAdmin search backend is queried and its
+results are added to the index.
+
+Args:
+    q (string): query
+    kinds (array): Resource kinds to include: user, domain, subdomain, email, database
+    limit (integer): Maximum number of results
+    fuzzy (boolean): Include approximate matches
+    upstream (boolean): Fall back to the DirectAdmin search backend when nothing matches
+
+Returns:
+    dict: Matches with kind, name, owner and score.
+"""
+    if index.built_at is None:
+        await index.refresh()
+    
+    started = time.perf_counter()
+    results = index.search(q, kinds, limit, fuzzy)
+    source = "index"
+    
+    if not results and upstream:
+        response = await call_da_api(f"/api/search/multi-user", method="GET", data={"q": q, "limit": limit})
+        index.ingest_results(response)
+        results = index.search(q, kinds, limit, fuzzy)
+        source = "upstream"
+    
+    return format_response({
+        "query": q,
+        "source": source,
+        "search_ms": round((time.perf_counter() - started) * 1000, 3),
+        "indexed": len(index.entries),
+        "results": results,
+    })
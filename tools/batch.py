@@ -0,0 +1,120 @@
+"""
+MCP tool for executing several DirectAdmin tools in a single call.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from mcp_instance import mcp
+from da import RawJSON, json_loads, login_as
+from tools.common import log_tool_call, format_response, gather_limited
+
+logger = logging.getLogger(__name__)
+
+
+async def _run_one(call: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    """
+    Run a single batch item through the registered tool.
+    
+    Args:
+        call: Batch item with `tool`, optional `args` and optional `as_user`
+        timeout: Timeout in seconds
+        
+    Returns:
+        Item result with `ok`, `result` or `error`, and elapsed time
+    """
+    name = call.get("tool") if isinstance(call, dict) else None
+    args = (call.get("args") or {}) if isinstance(call, dict) else {}
+    as_user = call.get("as_user") if isinstance(call, dict) else None
+    item: Dict[str, Any] = {"tool": name}
+    if as_user:
+        item["as_user"] = as_user
+    
+    tool = mcp._tool_manager.get_tool(name) if name else None
+    if tool is None or name in ("batch_call", "call_as_user"):
+        item.update(ok=False, error=f"Unknown tool: {name}")
+        return item
+    
+    start = time.perf_counter()
+    try:
+        with login_as(as_user):
+            result = await asyncio.wait_for(tool.run(args), timeout=timeout)
+        if isinstance(result, RawJSON):
+            result = json_loads(result)
+        item["ok"] = not (isinstance(result, dict) and result.get("error"))
+        item["result"] = result
+    except asyncio.TimeoutError:
+        item.update(ok=False, error=f"Timed out after {timeout}s")
+    except Exception as e:
+        item.update(ok=False, error=str(e))
+    item["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    
+    return item
+
+
+@mcp.tool()
+@log_tool_call
+async def batch_call(
+    calls: List[Dict[str, Any]],
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None
+):
+    """
+Execute several independent tool calls concurrently and return all results at once.
+
+Use this instead of calling read-only tools one by one (configs, usages, TLS status, ...).
+Failed or timed out calls do not affect the others. A call with "as_user" runs
+logged in as that user, independently of the other calls.
+
+Args:
+    calls (array): List of {"tool": "<tool name>", "args": {...}, "as_user": "<username>"} objects (as_user optional)
+    concurrency (integer): Maximum number of calls running at once (capped at, and defaulting to, BATCH_CONCURRENCY)
+    timeout (number): Timeout in seconds for each call
+
+Returns:
+    dict: Results in the order of `calls`, each with `ok` and `result` or `error`.
+"""
+    if len(calls) > settings.BATCH_MAX_CALLS:
+        return {
+            "error": True,
+            "message": f"Too many calls in batch: {len(calls)} (maximum {settings.BATCH_MAX_CALLS})",
+        }
+    
+    concurrency = min(concurrency or settings.BATCH_CONCURRENCY, settings.BATCH_CONCURRENCY)
+    timeout = timeout or settings.BATCH_CALL_TIMEOUT
+    
+    results = await gather_limited((_run_one(call, timeout) for call in calls), concurrency)
+    failed = sum(1 for item in results if not item["ok"])
+    
+    return format_response({
+        "total": len(results),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "results": results,
+    })
+
+
+@mcp.tool()
+@log_tool_call
+async def call_as_user(user: str, tool: str, args: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None):
+    """
+Run a tool logged in as another user (login-as).
+
+Unlike api_session_login_as_switch, this does not change the shared session:
+the call authenticates as "admin|user" with its own connection pool, so calls
+as different users can run at the same time.
+
+Args:
+    user (string): Username to act as
+    tool (string): Tool name
+    args (object): Tool arguments
+    timeout (number): Timeout in seconds
+
+Returns:
+    dict: Result with `ok` and `result` or `error`.
+"""
+    item = await _run_one({"tool": tool, "args": args, "as_user": user}, timeout or settings.BATCH_CALL_TIMEOUT)
+    return format_response(item)
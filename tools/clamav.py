@@ -19,7 +19,7 @@ Get clamAV processes
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/clamav", method="GET")
+    response = await call_da_api(f"/api/clamav", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -34,7 +34,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/clamav", method="POST", data=payload)
+    response = await call_da_api(f"/api/clamav", method="POST", data=payload, raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -49,5 +49,5 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/clamav/{pid}", method="DELETE")
+    response = await call_da_api(f"/api/clamav/{pid}", method="DELETE", raw=True)
     return format_response(response)
\ No newline at end of file
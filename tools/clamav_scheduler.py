@@ -0,0 +1,403 @@
+"""
+MCP tools for scheduling sharded ClamAV scans.
+
+A whole-server scan is split into shards (one per user home directory or
+given path), which are started through the ClamAV endpoints a few at a time
+so the disks are not saturated. Jobs run in the background; their progress
+and a deduplicated report of the infections found are available at any time.
+"""
+
+import asyncio
+import logging
+import re
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from mcp_instance import mcp
+from da import call_da_api
+from tools.common import list_usernames, log_tool_call, format_response, server_account_only
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept for status queries
+MAX_JOBS = 20
+# Consecutive failed polls of the process list before a shard is given up
+POLL_RETRIES = 3
+
+_RUNNING_STATES = ("running", "scanning", "active", "started", "queued")
+# Keys of a process entry carrying the scan result
+_RESULT_KEYS = ("infected", "infections", "found", "results", "output", "log", "result", "exitCode", "exit_code")
+_FOUND_LINE = re.compile(r"^(?P<path>.+?):\s+(?P<signature>\S.*?)\s+FOUND\s*$", re.MULTILINE)
+
+
+def _unwrap(response: Any) -> Any:
+    """Strip a `{"data": ...}` envelope."""
+    if isinstance(response, dict) and "data" in response and len(response) <= 2:
+        return response["data"]
+    return response
+
+
+def parse_pid(response: Any) -> Optional[str]:
+    """PID of the scan started by `POST /api/clamav`."""
+    response = _unwrap(response)
+    if isinstance(response, dict):
+        for key in ("pid", "PID", "id"):
+            if response.get(key):
+                return str(response[key])
+    elif isinstance(response, (int, str)) and str(response).isdigit():
+        return str(response)
+    return None
+
+
+def parse_processes(response: Any) -> Dict[str, Dict[str, Any]]:
+    """
+    Index a `GET /api/clamav` response by PID.
+
+    Args:
+        response: List of processes, or processes keyed by PID
+
+    Returns:
+        PID -> process entry
+    """
+    response = _unwrap(response)
+    if isinstance(response, dict):
+        entries = next((v for v in response.values() if isinstance(v, list)), None)
+        if entries is None:
+            entries = [dict(value, pid=key) for key, value in response.items() if isinstance(value, dict)]
+    else:
+        entries = response if isinstance(response, list) else []
+
+    processes = {}
+    for entry in entries:
+        if isinstance(entry, dict):
+            pid = entry.get("pid") or entry.get("PID") or entry.get("id")
+            if pid:
+                processes[str(pid)] = entry
+    return processes
+
+
+def is_running(process: Dict[str, Any]) -> bool:
+    """Whether a ClamAV process entry is still scanning."""
+    status = str(process.get("status") or process.get("state") or "").lower()
+    if status:
+        return status in _RUNNING_STATES
+    return not any(key in process for key in ("finished", "exitCode", "exit_code", "end", "ended"))
+
+
+def has_result(process: Any) -> bool:
+    """Whether a process entry is finished and carries its scan result."""
+    return isinstance(process, dict) and not is_running(process) and any(key in process for key in _RESULT_KEYS)
+
+
+class ScanResultUnknown(Exception):
+    """The scan of a shard ended without a result that could be read."""
+
+
+def parse_infections(process: Any) -> List[Dict[str, str]]:
+    """
+    Extract infected files from a finished ClamAV process.
+
+    Both structured lists and clamscan output ("<path>: <signature> FOUND")
+    are understood.
+
+    Args:
+        process: Process entry or scan result
+
+    Returns:
+        Infections as `{"path", "signature"}`
+    """
+    infections = []
+    if not isinstance(process, dict):
+        return infections
+    for key in ("infected", "infections", "found", "results"):
+        items = process.get(key)
+        if not isinstance(items, list):
+            continue
+        for item in items:
+            if isinstance(item, dict):
+                path = item.get("path") or item.get("file")
+                signature = item.get("signature") or item.get("virus") or item.get("name")
+                if path:
+                    infections.append({"path": str(path), "signature": str(signature or "unknown")})
+            elif isinstance(item, str):
+                match = _FOUND_LINE.match(item)
+                if match:
+                    infections.append(match.groupdict())
+    for key in ("output", "log", "result"):
+        text = process.get(key)
+        if isinstance(text, str):
+            infections.extend(match.groupdict() for match in _FOUND_LINE.finditer(text))
+    return infections
+
+
+class ScanJob:
+    """A sharded scan and the state of each shard."""
+
+    def __init__(self, paths: List[str], params: Dict[str, Any], concurrency: int):
+        self.id = uuid.uuid4().hex[:12]
+        self.params = params
+        self.concurrency = concurrency
+        self.shards = [{"path": path, "state": "pending", "pid": None, "error": None} for path in paths]
+        self.infections: Dict[tuple, Dict[str, Any]] = {}
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        self.cancelled = False
+        self.task: Optional[asyncio.Task] = None
+
+    def add_infections(self, shard: Dict[str, Any], infections: List[Dict[str, str]]):
+        """Merge infections into the report, one entry per file and signature."""
+        shard["infections"] = len(infections)
+        for infection in infections:
+            key = (infection["path"], infection["signature"])
+            entry = self.infections.setdefault(key, dict(infection, shards=[]))
+            if shard["path"] not in entry["shards"]:
+                entry["shards"].append(shard["path"])
+
+    async def run_shard(self, shard: Dict[str, Any], semaphore: asyncio.Semaphore):
+        """Start one shard, wait for its process to finish and collect the result."""
+        async with semaphore:
+            if self.cancelled:
+                shard["state"] = "cancelled"
+                return
+            shard["state"] = "running"
+            shard["started"] = time.time()
+            try:
+                response = await call_da_api("/api/clamav", method="POST", data=dict(self.params, path=shard["path"]))
+                shard["pid"] = parse_pid(response)
+                if shard["pid"] is None:
+                    # Without a PID, only a response that is itself the final result counts
+                    process = _unwrap(response)
+                    if not has_result(process):
+                        raise ScanResultUnknown("Scan started without a PID or a result")
+                else:
+                    process = await self.wait(shard)
+                self.add_infections(shard, parse_infections(process))
+                shard["state"] = "done"
+            except asyncio.CancelledError:
+                shard["state"] = "cancelled"
+                raise
+            except ScanResultUnknown as e:
+                # Never report a shard as clean without having seen its result
+                shard["state"] = "unknown"
+                shard["error"] = str(e)
+                logger.warning(f"ClamAV shard {shard['path']} has no result: {str(e)}")
+            except Exception as e:
+                shard["state"] = "failed"
+                shard["error"] = str(e)
+                logger.warning(f"ClamAV shard {shard['path']} failed: {str(e)}")
+            finally:
+                shard["finished"] = time.time()
+
+    async def wait(self, shard: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Poll the ClamAV process list until the shard's process is done.
+
+        Failed polls are retried up to `POLL_RETRIES` times in a row; a scan
+        that is given up on (poll errors or timeout) is killed first.
+
+        Returns:
+            The finished process entry
+
+        Raises:
+            ScanResultUnknown: The process ended without a readable result
+        """
+        deadline = time.monotonic() + settings.CLAMAV_SHARD_TIMEOUT
+        failures = 0
+        while True:
+            await asyncio.sleep(settings.CLAMAV_POLL_INTERVAL)
+            if time.monotonic() > deadline:
+                await self.kill(shard)
+                raise TimeoutError(f"Scan exceeded {settings.CLAMAV_SHARD_TIMEOUT}s and was killed")
+            try:
+                processes = parse_processes(await call_da_api("/api/clamav", method="GET"))
+            except Exception as e:
+                failures += 1
+                logger.warning(f"Polling ClamAV scan {shard['pid']} failed ({failures}/{POLL_RETRIES}): {str(e)}")
+                if failures >= POLL_RETRIES:
+                    await self.kill(shard)
+                    raise
+                continue
+            failures = 0
+            process = processes.get(shard["pid"])
+            if process is None:
+                # Gone from the list before a finished entry with its result was seen
+                raise ScanResultUnknown(f"Process {shard['pid']} ended without a result")
+            if not is_running(process):
+                if not has_result(process):
+                    raise ScanResultUnknown(f"Process {shard['pid']} finished without a result")
+                return process
+
+    async def kill(self, shard: Dict[str, Any]):
+        """Kill the scan process of a shard, logging failures."""
+        try:
+            await call_da_api(f"/api/clamav/{shard['pid']}", method="DELETE")
+        except Exception as e:
+            logger.warning(f"Failed to kill ClamAV scan {shard['pid']}: {str(e)}")
+
+    async def run(self):
+        """Run all shards with at most `concurrency` scans at once."""
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+        try:
+            await asyncio.gather(*(self.run_shard(shard, semaphore) for shard in self.shards))
+        finally:
+            self.finished = time.time()
+            logger.info(f"ClamAV job {self.id} finished: {len(self.infections)} infections")
+
+    async def cancel(self):
+        """Stop scheduling shards and kill the scans that are running (no-op once finished)."""
+        if self.finished:
+            return
+        self.cancelled = True
+        running = [shard for shard in self.shards if shard["state"] == "running" and shard["pid"]]
+        if self.task is not None:
+            self.task.cancel()
+        for shard in running:
+            await self.kill(shard)
+        for shard in self.shards:
+            if shard["state"] in ("pending", "running"):
+                shard["state"] = "cancelled"
+
+    def report(self, include_shards: bool = False) -> Dict[str, Any]:
+        """Progress and the deduplicated infections of the job."""
+        states = Counter(shard["state"] for shard in self.shards)
+        finished = [s for s in self.shards if s["state"] in ("done", "failed", "unknown") and s.get("started")]
+        remaining = states["pending"] + states["running"]
+
+        eta = None
+        if finished and remaining and not self.finished:
+            # Average shard duration spread over the concurrent slots
+            average = sum(s["finished"] - s["started"] for s in finished) / len(finished)
+            eta = round(average * remaining / max(1, self.concurrency), 1)
+
+        infections = sorted(self.infections.values(), key=lambda i: (i["signature"], i["path"]))
+        owners = Counter(
+            match.group(1)
+            for i in infections
+            for match in [re.match(r"/home/([^/]+)/", i["path"])]
+            if match
+        )
+        report: Dict[str, Any] = {
+            "job_id": self.id,
+            "state": "cancelled" if self.cancelled else ("finished" if self.finished else "running"),
+            "started": self.started,
+            "finished": self.finished,
+            "elapsed_s": round((self.finished or time.time()) - self.started, 1),
+            "eta_s": eta,
+            "shards": dict(states, total=len(self.shards)),
+            "infected_files": len({i["path"] for i in infections}),
+            "by_signature": dict(Counter(i["signature"] for i in infections).most_common()),
+            "by_owner": dict(owners.most_common()),
+            "infections": infections,
+        }
+        failed = [{"path": s["path"], "error": s["error"]} for s in self.shards if s["state"] == "failed"]
+        if failed:
+            report["failed"] = failed
+        unknown = [{"path": s["path"], "error": s["error"]} for s in self.shards if s["state"] == "unknown"]
+        if unknown:
+            # These paths were not verified clean
+            report["unknown"] = unknown
+        if include_shards:
+            report["shard_details"] = self.shards
+        return report
+
+
+jobs: "OrderedDict[str, ScanJob]" = OrderedDict()
+
+
+def _latest_job() -> Optional[ScanJob]:
+    return next(reversed(jobs.values()), None)
+
+
+@mcp.tool()
+@log_tool_call
+@server_account_only
+async def clamav_scan_schedule(
+    users: Optional[List[str]] = None,
+    paths: Optional[List[str]] = None,
+    params: Optional[Dict[str, Any]] = None,
+    concurrency: Optional[int] = None
+):
+    """
+    Start a sharded ClamAV scan in the background.
+
+    The scan is split into one shard per path; without `users` or `paths`
+    every user's home directory is a shard. At most `concurrency` shards are
+    scanned at once. Follow the job with `clamav_scan_status`.
+
+    Args:
+        users: Users whose home directories are scanned
+        paths: Additional paths to scan, one shard each
+        params: Extra ClamAV params sent with every shard (as for api_clamav_scan)
+        concurrency: Shards scanned at once (default: CLAMAV_SCAN_CONCURRENCY)
+
+    Returns:
+        Job ID and shard paths
+    """
+    if not users and not paths:
+        users = await list_usernames()
+    shard_paths = list(dict.fromkeys([f"/home/{user}" for user in users or []] + list(paths or [])))
+    if not shard_paths:
+        return {"error": True, "message": "Nothing to scan"}
+
+    job = ScanJob(shard_paths, params or {}, concurrency or settings.CLAMAV_SCAN_CONCURRENCY)
+    job.task = asyncio.create_task(job.run(), name=f"clamav-{job.id}")
+    jobs[job.id] = job
+    while len(jobs) > MAX_JOBS:
+        oldest = next(iter(jobs.values()))
+        if not oldest.finished:
+            break
+        jobs.popitem(last=False)
+
+    return format_response({
+        "job_id": job.id,
+        "shards": len(shard_paths),
+        "concurrency": job.concurrency,
+        "paths": shard_paths,
+    })
+
+
+@mcp.tool()
+@log_tool_call
+@server_account_only
+async def clamav_scan_status(job_id: Optional[str] = None, include_shards: bool = False):
+    """
+    Get the progress and infections report of a sharded ClamAV scan.
+
+    Infections are deduplicated per file and signature across shards, and
+    counted per signature and per owning user. Shards whose scan ended
+    without a readable result are listed as "unknown", not as clean.
+
+    Args:
+        job_id: Job to report on (default: the most recent job)
+        include_shards: Include the state of every shard
+
+    Returns:
+        Shard counts by state, ETA and the deduplicated infections
+    """
+    job = jobs.get(job_id) if job_id else _latest_job()
+    if job is None:
+        return {"error": True, "message": f"Unknown job: {job_id}" if job_id else "No scan jobs", "jobs": list(jobs)}
+    return format_response(job.report(include_shards))
+
+
+@mcp.tool()
+@log_tool_call
+@server_account_only
+async def clamav_scan_cancel(job_id: str):
+    """
+    Cancel a sharded ClamAV scan and kill its running scans.
+
+    Args:
+        job_id: Job to cancel
+
+    Returns:
+        Final report of the job
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return {"error": True, "message": f"Unknown job: {job_id}", "jobs": list(jobs)}
+    await job.cancel()
+    return format_response(job.report())
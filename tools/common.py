@@ -1,19 +1,34 @@
 """
 Common utilities for DirectAdmin MCP tools.
 """
+import asyncio
 import logging
 import functools
 import inspect
 import json
-from typing import Any, Callable, Dict, List, Optional, TypeVar, cast
+import os
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar, Union, cast
 
-from da import call_da_api, DirectAdminError
+from config import settings
+from da import call_da_api, credentials, DirectAdminError, RawJSON, json_dumps, json_loads
+from tracing import tracer
 
 logger = logging.getLogger(__name__)
 
 # Type variable for tool functions
 T = TypeVar('T', bound=Callable)
 
+# Coroutine functions run in the background while the FastAPI server is up
+_background_tasks: List[Callable[[], Awaitable[None]]] = []
+_running_tasks: List["asyncio.Task[None]"] = []
+
+# Running totals for response compaction, exposed through /metrics
+_compaction_stats: Dict[str, int] = {
+    "calls": 0,
+    "bytes_before": 0,
+    "bytes_after": 0,
+}
+
 def log_tool_call(func: T) -> T:
     """
     Decorator to log tool calls with parameters and results.
@@ -80,8 +95,305 @@ def log_tool_call(func: T) -> T:
                 "type": type(e).__name__
             }
     
+    return cast(T, compact_response(wrapper))
+
+def compact_response(func: T) -> T:
+    """
+    Decorator adding the optional `fields`, `max_items` and `summary` parameters
+    to a tool and applying them to its result before it is serialized.
+    
+    `log_tool_call` applies this automatically; tools that do not use
+    `log_tool_call` can use it directly below `@mcp.tool()`.
+    
+    Args:
+        func: The tool function to decorate
+        
+    Returns:
+        Decorated function with response compaction
+    """
+    sig = inspect.signature(func)
+    
+    async def run(args, kwargs, fields, max_items, summary):
+        result = await func(*args, **kwargs)
+        if not fields and max_items is None and not summary:
+            # Nothing to compact, so raw responses go out without being parsed
+            return result
+        return compact_result(result, fields=fields, max_items=max_items, summary=summary)
+    
+    @functools.wraps(func)
+    async def wrapper(*args, fields=None, max_items=None, summary=False, **kwargs):
+        if not tracer.enabled:
+            return await run(args, kwargs, fields, max_items, summary)
+        
+        # Tool span, a child of the SSE message that delivered the call
+        with tracer.span(
+            f"tool {func.__name__}",
+            attributes={"mcp.tool.name": func.__name__, "directadmin.session_user": (credentials.get() or (None,))[0]},
+            parent=tracer.message_span(),
+        ) as span:
+            result = await run(args, kwargs, fields, max_items, summary)
+            if isinstance(result, dict) and result.get("error") is True:
+                span.set_error(str(result.get("message")))
+            return result
+    
+    # Advertise the extra parameters in the tool schema
+    extra_params = [
+        inspect.Parameter(
+            "fields",
+            inspect.Parameter.KEYWORD_ONLY,
+            default=None,
+            annotation=Optional[Union[List[str], str]],
+        ),
+        inspect.Parameter(
+            "max_items",
+            inspect.Parameter.KEYWORD_ONLY,
+            default=None,
+            annotation=Optional[int],
+        ),
+        inspect.Parameter(
+            "summary",
+            inspect.Parameter.KEYWORD_ONLY,
+            default=False,
+            annotation=bool,
+        ),
+    ]
+    wrapper.__signature__ = sig.replace(
+        parameters=[*sig.parameters.values(), *extra_params]
+    )
+    
+    return cast(T, wrapper)
+
+def server_account_only(func: T) -> T:
+    """
+    Decorator for tools serving data collected with the configured account.
+    
+    Background caches and local archives are shared by all MCP sessions, so
+    sessions with their own DirectAdmin credentials get an error instead.
+    Place it below `@log_tool_call`.
+    
+    Args:
+        func: The tool function to decorate
+        
+    Returns:
+        Decorated function rejecting sessions with their own credentials
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if credentials.get() is not None:
+            return {
+                "error": True,
+                "message": f"{func.__name__} is only available to sessions using the server's own DirectAdmin account",
+            }
+        return await func(*args, **kwargs)
+    
     return cast(T, wrapper)
 
+def compact_result(
+    result: Any,
+    fields: Optional[Union[List[str], str]] = None,
+    max_items: Optional[int] = None,
+    summary: bool = False
+) -> Any:
+    """
+    Project, truncate and/or summarize a tool result.
+    
+    Results produced by `format_response` are compacted in their `data` key;
+    any other result is compacted as a whole and wrapped in a `data` key.
+    Error results are returned unchanged.
+    
+    Args:
+        result: Tool result to compact
+        fields: Field names (dotted paths allowed) to keep, as a list or comma-separated string
+        max_items: Maximum number of items to keep in each list or collection
+        summary: Replace the data with a structural summary
+        
+    Returns:
+        Compacted result including a `compaction` section with byte counts
+    """
+    if isinstance(result, RawJSON):
+        result = json_loads(result)
+    
+    if isinstance(result, dict) and "error" in result:
+        return result
+    
+    if isinstance(result, dict) and "data" in result and "success" in result:
+        envelope = dict(result)
+        data = result["data"]
+    else:
+        envelope = {}
+        data = result
+    
+    bytes_before = _payload_size(data)
+    truncated: List[Dict[str, Any]] = []
+    
+    if fields:
+        if isinstance(fields, str):
+            fields = [f.strip() for f in fields.split(",") if f.strip()]
+        data = project_fields(data, fields)
+    
+    if max_items is not None:
+        data = truncate_items(data, max(max_items, 0), truncated)
+    
+    if summary:
+        data = summarize(data)
+    
+    bytes_after = _payload_size(data)
+    
+    _compaction_stats["calls"] += 1
+    _compaction_stats["bytes_before"] += bytes_before
+    _compaction_stats["bytes_after"] += bytes_after
+    logger.debug(f"Compacted response: {bytes_before} -> {bytes_after} bytes")
+    
+    envelope["data"] = data
+    envelope["compaction"] = {
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+    }
+    if truncated:
+        envelope["compaction"]["truncated"] = truncated
+    
+    return envelope
+
+def project_fields(data: Any, fields: List[str]) -> Any:
+    """
+    Keep only the given fields of a result.
+    
+    Lists are projected item by item. Mappings whose top-level keys do not match
+    any field but whose values are all objects (e.g. results keyed by username)
+    are projected value by value.
+    
+    Args:
+        data: Data to project
+        fields: Field names, dotted paths select nested fields
+        
+    Returns:
+        Projected data
+    """
+    if isinstance(data, list):
+        return [project_fields(item, fields) for item in data]
+    
+    if not isinstance(data, dict):
+        return data
+    
+    heads = {field.split(".", 1)[0] for field in fields}
+    if not heads & data.keys() and data and all(isinstance(v, (dict, list)) for v in data.values()):
+        return {key: project_fields(value, fields) for key, value in data.items()}
+    
+    projected: Dict[str, Any] = {}
+    for field in fields:
+        head, _, rest = field.partition(".")
+        if head not in data:
+            continue
+        if rest:
+            nested = project_fields(data[head], [rest])
+            if isinstance(projected.get(head), dict) and isinstance(nested, dict):
+                projected[head].update(nested)
+            else:
+                projected[head] = nested
+        else:
+            projected[head] = data[head]
+    return projected
+
+def truncate_items(
+    data: Any,
+    max_items: int,
+    truncated: Optional[List[Dict[str, Any]]] = None,
+    path: str = "$"
+) -> Any:
+    """
+    Truncate every list and object-valued collection to `max_items` entries.
+    
+    Args:
+        data: Data to truncate
+        max_items: Maximum number of entries to keep per collection
+        truncated: Optional list collecting `{path, total, kept}` for each cut
+        path: JSON path of `data`, used in the truncation report
+        
+    Returns:
+        Truncated data
+    """
+    if isinstance(data, list):
+        if len(data) > max_items and truncated is not None:
+            truncated.append({"path": path, "total": len(data), "kept": max_items})
+        return [
+            truncate_items(item, max_items, truncated, f"{path}[{i}]")
+            for i, item in enumerate(data[:max_items])
+        ]
+    
+    if isinstance(data, dict):
+        items = list(data.items())
+        is_collection = bool(items) and all(isinstance(v, (dict, list)) for _, v in items)
+        if is_collection and len(items) > max_items:
+            if truncated is not None:
+                truncated.append({"path": path, "total": len(items), "kept": max_items})
+            items = items[:max_items]
+        return {
+            key: truncate_items(value, max_items, truncated, f"{path}.{key}")
+            for key, value in items
+        }
+    
+    return data
+
+def summarize(data: Any, depth: int = 3) -> Any:
+    """
+    Build a structural summary of a result.
+    
+    Objects are described by their keys, lists and keyed collections by their
+    length and the shape of their first item, scalars by their type (short
+    values are kept).
+    
+    Args:
+        data: Data to summarize
+        depth: Maximum nesting depth to describe
+        
+    Returns:
+        Summary of the data
+    """
+    if isinstance(data, dict):
+        if depth <= 0:
+            return {"type": "object", "keys": len(data)}
+        if len(data) > 1 and all(isinstance(v, dict) for v in data.values()):
+            # Keyed collection (e.g. services or users by name): describe one entry
+            return {
+                "type": "collection",
+                "length": len(data),
+                "keys": list(data.keys())[:20],
+                "items": summarize(next(iter(data.values())), depth - 1),
+            }
+        return {
+            "type": "object",
+            "keys": len(data),
+            "fields": {key: summarize(value, depth - 1) for key, value in list(data.items())[:50]},
+        }
+    
+    if isinstance(data, list):
+        result: Dict[str, Any] = {"type": "array", "length": len(data)}
+        if data and depth > 0:
+            result["items"] = summarize(data[0], depth - 1)
+        numbers = [v for v in data if isinstance(v, (int, float)) and not isinstance(v, bool)]
+        if numbers and len(numbers) == len(data):
+            result["min"] = min(numbers)
+            result["max"] = max(numbers)
+        return result
+    
+    if isinstance(data, str) and len(data) > 80:
+        return {"type": "string", "length": len(data)}
+    
+    return data
+
+def get_compaction_stats() -> Dict[str, int]:
+    """
+    Get running totals of compacted responses.
+    
+    Returns:
+        Number of compacted responses and their total sizes before and after
+    """
+    return dict(_compaction_stats)
+
+def _payload_size(data: Any) -> int:
+    """Size in bytes of `data` once serialized as JSON."""
+    return len(json_dumps(data).encode())
+
 def format_response(data: Any) -> Dict[str, Any]:
     """
     Format tool response data consistently.
@@ -95,12 +407,122 @@ def format_response(data: Any) -> Dict[str, Any]:
     if isinstance(data, dict) and "error" in data:
         # Already formatted error
         return data
+    
+    if isinstance(data, RawJSON):
+        # Wrap the serialized response without parsing it
+        return RawJSON(f'{{"success":true,"data":{data}}}')
         
     return {
         "success": True,
         "data": data
     }
 
+async def gather_limited(aws: Iterable[Awaitable[Any]], limit: int) -> List[Any]:
+    """
+    Await several awaitables with at most `limit` running at once.
+    
+    Exceptions are returned in place of results rather than raised, so one
+    failure does not discard the other results.
+    
+    Args:
+        aws: Awaitables to run
+        limit: Maximum number running concurrently
+        
+    Returns:
+        Results (or exceptions) in the order of `aws`
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+    
+    async def run(aw: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await aw
+    
+    return await asyncio.gather(*(run(aw) for aw in aws), return_exceptions=True)
+
+def background_task(func: T) -> T:
+    """
+    Decorator registering a coroutine function to run in the background.
+    
+    Registered tasks are started by `start_background_tasks()` once the tools
+    are loaded (see main.py) and cancelled by `stop_background_tasks()`.
+    
+    Args:
+        func: Coroutine function taking no arguments
+        
+    Returns:
+        The function, unchanged
+    """
+    _background_tasks.append(func)
+    return func
+
+async def start_background_tasks() -> List[str]:
+    """
+    Start all registered background tasks.
+    
+    Returns:
+        Names of the started tasks
+    """
+    for func in _background_tasks:
+        _running_tasks.append(asyncio.create_task(func(), name=func.__qualname__))
+    return [task.get_name() for task in _running_tasks]
+
+async def stop_background_tasks():
+    """Cancel all running background tasks and wait for them to finish."""
+    for task in _running_tasks:
+        task.cancel()
+    await asyncio.gather(*_running_tasks, return_exceptions=True)
+    _running_tasks.clear()
+
+async def run_periodically(name: str, interval: float, func: Callable[[], Awaitable[Any]]):
+    """
+    Call `func` every `interval` seconds until cancelled, logging failures.
+    
+    Args:
+        name: Name used in log messages
+        interval: Seconds between calls; nothing runs if not positive
+        func: Coroutine function to call
+    """
+    if interval <= 0:
+        logger.info(f"Background task {name} disabled")
+        return
+    
+    logger.info(f"Background task {name} running every {interval}s")
+    while True:
+        try:
+            await func()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Background task {name} failed: {str(e)}")
+        await asyncio.sleep(interval)
+
+def data_path(*parts: str) -> str:
+    """
+    Path of a file in the local data directory, creating its parent directories.
+    
+    Args:
+        parts: Path components below `settings.DATA_DIR`
+        
+    Returns:
+        Absolute path
+    """
+    path = os.path.abspath(os.path.join(settings.DATA_DIR, *parts))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+async def list_usernames() -> List[str]:
+    """
+    List all user accounts on the server.
+    
+    Returns:
+        Usernames, in the order returned by DirectAdmin
+    """
+    response = await call_da_api("/CMD_API_SHOW_ALL_USERS", method="GET", data={"json": "yes"})
+    if isinstance(response, dict):
+        # Legacy list format: {"list": [...]} or {"0": "user", "1": ...}
+        response = response.get("list", list(response.values()))
+    return [str(username) for username in response if username]
+
 def parse_args(args_str: str) -> Dict[str, Any]:
     """
     Parse string arguments into a dictionary.
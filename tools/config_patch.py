@@ -0,0 +1,214 @@
+"""
+MCP tools for transactional configuration changes.
+
+A set of changes to directadmin.conf or the CustomBuild options is applied
+in one PATCH after snapshotting the current values, verified by reading the
+configuration back (and validating CustomBuild options), and rolled back
+automatically when verification fails.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from da import call_da_api
+from mcp_instance import mcp
+from tools.common import log_tool_call, format_response
+from tools.custombuild_planner import invalidate_cache
+from tools.directadmin_config import CONF_PATH, conf_values
+
+logger = logging.getLogger(__name__)
+
+
+def _same(current: Any, wanted: Any) -> bool:
+    """Whether two config values are equal as DirectAdmin stores them."""
+    if isinstance(wanted, bool):
+        wanted = "yes" if wanted else "no"
+    return str(current) == str(wanted)
+
+
+def validation_errors(response: Any) -> List[Any]:
+    """
+    Problems reported by `/api/custombuild/options/validate`.
+
+    Args:
+        response: Validation response
+
+    Returns:
+        Error messages, empty when the options are valid
+    """
+    if isinstance(response, list):
+        return response
+    if not isinstance(response, dict):
+        return []
+    errors = response.get("errors") or response.get("issues") or response.get("error") or []
+    if not isinstance(errors, list):
+        errors = [errors]
+    if response.get("valid") is False and not errors:
+        errors = [response.get("message") or "Options are not valid"]
+    return errors
+
+
+class DirectAdminConf:
+    """directadmin.conf local overrides."""
+
+    name = "directadmin_conf"
+
+    def __init__(self, skip_unknown: bool):
+        self.skip_unknown = skip_unknown
+
+    async def read(self) -> Dict[str, Any]:
+        return conf_values(await call_da_api(f"{CONF_PATH}/local", method="GET"))
+
+    async def apply(self, changes: Dict[str, Any]):
+        await call_da_api(f"{CONF_PATH}/local", method="PATCH", data={"skip-unknown": self.skip_unknown, "data": changes})
+
+    async def validate(self) -> List[Any]:
+        return []
+
+    def skipped(self, changes: Dict[str, Any], snapshot: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+        # With skip-unknown, DirectAdmin drops unknown new keys instead of failing
+        if not self.skip_unknown:
+            return []
+        return [key for key in changes if key not in snapshot and key not in current]
+
+    async def restore(self, snapshot: Dict[str, Any], changes: Dict[str, Any]):
+        # Replacing the whole local config also drops overrides the patch added
+        await call_da_api(f"{CONF_PATH}/local", method="PUT", data={"skip-unknown": True, "data": snapshot})
+
+
+class CustomBuildOptions:
+    """CustomBuild options."""
+
+    name = "custombuild_options"
+
+    async def read(self) -> Dict[str, Any]:
+        return conf_values(await call_da_api("/api/custombuild/options", method="GET"))
+
+    async def apply(self, changes: Dict[str, Any]):
+        await call_da_api("/api/custombuild/options", method="PATCH", data=changes)
+
+    async def validate(self) -> List[Any]:
+        return validation_errors(await call_da_api("/api/custombuild/options/validate", method="GET"))
+
+    def skipped(self, changes: Dict[str, Any], snapshot: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+        return []
+
+    async def restore(self, snapshot: Dict[str, Any], changes: Dict[str, Any]):
+        await call_da_api(
+            "/api/custombuild/options",
+            method="PATCH",
+            data={key: snapshot[key] for key in changes if key in snapshot},
+        )
+
+
+TARGETS = {"directadmin_conf": DirectAdminConf, "custombuild_options": CustomBuildOptions}
+
+
+async def apply_transaction(target: Any, changes: Dict[str, Any], snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply changes, verify them and roll back on any failure.
+
+    Args:
+        target: DirectAdminConf or CustomBuildOptions
+        changes: Keys and new values, all different from the snapshot
+        snapshot: Values before the change
+
+    Returns:
+        Status ("applied" or "rolled_back") with the reason and rollback
+        outcome, and the keys the target skipped as unknown
+    """
+    reason: Optional[str] = None
+    details: Dict[str, Any] = {}
+    try:
+        await target.apply(changes)
+        current = await target.read()
+        skipped = target.skipped(changes, snapshot, current)
+        if skipped:
+            details["skipped"] = skipped
+        mismatched = {
+            key: {"wanted": value, "actual": current.get(key)}
+            for key, value in changes.items()
+            if key not in skipped and not _same(current.get(key), value)
+        }
+        errors = await target.validate()
+        if mismatched:
+            reason = "verification failed"
+            details["mismatched"] = mismatched
+        elif errors:
+            reason = "validation failed"
+            details["validation"] = errors
+    except Exception as e:
+        reason = f"apply failed: {str(e)}"
+
+    if reason is None:
+        return {"status": "applied", **details}
+
+    logger.warning(f"Rolling back {target.name} change ({reason}): {', '.join(changes)}")
+    result: Dict[str, Any] = {"status": "rolled_back", "reason": reason, **details}
+    try:
+        await target.restore(snapshot, changes)
+        restored = await target.read()
+        not_restored = [key for key in changes if not _same(restored.get(key), snapshot.get(key, restored.get(key)))]
+        not_restored += [key for key in changes if key not in snapshot and key in restored]
+        result["rollback"] = "verified" if not not_restored else "incomplete"
+        if not_restored:
+            result["not_restored"] = not_restored
+    except Exception as e:
+        result["rollback"] = f"failed: {str(e)}"
+    return result
+
+
+@mcp.tool()
+@log_tool_call
+async def config_patch_apply(
+    target: str,
+    changes: Dict[str, Any],
+    skip_unknown: bool = False,
+    dry_run: bool = False
+):
+    """
+    Apply several config changes as one transaction with automatic rollback.
+
+    The current values are snapshotted, all changes are sent in one PATCH,
+    the configuration is read back to verify every value (and CustomBuild
+    options are validated). If anything fails, the snapshot is restored and
+    the restore is verified too.
+
+    Args:
+        target: "directadmin_conf" (local overrides) or "custombuild_options"
+        changes: Keys and their new values
+        skip_unknown: Ignore keys DirectAdmin does not know (directadmin_conf only);
+            they are listed as "skipped" instead of failing verification
+        dry_run: Only report what would change
+
+    Returns:
+        Status ("applied", "rolled_back", "unchanged" or "dry_run") and the changes with old and new values
+    """
+    if target not in TARGETS:
+        return {"error": True, "message": f"Unknown target: {target}", "targets": list(TARGETS)}
+    if not changes:
+        return {"error": True, "message": "No changes given"}
+
+    handler = DirectAdminConf(skip_unknown) if target == "directadmin_conf" else CustomBuildOptions()
+    started = time.perf_counter()
+    snapshot = await handler.read()
+
+    if target == "custombuild_options":
+        unknown = [key for key in changes if key not in snapshot]
+        if unknown:
+            return {"error": True, "message": "Unknown CustomBuild options", "unknown": unknown}
+
+    pending = {key: value for key, value in changes.items() if not _same(snapshot.get(key), value) or key not in snapshot}
+    diff = {key: {"old": snapshot.get(key), "new": value} for key, value in pending.items()}
+    report: Dict[str, Any] = {"target": target, "changes": diff, "unchanged": [key for key in changes if key not in pending]}
+
+    if dry_run or not pending:
+        report["status"] = "dry_run" if dry_run else "unchanged"
+        return format_response(report)
+
+    report.update(await apply_transaction(handler, pending, snapshot))
+    if target == "custombuild_options":
+        invalidate_cache("options")
+    report["elapsed_s"] = round(time.perf_counter() - started, 3)
+    return format_response(report)
@@ -22,7 +22,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/cpanel-import/check-remote", method="POST", data=payload)
+    response = await call_da_api(f"/api/cpanel-import/check-remote", method="POST", data=payload, raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -34,7 +34,7 @@ List all cPanel import tasks
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/cpanel-import/tasks", method="GET")
+    response = await call_da_api(f"/api/cpanel-import/tasks", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -49,7 +49,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/cpanel-import/tasks/start", method="POST", data=payload)
+    response = await call_da_api(f"/api/cpanel-import/tasks/start", method="POST", data=payload, raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -64,7 +64,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/cpanel-import/tasks/{id}", method="GET")
+    response = await call_da_api(f"/api/cpanel-import/tasks/{id}", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -79,7 +79,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/cpanel-import/tasks/{id}", method="DELETE")
+    response = await call_da_api(f"/api/cpanel-import/tasks/{id}", method="DELETE", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -94,7 +94,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/cpanel-import/tasks/{id}/log", method="GET")
+    response = await call_da_api(f"/api/cpanel-import/tasks/{id}/log", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -110,5 +110,5 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/cpanel-import/tasks/{id}/log-sse", method="GET")
+    response = await call_da_api(f"/api/cpanel-import/tasks/{id}/log-sse", method="GET", raw=True)
     return format_response(response)
\ No newline at end of file
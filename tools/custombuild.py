@@ -4,11 +4,14 @@ MCP tools for DirectAdmin CustomBuild management.
 
 import logging
 from mcp_instance import mcp
-from da import call_da_api
+from da import call_da_api, stream_da_sse
 from tools.common import log_tool_call, format_response
 
 logger = logging.getLogger(__name__)
 
+# Seconds without a new line after which a log stream is considered caught up
+SSE_IDLE_TIMEOUT = 2.0
+
 
 @mcp.tool()
 @log_tool_call
@@ -19,7 +22,7 @@ Get available custombuild actions
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/actions", method="GET")
+    response = await call_da_api(f"/api/custombuild/actions", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -31,7 +34,7 @@ Get all custombuild's apps' compile scripts metadata
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/compile-scripts", method="GET")
+    response = await call_da_api(f"/api/custombuild/compile-scripts", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -46,7 +49,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/compile-scripts-custom/{app}", method="GET")
+    response = await call_da_api(f"/api/custombuild/compile-scripts-custom/{app}", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -62,7 +65,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/compile-scripts-custom/{app}", method="PUT", data=payload)
+    response = await call_da_api(f"/api/custombuild/compile-scripts-custom/{app}", method="PUT", data=payload, raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -77,7 +80,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/compile-scripts-custom/{app}", method="DELETE")
+    response = await call_da_api(f"/api/custombuild/compile-scripts-custom/{app}", method="DELETE", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -92,7 +95,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/compile-scripts/{app}", method="GET")
+    response = await call_da_api(f"/api/custombuild/compile-scripts/{app}", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -104,7 +107,7 @@ Kill custombuild
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/kill", method="POST")
+    response = await call_da_api(f"/api/custombuild/kill", method="POST", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -116,7 +119,7 @@ Get all custombuild log files metadata
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/logs", method="GET")
+    response = await call_da_api(f"/api/custombuild/logs", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -131,7 +134,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/logs/{logname}", method="DELETE")
+    response = await call_da_api(f"/api/custombuild/logs/{logname}", method="DELETE", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -147,10 +150,15 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    headers = {}
-    headers["Last-Event-Id"] = last_event_id
-    response = await call_da_api(f"/api/custombuild/logs/{logname}/sse", method="GET", headers=headers)
-    return format_response(response)
+    lines = []
+    async for event in stream_da_sse(
+        f"/api/custombuild/logs/{logname}/sse",
+        last_event_id=last_event_id,
+        idle_timeout=SSE_IDLE_TIMEOUT
+    ):
+        lines.append(event["data"])
+        last_event_id = event["id"] or last_event_id
+    return format_response({"lines": lines, "last_event_id": last_event_id})
 
 @mcp.tool()
 @log_tool_call
@@ -161,7 +169,7 @@ Get custombuild options
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/options", method="GET")
+    response = await call_da_api(f"/api/custombuild/options", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -176,7 +184,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/options", method="PATCH", data=payload)
+    response = await call_da_api(f"/api/custombuild/options", method="PATCH", data=payload, raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -188,7 +196,7 @@ Get custombuild options
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/options-v2", method="GET")
+    response = await call_da_api(f"/api/custombuild/options-v2", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -203,7 +211,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/options-v2", method="PATCH", data=payload)
+    response = await call_da_api(f"/api/custombuild/options-v2", method="PATCH", data=payload, raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -215,7 +223,7 @@ Get custombuild options validation message
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/options/validate", method="GET")
+    response = await call_da_api(f"/api/custombuild/options/validate", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -227,7 +235,7 @@ List of custombuild commands to remove no longer needed software
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/removals", method="GET")
+    response = await call_da_api(f"/api/custombuild/removals", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -242,7 +250,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/run", method="POST", data=payload)
+    response = await call_da_api(f"/api/custombuild/run", method="POST", data=payload, raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -254,7 +262,7 @@ Get available custombuild software
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/software", method="GET")
+    response = await call_da_api(f"/api/custombuild/software", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -266,7 +274,7 @@ Get custombuild state
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/state", method="GET")
+    response = await call_da_api(f"/api/custombuild/state", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -278,7 +286,7 @@ Get custombuild state stream
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/state/sse", method="GET")
+    response = await call_da_api(f"/api/custombuild/state/sse", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -290,7 +298,7 @@ Get available custombuild updates
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/updates", method="GET")
+    response = await call_da_api(f"/api/custombuild/updates", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -302,7 +310,7 @@ Get all custombuild's apps default versions
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/versions", method="GET")
+    response = await call_da_api(f"/api/custombuild/versions", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -314,7 +322,7 @@ Get all custombuild's apps custom versions
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/versions-custom", method="GET")
+    response = await call_da_api(f"/api/custombuild/versions-custom", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -330,7 +338,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/versions-custom/{app}", method="PUT", data=payload)
+    response = await call_da_api(f"/api/custombuild/versions-custom/{app}", method="PUT", data=payload, raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -345,5 +353,5 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/custombuild/versions-custom/{app}", method="DELETE")
+    response = await call_da_api(f"/api/custombuild/versions-custom/{app}", method="DELETE", raw=True)
     return format_response(response)
\ No newline at end of file
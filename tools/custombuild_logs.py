@@ -0,0 +1,505 @@
+"""
+MCP tools for the local CustomBuild log archive.
+
+Completed CustomBuild logs are downloaded once and appended to a compressed
+archive in the data directory, in gzip chunks of a fixed number of lines. A
+SQLite index keeps each chunk's offset, the lines every word appears on and
+the error lines found while ingesting, so searches and error extraction only
+decompress the chunks they need and never download a log again.
+"""
+
+import asyncio
+import gzip
+import logging
+import os
+import re
+import sqlite3
+import time
+from array import array
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from config import settings
+from mcp_instance import mcp
+from da import call_da_api, json_dumps, json_loads, stream_da_sse
+from tools.common import (
+    background_task,
+    data_path,
+    format_response,
+    gather_limited,
+    log_tool_call,
+    run_periodically,
+    server_account_only,
+)
+
+logger = logging.getLogger(__name__)
+
+# Lines per gzip member; a search decompresses only the chunks with candidate lines
+CHUNK_LINES = 1000
+# Error lines kept per log
+MAX_ERRORS_PER_LOG = 200
+# Logs downloaded at once while syncing
+FETCH_CONCURRENCY = 2
+# Seconds without a new line after which a log stream that stays open is given up on
+STREAM_IDLE_TIMEOUT = 10.0
+
+_WORD = re.compile(r"[a-z0-9_][a-z0-9_.+-]{2,}")
+_WORD_CHARS = set("abcdefghijklmnopqrstuvwxyz0123456789_.+-")
+_ERROR = re.compile(
+    r"\berror\b|\bfailed\b|\bfatal\b|\bcannot\b|undefined reference|no such file or directory|segmentation fault|^\*\*\*",
+    re.IGNORECASE,
+)
+_NOT_ERROR = re.compile(r"-W(no-)?error|\berror\.[cho]\b|\b0 errors?\b|^checking ", re.IGNORECASE)
+
+
+def is_error_line(line: str) -> bool:
+    """Whether a build log line reports an error (compiler flags and configure checks excluded)."""
+    return bool(_ERROR.search(line)) and not _NOT_ERROR.search(line)
+
+
+def _words(text: str) -> Set[str]:
+    """Index words of a line: lowercase runs of at least three word characters."""
+    return set(_WORD.findall(text.lower()))
+
+
+def _index_words(needle: str) -> List[str]:
+    """
+    Words of a lowercase substring query that the keyword index can look up.
+
+    The index holds whole words and is searched by prefix, so a query word is
+    only usable when it starts a word in every matching line: it must follow
+    a separator inside the query. A leading word may begin mid-word ("ailed"
+    in "failed") and is left to the scan.
+    """
+    return [
+        match.group()
+        for match in _WORD.finditer(needle)
+        if match.start() > 0 and needle[match.start() - 1] not in _WORD_CHARS
+    ]
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """UNIX timestamp from a number or an ISO 8601 string."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _log_size(entry: Dict[str, Any]) -> Optional[int]:
+    """Size in bytes of a log from its listing entry, if reported."""
+    for key in ("size", "bytes"):
+        try:
+            return int(entry[key])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
+
+def _log_modified(entry: Dict[str, Any]) -> Optional[float]:
+    """Modification time of a log from its listing entry, if reported."""
+    return parse_timestamp(entry.get("modified") or entry.get("mtime"))
+
+
+def listing_entries(listing: Any) -> List[Dict[str, Any]]:
+    """Log metadata entries of a `/api/custombuild/logs` response."""
+    if isinstance(listing, dict):
+        listing = next((v for v in listing.values() if isinstance(v, list)), list(listing.values()))
+    return [entry for entry in listing if isinstance(entry, dict)] if isinstance(listing, list) else []
+
+
+class LogArchive:
+    """Append-only compressed archive of CustomBuild logs with a SQLite index."""
+
+    def __init__(self, archive_path: str, index_path: str):
+        self.archive_path = archive_path
+        self.index_path = index_path
+        self.lock = asyncio.Lock()
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS logs ("
+                "name TEXT PRIMARY KEY, lines INTEGER NOT NULL, bytes INTEGER NOT NULL, "
+                "errors INTEGER NOT NULL, meta TEXT, ingested_at REAL NOT NULL)"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                "log TEXT NOT NULL, chunk INTEGER NOT NULL, offset INTEGER NOT NULL, length INTEGER NOT NULL, "
+                "PRIMARY KEY (log, chunk)) WITHOUT ROWID"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS keywords ("
+                "log TEXT NOT NULL, word TEXT NOT NULL, lines BLOB NOT NULL, "
+                "PRIMARY KEY (log, word)) WITHOUT ROWID"
+            )
+            db.execute("CREATE TABLE IF NOT EXISTS errors (log TEXT NOT NULL, line INTEGER NOT NULL, text TEXT NOT NULL)")
+            db.execute("CREATE INDEX IF NOT EXISTS errors_log ON errors (log, line)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # sqlite3's own context manager only commits; the connection is closed here
+        db = sqlite3.connect(self.index_path)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def names(self) -> List[str]:
+        """Archived logs, most recently ingested first."""
+        with self._connect() as db:
+            return [row[0] for row in db.execute("SELECT name FROM logs ORDER BY ingested_at DESC, name DESC")]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Archived logs with their size and error count, most recently ingested first."""
+        with self._connect() as db:
+            rows = db.execute("SELECT name, lines, bytes, errors, ingested_at FROM logs ORDER BY ingested_at DESC, name DESC")
+            return [
+                {"name": name, "lines": lines, "bytes": size, "errors": errors, "ingested_at": ingested_at}
+                for name, lines, size, errors, ingested_at in rows
+            ]
+
+    def metadata(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Archived log name -> its listing entry when it was archived."""
+        with self._connect() as db:
+            return {name: json_loads(meta) if meta else None for name, meta in db.execute("SELECT name, meta FROM logs")}
+
+    def listing(self) -> List[Dict[str, Any]]:
+        """Log metadata (as listed by DirectAdmin) of every archived log."""
+        with self._connect() as db:
+            return [json_loads(meta) for (meta,) in db.execute("SELECT meta FROM logs WHERE meta IS NOT NULL")]
+
+    def store(self, name: str, lines: List[str], meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Append a log to the archive and index it.
+
+        Args:
+            name: Log file name
+            lines: Log lines
+            meta: Log metadata from the DirectAdmin listing
+
+        Returns:
+            Number of lines, compressed bytes and error lines
+        """
+        postings: Dict[str, array] = {}
+        errors = []
+        for number, line in enumerate(lines, 1):
+            for word in _words(line):
+                postings.setdefault(word, array("I")).append(number)
+            if len(errors) < MAX_ERRORS_PER_LOG and is_error_line(line):
+                errors.append((name, number, line[:1000]))
+
+        chunks = []
+        with open(self.archive_path, "ab") as archive:
+            offset = archive.seek(0, os.SEEK_END)
+            for chunk, start in enumerate(range(0, len(lines), CHUNK_LINES)):
+                data = gzip.compress("\n".join(lines[start:start + CHUNK_LINES]).encode(), compresslevel=6)
+                archive.write(data)
+                chunks.append((name, chunk, offset, len(data)))
+                offset += len(data)
+
+        with self._connect() as db:
+            for table in ("chunks", "keywords", "errors"):
+                db.execute(f"DELETE FROM {table} WHERE log = ?", (name,))
+            db.executemany("INSERT INTO chunks (log, chunk, offset, length) VALUES (?, ?, ?, ?)", chunks)
+            db.executemany(
+                "INSERT INTO keywords (log, word, lines) VALUES (?, ?, ?)",
+                ((name, word, numbers.tobytes()) for word, numbers in postings.items()),
+            )
+            db.executemany("INSERT INTO errors (log, line, text) VALUES (?, ?, ?)", errors)
+            db.execute(
+                "INSERT OR REPLACE INTO logs (name, lines, bytes, errors, meta, ingested_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (name, len(lines), sum(c[3] for c in chunks), len(errors), json_dumps(meta) if meta else None, time.time()),
+            )
+        return {"lines": len(lines), "bytes": sum(c[3] for c in chunks), "errors": len(errors)}
+
+    def _read_chunk(self, db: sqlite3.Connection, log: str, chunk: int) -> List[str]:
+        row = db.execute("SELECT offset, length FROM chunks WHERE log = ? AND chunk = ?", (log, chunk)).fetchone()
+        if row is None:
+            return []
+        with open(self.archive_path, "rb") as archive:
+            archive.seek(row[0])
+            return gzip.decompress(archive.read(row[1])).decode(errors="replace").split("\n")
+
+    def read_lines(self, log: str, numbers: Iterable[int]) -> Dict[int, str]:
+        """
+        Read some lines of an archived log, decompressing only their chunks.
+
+        Args:
+            log: Log name
+            numbers: 1-based line numbers
+
+        Returns:
+            Line number -> text, for the lines that exist
+        """
+        wanted: Dict[int, List[int]] = {}
+        for number in numbers:
+            if number >= 1:
+                wanted.setdefault((number - 1) // CHUNK_LINES, []).append(number)
+        result = {}
+        with self._connect() as db:
+            for chunk, chunk_numbers in wanted.items():
+                lines = self._read_chunk(db, log, chunk)
+                for number in chunk_numbers:
+                    position = number - 1 - chunk * CHUNK_LINES
+                    if position < len(lines):
+                        result[number] = lines[position]
+        return result
+
+    def candidates(self, log: str, words: List[str]) -> Optional[Set[int]]:
+        """
+        Lines of a log containing every word (as a word prefix), from the keyword index.
+
+        Returns:
+            Line numbers, or None when the words cannot narrow the search
+        """
+        if not words:
+            return None
+        found: Optional[Set[int]] = None
+        with self._connect() as db:
+            for word in words:
+                lines: Set[int] = set()
+                rows = db.execute(
+                    "SELECT lines FROM keywords WHERE log = ? AND word >= ? AND word < ?",
+                    (log, word, word + "￿"),
+                )
+                for (blob,) in rows:
+                    numbers = array("I")
+                    numbers.frombytes(blob)
+                    lines.update(numbers)
+                found = lines if found is None else found & lines
+                if not found:
+                    return set()
+        return found
+
+    def scan(self, log: str, match: Callable[[str], Any], candidates: Optional[Set[int]], limit: int) -> List[int]:
+        """Line numbers of a log matching `match`, checking only `candidates` when given."""
+        matches = []
+        with self._connect() as db:
+            if candidates is None:
+                chunks = [row[0] for row in db.execute("SELECT chunk FROM chunks WHERE log = ? ORDER BY chunk", (log,))]
+            else:
+                chunks = sorted({(number - 1) // CHUNK_LINES for number in candidates})
+            for chunk in chunks:
+                for position, line in enumerate(self._read_chunk(db, log, chunk)):
+                    number = chunk * CHUNK_LINES + position + 1
+                    if (candidates is None or number in candidates) and match(line):
+                        matches.append(number)
+                        if len(matches) >= limit:
+                            return matches
+        return matches
+
+    def errors(self, log: str, limit: int) -> List[Dict[str, Any]]:
+        """Error lines found while ingesting a log."""
+        with self._connect() as db:
+            rows = db.execute("SELECT line, text FROM errors WHERE log = ? ORDER BY line LIMIT ?", (log, limit))
+            return [{"line": line, "text": text} for line, text in rows]
+
+    async def fetch(self, name: str) -> Tuple[List[str], bool]:
+        """
+        Download a whole log through its SSE stream.
+
+        Returns:
+            The lines, and whether the stream was closed by the server (rather
+            than given up on after STREAM_IDLE_TIMEOUT seconds without a line)
+        """
+        lines: List[str] = []
+        last = time.monotonic()
+        async for event in stream_da_sse(f"/api/custombuild/logs/{name}/sse", idle_timeout=STREAM_IDLE_TIMEOUT):
+            lines.extend(event["data"].split("\n"))
+            last = time.monotonic()
+        return lines, time.monotonic() - last < STREAM_IDLE_TIMEOUT
+
+    async def sync(self) -> Dict[str, Any]:
+        """
+        Ingest completed logs that are not archived yet.
+
+        A log counts as completed once it has not been modified for
+        CUSTOMBUILD_LOG_SETTLE seconds (when the listing reports modification
+        times). Archived logs whose listed size or modification time changed
+        are downloaded again.
+
+        A download is only archived when the server closed the stream, or when
+        the stream went idle on a settled log and at least its listed size was
+        received; anything else is retried on the next sync.
+
+        Returns:
+            Ingested, in-progress and failed logs
+        """
+        async with self.lock:
+            entries = listing_entries(await call_da_api("/api/custombuild/logs", method="GET"))
+            archived = self.metadata()
+            now = time.time()
+
+            new, in_progress = [], []
+            for entry in entries:
+                name = str(entry.get("name") or entry.get("file") or "")
+                if not name:
+                    continue
+                if name in archived:
+                    known = archived[name] or {}
+                    if (_log_size(entry), _log_modified(entry)) == (_log_size(known), _log_modified(known)):
+                        continue
+                modified = _log_modified(entry)
+                if modified is not None and now - modified < settings.CUSTOMBUILD_LOG_SETTLE:
+                    in_progress.append(name)
+                else:
+                    new.append((name, entry))
+
+            downloads = await gather_limited((self.fetch(name) for name, _ in new), FETCH_CONCURRENCY)
+            ingested, failed = {}, {}
+            for (name, entry), download in zip(new, downloads):
+                if isinstance(download, Exception):
+                    failed[name] = str(download)
+                    continue
+                lines, closed = download
+                if not closed:
+                    size = _log_size(entry)
+                    # Lines plus their newlines; the last line may lack one
+                    received = sum(len(line.encode()) for line in lines) + len(lines)
+                    if (size is None and _log_modified(entry) is None) or (size is not None and received + 1 < size):
+                        failed[name] = f"Stream stalled for {STREAM_IDLE_TIMEOUT}s before the end of the log"
+                        continue
+                ingested[name] = self.store(name, lines, entry)
+
+            if ingested:
+                logger.info(f"Archived {len(ingested)} CustomBuild logs")
+            return {"ingested": ingested, "in_progress": in_progress, "failed": failed}
+
+
+archive = LogArchive(data_path("custombuild_logs", "archive.gz"), data_path("custombuild_logs", "index.sqlite3"))
+
+
+def _with_context(log: str, numbers: List[int], context: int) -> List[Dict[str, Any]]:
+    """Matched lines of a log with `context` lines around each."""
+    wanted = {n + offset for n in numbers for offset in range(-context, context + 1)}
+    lines = archive.read_lines(log, wanted)
+    results = []
+    for number in numbers:
+        result: Dict[str, Any] = {"log": log, "line": number, "text": lines.get(number, "")}
+        if context:
+            result["context"] = [
+                [n, lines[n]] for n in range(number - context, number + context + 1) if n != number and n in lines
+            ]
+        results.append(result)
+    return results
+
+
+@background_task
+async def sync_custombuild_logs():
+    """Background loop archiving completed CustomBuild logs."""
+    await run_periodically("CustomBuild log archive sync", settings.CUSTOMBUILD_LOG_SYNC_INTERVAL, archive.sync)
+
+
+@mcp.tool()
+@log_tool_call
+@server_account_only
+async def custombuild_logs_sync():
+    """
+    Archive completed CustomBuild logs now.
+
+    Logs are downloaded once, compressed and indexed locally; this also runs
+    in the background every CUSTOMBUILD_LOG_SYNC_INTERVAL seconds.
+
+    Returns:
+        Newly ingested, in-progress and failed logs, and all archived logs
+    """
+    result = await archive.sync()
+    result["archived"] = archive.summary()
+    return format_response(result)
+
+
+@mcp.tool()
+@log_tool_call
+@server_account_only
+async def custombuild_logs_search(
+    query: str,
+    log: Optional[str] = None,
+    regex: bool = False,
+    context: int = 0,
+    max_matches: int = 100
+):
+    """
+    Search the archived CustomBuild logs like grep.
+
+    Plain queries are matched case-insensitively as substrings; words of the
+    query that follow a separator narrow the search to candidate lines through
+    the keyword index, other queries scan the whole logs. Regular expressions
+    scan the whole logs.
+
+    Args:
+        query: Text (or regular expression) to find
+        log: Only search this log (default: all archived logs, newest first)
+        regex: Treat `query` as a regular expression
+        context: Lines of context before and after each match
+        max_matches: Maximum number of matches returned
+
+    Returns:
+        Matching lines with log name, line number and optional context
+    """
+    if regex:
+        try:
+            match = re.compile(query, re.IGNORECASE).search
+        except re.error as e:
+            return {"error": True, "message": f"Invalid regular expression: {str(e)}"}
+        words: List[str] = []
+    else:
+        needle = query.lower()
+        match = lambda line: needle in line.lower()
+        words = _index_words(needle)
+
+    logs = [log] if log else archive.names()
+    results: List[Dict[str, Any]] = []
+    for name in logs:
+        remaining = max_matches - len(results)
+        if remaining <= 0:
+            break
+        numbers = archive.scan(name, match, archive.candidates(name, words), remaining)
+        results.extend(_with_context(name, numbers, max(0, context)))
+
+    return format_response({
+        "query": query,
+        "logs_searched": len(logs),
+        "matches": len(results),
+        "truncated": len(results) >= max_matches,
+        "results": results,
+    })
+
+
+@mcp.tool()
+@log_tool_call
+@server_account_only
+async def custombuild_logs_errors(log: Optional[str] = None, context: int = 2, limit: int = 50):
+    """
+    Get the error lines of an archived CustomBuild log.
+
+    Errors (compiler and linker errors, failed steps, missing files) are
+    extracted when a log is archived, so this never reads the whole log.
+
+    Args:
+        log: Log name (default: the most recently archived log)
+        context: Lines of context before and after each error
+        limit: Maximum number of errors returned
+
+    Returns:
+        Error lines in log order with optional context
+    """
+    names = archive.names()
+    if not names:
+        return {"error": True, "message": "No archived CustomBuild logs, run custombuild_logs_sync first"}
+    log = log or names[0]
+    if log not in names:
+        return {"error": True, "message": f"Log not archived: {log}", "logs": names}
+
+    errors = archive.errors(log, limit)
+    return format_response({
+        "log": log,
+        "errors": len(errors),
+        "results": _with_context(log, [error["line"] for error in errors], max(0, context)),
+    })
@@ -0,0 +1,277 @@
+"""
+MCP tools for planning CustomBuild updates.
+
+The CustomBuild version endpoints are fetched concurrently and joined into a
+single version matrix per software (installed, default, custom, available).
+Parts that only change with CustomBuild updates are cached, and the matrix is
+turned into an ordered rebuild plan with durations estimated from past builds.
+"""
+
+import asyncio
+import logging
+import re
+import statistics
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+from mcp_instance import mcp
+from da import call_da_api
+from tools.common import log_tool_call, format_response, server_account_only
+from tools.custombuild_logs import listing_entries, archive, parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Source name -> (endpoint, cached)
+SOURCES = {
+    "versions": ("/api/custombuild/versions", True),
+    "versions_custom": ("/api/custombuild/versions-custom", True),
+    "software": ("/api/custombuild/software", True),
+    "options": ("/api/custombuild/options", True),
+    "updates": ("/api/custombuild/updates", False),
+}
+
+# Libraries first, then services depending on them, then applications
+BUILD_ORDER = [
+    "openssl", "zlib", "pcre", "pcre2", "libxml2", "libxslt", "icu", "curl", "freetype", "libzip",
+    "imagemagick", "mariadb", "mysql", "apache", "nginx", "nginx_apache", "openlitespeed", "litespeed",
+    "modsecurity", "php", "ioncube", "opcache", "redis", "imagick", "exim", "dovecot", "pigeonhole",
+    "spamassassin", "rspamd", "clamav", "pureftpd", "proftpd", "phpmyadmin", "roundcube", "awstats",
+]
+
+# Seconds assumed for a build when no past build log says otherwise
+DEFAULT_BUILD_SECONDS = 300
+KNOWN_BUILD_SECONDS = {"php": 900, "mariadb": 1200, "mysql": 1200, "imagemagick": 600, "apache": 300, "openssl": 180}
+
+_INSTALLED_KEYS = ("installed", "current", "current_version", "installed_version")
+_AVAILABLE_KEYS = ("available", "new", "latest", "available_version", "new_version", "update")
+_DEFAULT_KEYS = ("version", "default", "default_version")
+_NAME_KEYS = ("name", "software", "app", "id")
+_START_KEYS = ("created", "start", "started", "ctime", "birthtime")
+_END_KEYS = ("modified", "mtime", "end", "finished", "updated")
+
+_cache: Dict[str, Tuple[float, Any]] = {}
+
+
+def invalidate_cache(name: Optional[str] = None):
+    """Drop one cached source (e.g. "options" after changing options), or all of them."""
+    if name is None:
+        _cache.clear()
+    else:
+        _cache.pop(name, None)
+
+
+async def fetch_sources(refresh: bool = False) -> Dict[str, Any]:
+    """
+    Fetch all CustomBuild sources concurrently, serving cached parts from memory.
+
+    Args:
+        refresh: Ignore the cache
+
+    Returns:
+        Source name -> response (or the exception raised for it)
+    """
+    now = time.monotonic()
+    results: Dict[str, Any] = {}
+    to_fetch = []
+    for name, (path, cached) in SOURCES.items():
+        entry = _cache.get(name)
+        if cached and not refresh and entry and entry[0] > now:
+            results[name] = entry[1]
+        else:
+            to_fetch.append(name)
+
+    responses = await asyncio.gather(
+        *(call_da_api(SOURCES[name][0], method="GET") for name in to_fetch),
+        return_exceptions=True,
+    )
+    for name, response in zip(to_fetch, responses):
+        results[name] = response
+        if SOURCES[name][1] and not isinstance(response, Exception):
+            _cache[name] = (now + settings.CUSTOMBUILD_CACHE_TTL, response)
+    return results
+
+
+def _first(entry: Dict[str, Any], keys: tuple) -> Optional[str]:
+    """First non-empty value of `keys` in `entry`, as a string."""
+    return next((str(entry[key]) for key in keys if entry.get(key) not in (None, "")), None)
+
+
+def index_by_name(response: Any) -> Dict[str, Any]:
+    """
+    Index a CustomBuild response by software name.
+
+    Lists of objects are keyed by their name field, objects by their keys.
+    """
+    if isinstance(response, dict) and "data" in response and len(response) <= 2:
+        response = response["data"]
+    if isinstance(response, list):
+        return {
+            name: item
+            for item in response if isinstance(item, dict)
+            for name in [_first(item, _NAME_KEYS)] if name
+        }
+    return dict(response) if isinstance(response, dict) else {}
+
+
+def build_matrix(sources: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Join the CustomBuild sources into one row per software.
+
+    Args:
+        sources: Responses by source name (failed sources are skipped)
+
+    Returns:
+        Software name -> installed, default, custom and available versions
+    """
+    indexed = {
+        name: index_by_name(response)
+        for name, response in sources.items()
+        if name != "options" and not isinstance(response, Exception)
+    }
+    names = set().union(*indexed.values()) if indexed else set()
+
+    matrix = {}
+    for name in sorted(names):
+        row: Dict[str, Any] = {"installed": None, "default": None, "custom": None, "available": None}
+        for source in ("software", "versions", "updates"):
+            entry = indexed.get(source, {}).get(name)
+            if isinstance(entry, dict):
+                row["installed"] = row["installed"] or _first(entry, _INSTALLED_KEYS)
+                row["available"] = _first(entry, _AVAILABLE_KEYS) or row["available"]
+                if source == "versions":
+                    row["default"] = _first(entry, _DEFAULT_KEYS)
+            elif entry is not None and source == "versions":
+                row["default"] = str(entry)
+        custom = indexed.get("versions_custom", {}).get(name)
+        if custom is not None:
+            row["custom"] = _first(custom, _DEFAULT_KEYS) if isinstance(custom, dict) else str(custom)
+        matrix[name] = row
+    return matrix
+
+
+def _base_name(name: str) -> str:
+    """Software family used for ordering and duration lookups ("php1" -> "php")."""
+    return re.sub(r"\d+$", "", name.lower())
+
+
+def durations_from_logs(listing: Any) -> Dict[str, float]:
+    """
+    Median build duration per software family from the log file metadata.
+
+    A log's duration is the time between its creation and last modification;
+    it is attributed to every software family named in the log file name.
+
+    Args:
+        listing: `/api/custombuild/logs` response
+
+    Returns:
+        Software family -> seconds
+    """
+    samples: Dict[str, List[float]] = {}
+    for entry in listing_entries(listing):
+        name = str(entry.get("name") or entry.get("file") or "").lower()
+        duration = parse_timestamp(entry.get("duration"))
+        if duration is None:
+            start = next((parse_timestamp(entry[k]) for k in _START_KEYS if k in entry), None)
+            end = next((parse_timestamp(entry[k]) for k in _END_KEYS if k in entry), None)
+            duration = end - start if start is not None and end is not None else None
+        if not name or not duration or duration <= 0:
+            continue
+        for token in set(re.split(r"[^a-z0-9]+", name)):
+            samples.setdefault(_base_name(token), []).append(duration)
+    return {family: statistics.median(values) for family, values in samples.items()}
+
+
+def plan_rebuild(matrix: Dict[str, Dict[str, Any]], durations: Dict[str, float]) -> List[Dict[str, Any]]:
+    """
+    Ordered builds needed to reach the wanted versions.
+
+    Software needs a build when an update is available or its custom version
+    differs from the installed one. Builds follow `BUILD_ORDER` so libraries
+    are built before what links against them.
+
+    Args:
+        matrix: Version matrix from `build_matrix`
+        durations: Past build durations by software family
+
+    Returns:
+        Build steps with target version, reason and estimated duration
+    """
+    steps = []
+    for name, row in matrix.items():
+        installed = row["installed"]
+        if row["custom"] and row["custom"] != installed:
+            target, reason = row["custom"], "custom version"
+        elif row["available"] and installed and row["available"] != installed:
+            target, reason = row["available"], "update available"
+        else:
+            continue
+        family = _base_name(name)
+        if family in durations:
+            estimate, source = durations[family], "build logs"
+        else:
+            estimate, source = KNOWN_BUILD_SECONDS.get(family, DEFAULT_BUILD_SECONDS), "default"
+        steps.append({
+            "software": name,
+            "from": installed,
+            "to": target,
+            "reason": reason,
+            "estimated_s": round(estimate),
+            "estimate_source": source,
+        })
+
+    order = {family: position for position, family in enumerate(BUILD_ORDER)}
+    steps.sort(key=lambda step: (order.get(_base_name(step["software"]), len(order)), step["software"]))
+    for position, step in enumerate(steps, 1):
+        step["step"] = position
+    return steps
+
+
+@mcp.tool()
+@log_tool_call
+@server_account_only
+async def custombuild_update_plan(refresh: bool = False, include_matrix: bool = False):
+    """
+    Plan CustomBuild rebuilds from a joined version matrix.
+
+    Versions, custom versions, software, options and updates are fetched
+    concurrently; all but the updates are cached for CUSTOMBUILD_CACHE_TTL.
+    The plan lists the builds needed, in build order, with durations estimated
+    from past build logs.
+
+    Args:
+        refresh: Ignore cached versions, software and options
+        include_matrix: Also return the full version matrix
+
+    Returns:
+        Ordered rebuild plan with estimated total duration
+    """
+    sources, listing = await asyncio.gather(
+        fetch_sources(refresh),
+        call_da_api("/api/custombuild/logs", method="GET"),
+        return_exceptions=True,
+    )
+    if isinstance(sources, Exception):
+        raise sources
+
+    matrix = build_matrix(sources)
+    # Archived logs keep their metadata after DirectAdmin rotates them away
+    live = [] if isinstance(listing, Exception) else listing_entries(listing)
+    names = {entry.get("name") for entry in live}
+    durations = durations_from_logs(live + [entry for entry in archive.listing() if entry.get("name") not in names])
+    steps = plan_rebuild(matrix, durations)
+
+    result: Dict[str, Any] = {
+        "software": len(matrix),
+        "builds": len(steps),
+        "estimated_total_s": sum(step["estimated_s"] for step in steps),
+        "plan": steps,
+    }
+    errors = {name: str(response) for name, response in sources.items() if isinstance(response, Exception)}
+    if errors:
+        result["errors"] = errors
+    if include_matrix:
+        result["matrix"] = matrix
+        result["options"] = index_by_name(sources.get("options")) if not isinstance(sources.get("options"), Exception) else None
+    return format_response(result)
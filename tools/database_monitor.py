@@ -2,13 +2,102 @@
 MCP tools for monitoring database processes in DirectAdmin.
 """
 
+import asyncio
+import fnmatch
+import hashlib
 import logging
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+from config import settings
 from mcp_instance import mcp
 from da import call_da_api
-from tools.common import log_tool_call, format_response
+from tools.common import log_tool_call, format_response, gather_limited
 
 logger = logging.getLogger(__name__)
 
+# Longest sampling run accepted by api_db_monitor_digest, in seconds
+MAX_DIGEST_DURATION = 300
+
+# Server threads that are never killed by policy
+_PROTECTED_USERS = {"system user", "event_scheduler"}
+_PROTECTED_COMMANDS = {"daemon", "binlog dump", "binlog dump gtid"}
+
+# Literal normalization for query fingerprints, applied in order
+_FINGERPRINT_RULES = [
+    (re.compile(r"/\*.*?\*/", re.S), " "),
+    (re.compile(r"'(?:[^'\\]|\\.)*'"), "?"),
+    (re.compile(r'"(?:[^"\\]|\\.)*"'), "?"),
+    (re.compile(r"(--|#)[^\n]*"), " "),
+    (re.compile(r"\b0x[0-9a-f]+\b", re.I), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I), "in (?+)"),
+    (re.compile(r"\bvalues\s*\(.*\)", re.I | re.S), "values (?+)"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def fingerprint_query(query: str) -> str:
+    """
+    Normalize a query by replacing literals, so similar queries group together.
+
+    Args:
+        query: SQL text
+
+    Returns:
+        Lowercased query with literals replaced by `?`
+    """
+    for pattern, replacement in _FINGERPRINT_RULES:
+        query = pattern.sub(replacement, query)
+    return query.strip().lower()
+
+
+def _field(process: Dict[str, Any], *keys: str) -> Any:
+    """First of `keys` present in a process entry (case-insensitive)."""
+    for key in keys:
+        for candidate in (key, key.capitalize(), key.upper()):
+            if process.get(candidate) not in (None, ""):
+                return process[candidate]
+    return None
+
+
+def normalize_processes(response: Any) -> List[Dict[str, Any]]:
+    """
+    Convert a process list response into uniform process entries.
+
+    Args:
+        response: `/api/db-monitor/processes` response
+
+    Returns:
+        Processes with id, user, host, db, command, time, state and query
+    """
+    if isinstance(response, dict):
+        response = next(
+            (v for v in response.values() if isinstance(v, list)),
+            [dict(v, id=k) if isinstance(v, dict) and "id" not in v else v for k, v in response.items()],
+        )
+    processes = []
+    for process in response if isinstance(response, list) else []:
+        if not isinstance(process, dict):
+            continue
+        try:
+            runtime = float(_field(process, "time") or 0)
+        except (TypeError, ValueError):
+            runtime = 0.0
+        processes.append({
+            "id": _field(process, "id"),
+            "user": str(_field(process, "user") or ""),
+            "host": str(_field(process, "host") or ""),
+            "db": str(_field(process, "db", "database") or ""),
+            "command": str(_field(process, "command") or ""),
+            "time": runtime,
+            "state": str(_field(process, "state") or ""),
+            "query": str(_field(process, "info", "query") or ""),
+        })
+    return processes
+
 
 @mcp.tool()
 @log_tool_call
@@ -19,7 +108,7 @@ Get database processes list
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/db-monitor/processes", method="GET")
+    response = await call_da_api(f"/api/db-monitor/processes", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -34,5 +123,244 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/db-monitor/processes/{id}/kill", method="POST")
-    return format_response(response)
\ No newline at end of file
+    response = await call_da_api(f"/api/db-monitor/processes/{id}/kill", method="POST", raw=True)
+    return format_response(response)
+
+class QueryDigest:
+    """Aggregates sampled process lists by query fingerprint, user and database."""
+
+    def __init__(self):
+        self.samples = 0
+        self.fingerprints: Dict[str, Dict[str, Any]] = {}
+        self.by_user: Dict[str, float] = defaultdict(float)
+        self.by_db: Dict[str, float] = defaultdict(float)
+        # (thread id, fingerprint id) -> longest runtime seen
+        self.executions: Dict[tuple, float] = {}
+
+    def add(self, processes: List[Dict[str, Any]], weight: float):
+        """
+        Account one process list sample.
+
+        Args:
+            processes: Normalized processes
+            weight: Seconds represented by this sample
+        """
+        self.samples += 1
+        for process in processes:
+            if not process["query"] or process["command"].lower() in ("sleep", "daemon", "binlog dump"):
+                continue
+            text = fingerprint_query(process["query"])
+            key = hashlib.md5(text.encode()).hexdigest()[:16]
+            entry = self.fingerprints.get(key)
+            if entry is None:
+                entry = self.fingerprints[key] = {
+                    "fingerprint": text[:500],
+                    "seconds": 0.0,
+                    "samples": 0,
+                    "max_time": 0.0,
+                    "users": Counter(),
+                    "dbs": Counter(),
+                    "states": Counter(),
+                }
+            entry["seconds"] += weight
+            entry["samples"] += 1
+            entry["max_time"] = max(entry["max_time"], process["time"])
+            entry["users"][process["user"]] += weight
+            entry["dbs"][process["db"]] += weight
+            entry["states"][process["state"] or process["command"]] += weight
+            self.by_user[process["user"]] += weight
+            self.by_db[process["db"]] += weight
+            execution = (process["id"], key)
+            self.executions[execution] = max(self.executions.get(execution, 0.0), process["time"])
+
+    def report(self, top: int) -> Dict[str, Any]:
+        """Top offenders by time spent running."""
+        executions = Counter(key for _, key in self.executions)
+        offenders = []
+        for key, entry in sorted(self.fingerprints.items(), key=lambda item: item[1]["seconds"], reverse=True)[:top]:
+            offenders.append({
+                "id": key,
+                "fingerprint": entry["fingerprint"],
+                "seconds": round(entry["seconds"], 2),
+                "samples": entry["samples"],
+                "executions": executions[key],
+                "max_time": entry["max_time"],
+                "users": {k: round(v, 2) for k, v in entry["users"].most_common(5)},
+                "dbs": {k: round(v, 2) for k, v in entry["dbs"].most_common(5)},
+                "states": {k: round(v, 2) for k, v in entry["states"].most_common(5)},
+            })
+        ranked = lambda totals: {k: round(v, 2) for k, v in Counter(totals).most_common(top)}
+        return {
+            "samples": self.samples,
+            "fingerprints": len(self.fingerprints),
+            "top_queries": offenders,
+            "by_user": ranked(self.by_user),
+            "by_db": ranked(self.by_db),
+        }
+
+
+@mcp.tool()
+@log_tool_call
+async def api_db_monitor_digest(duration: float = 10, interval: float = 0.5, top: int = 10):
+    """
+Sample the database process list repeatedly and report the top queries by time spent.
+
+Queries are fingerprinted (literals replaced by ?) so similar queries group together;
+time is attributed per fingerprint, user and database, like a lightweight pt-query-digest.
+
+Args:
+    duration (number): Sampling duration in seconds (max 300)
+    interval (number): Seconds between samples
+    top (integer): Number of entries in each ranking
+
+Returns:
+    dict: Top query fingerprints with time, executions, users, dbs and states.
+"""
+    duration = min(max(duration, 0), MAX_DIGEST_DURATION)
+    interval = max(interval, 0.05)
+    digest = QueryDigest()
+    errors = 0
+    
+    started = time.monotonic()
+    previous = started
+    while True:
+        try:
+            response = await call_da_api("/api/db-monitor/processes", method="GET")
+            now = time.monotonic()
+            # Weight each sample by the time it stands for, so slow polls are not undercounted
+            digest.add(normalize_processes(response), max(now - previous, interval) if digest.samples else interval)
+            previous = now
+        except Exception as e:
+            errors += 1
+            logger.warning(f"Process list sample failed: {str(e)}")
+        
+        elapsed = time.monotonic() - started
+        if elapsed >= duration:
+            break
+        await asyncio.sleep(min(interval, duration - elapsed))
+    
+    report = digest.report(top)
+    report["duration"] = round(time.monotonic() - started, 2)
+    report["errors"] = errors
+    return format_response(report)
+
+
+def _matches(value: str, pattern: Optional[str]) -> bool:
+    """Case-insensitive glob match; no pattern matches everything."""
+    return not pattern or fnmatch.fnmatch(value.lower(), pattern.lower())
+
+
+def select_processes(
+    processes: List[Dict[str, Any]],
+    min_time: float,
+    user_pattern: Optional[str] = None,
+    db_pattern: Optional[str] = None,
+    commands: Optional[List[str]] = None,
+    query_pattern: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Select processes matching a kill policy, longest running first.
+
+    Args:
+        processes: Normalized processes
+        min_time: Minimum runtime in seconds
+        user_pattern: Glob on the user name
+        db_pattern: Glob on the database name
+        commands: Allowed commands (e.g. ["Query"])
+        query_pattern: Glob on the query text
+
+    Returns:
+        Matching processes
+    """
+    allowed = {command.lower() for command in commands or []}
+    selected = [
+        process for process in processes
+        if process["id"] is not None
+        and process["time"] >= min_time
+        and process["user"].lower() not in _PROTECTED_USERS
+        and process["command"].lower() not in _PROTECTED_COMMANDS
+        and (not allowed or process["command"].lower() in allowed)
+        and _matches(process["user"], user_pattern)
+        and _matches(process["db"], db_pattern)
+        and _matches(process["query"], query_pattern)
+    ]
+    return sorted(selected, key=lambda process: process["time"], reverse=True)
+
+
+@mcp.tool()
+@log_tool_call
+async def api_db_monitor_kill_matching(
+    min_time: float = 60,
+    user_pattern: Optional[str] = None,
+    db_pattern: Optional[str] = None,
+    commands: Optional[List[str]] = None,
+    query_pattern: Optional[str] = None,
+    dry_run: bool = True,
+    max_kills: int = 50,
+    concurrency: Optional[int] = None
+):
+    """
+Kill all database threads matching a policy, concurrently.
+
+The current process list is evaluated locally and matching threads are killed
+longest-running first. Replication and system threads are never killed.
+Runs as a dry run by default: set dry_run to false to actually kill.
+
+Args:
+    min_time (number): Minimum runtime in seconds
+    user_pattern (string): Glob on the database user (e.g. "shop_*")
+    db_pattern (string): Glob on the database name
+    commands (array): Commands to consider (default ["Query"])
+    query_pattern (string): Glob on the query text (e.g. "*wp_options*")
+    dry_run (boolean): Only report what would be killed
+    max_kills (integer): Maximum number of threads to kill
+    concurrency (integer): Maximum number of kill requests at once (capped at BATCH_CONCURRENCY)
+
+Returns:
+    dict: Matched threads and, unless dry run, which were killed or failed.
+"""
+    response = await call_da_api("/api/db-monitor/processes", method="GET")
+    matched = select_processes(
+        normalize_processes(response),
+        min_time=min_time,
+        user_pattern=user_pattern,
+        db_pattern=db_pattern,
+        commands=commands if commands is not None else ["Query"],
+        query_pattern=query_pattern,
+    )
+    targets = matched[:max(max_kills, 0)]
+    summary = lambda process: {
+        "id": process["id"],
+        "user": process["user"],
+        "db": process["db"],
+        "command": process["command"],
+        "time": process["time"],
+        "query": process["query"][:200],
+    }
+    
+    if dry_run:
+        return format_response({
+            "dry_run": True,
+            "matched": len(matched),
+            "would_kill": [summary(process) for process in targets],
+        })
+    
+    results = await gather_limited(
+        (call_da_api(f"/api/db-monitor/processes/{process['id']}/kill", method="POST") for process in targets),
+        min(concurrency or settings.BATCH_CONCURRENCY, settings.BATCH_CONCURRENCY),
+    )
+    killed, failed = [], []
+    for process, result in zip(targets, results):
+        if isinstance(result, Exception):
+            failed.append(dict(summary(process), error=str(result)))
+        else:
+            killed.append(summary(process))
+    
+    logger.warning(f"Killed {len(killed)} database threads by policy ({len(failed)} failed)")
+    return format_response({
+        "dry_run": False,
+        "matched": len(matched),
+        "killed": killed,
+        "failed": failed,
+        "skipped": len(matched) - len(targets),
+    })
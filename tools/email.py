@@ -5,10 +5,12 @@ MCP tools for interacting with DirectAdmin's email-related endpoints.
 import logging
 from mcp_instance import mcp
 from da import call_da_api
+from tools.common import compact_response
 
 logger = logging.getLogger(__name__)
 
 @mcp.tool()
+@compact_response
 async def api_email_config_mobileconfig(email, format):
     """
     Download Apple Mail configuration profile.
@@ -21,13 +23,14 @@ async def api_email_config_mobileconfig(email, format):
         The mobileconfig profile.
     """
     try:
-        response = await call_da_api("/api/email-config/mobileconfig", method="GET", data={"email": email, "format": format})
+        response = await call_da_api("/api/email-config/mobileconfig", method="GET", data={"email": email, "format": format}, raw=True)
         return response
     except Exception as e:
         logger.error(f"Error in api_email_config_mobileconfig: {e}")
         raise
 
 @mcp.tool()
+@compact_response
 async def api_email_logs(e_from, e_to, address, domain, state, type):
     """
     Retrieve email log entries.
@@ -44,13 +47,14 @@ async def api_email_logs(e_from, e_to, address, domain, state, type):
         List of email log entries.
     """
     try:
-        response = await call_da_api("/api/email-logs", method="GET", data={"from": e_from, "to": e_to, "address": address, "domain": domain, "state": state, "type": type})
+        response = await call_da_api("/api/email-logs", method="GET", data={"from": e_from, "to": e_to, "address": address, "domain": domain, "state": state, "type": type}, raw=True)
         return response
     except Exception as e:
         logger.error(f"Error in api_email_logs: {e}")
         raise
 
 @mcp.tool()
+@compact_response
 async def api_email_logs_summary(e_from, e_to):
     """
     Retrieve summary of email log statistics.
@@ -63,7 +67,7 @@ async def api_email_logs_summary(e_from, e_to):
         Summary statistics of email logs.
     """
     try:
-        response = await call_da_api("/api/email-logs-summary", method="GET", data={"from": e_from, "to": e_to})
+        response = await call_da_api("/api/email-logs-summary", method="GET", data={"from": e_from, "to": e_to}, raw=True)
         return response
     except Exception as e:
         logger.error(f"Error in api_email_logs_summary: {e}")
@@ -0,0 +1,258 @@
+"""
+MCP tools for file system capacity forecasting.
+
+File system usage from `/api/system-info/fs` is sampled in the background and
+kept in a small SQLite database in the data directory, so growth trends per
+mount survive restarts and time-to-full can be predicted locally.
+"""
+
+import logging
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import settings
+from mcp_instance import mcp
+from da import call_da_api
+from tools.common import background_task, data_path, log_tool_call, format_response, run_periodically, server_account_only
+
+logger = logging.getLogger(__name__)
+
+_MOUNT_KEYS = ("mount", "mountpoint", "mounted_on", "name", "filesystem", "device")
+_SIZE_KEYS = ("size", "total", "blocks")
+_USED_KEYS = ("used",)
+_AVAILABLE_KEYS = ("available", "avail", "free")
+
+_UNITS = {"": 1, "B": 1, "K": 2**10, "M": 2**20, "G": 2**30, "T": 2**40, "P": 2**50}
+
+
+def _to_bytes(value: Any) -> Optional[float]:
+    """Parse a size such as 1024, "1024" or "40G" into bytes."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGTP]?)i?B?\s*", str(value), re.IGNORECASE)
+    if not match:
+        return None
+    return float(match.group(1)) * _UNITS[match.group(2).upper()]
+
+
+def _first(entry: Dict[str, Any], keys: tuple) -> Optional[float]:
+    """First of `keys` present in `entry`, parsed as bytes."""
+    for key in keys:
+        if key in entry:
+            value = _to_bytes(entry[key])
+            if value is not None:
+                return value
+    return None
+
+
+def parse_fs(response: Any) -> List[Dict[str, Any]]:
+    """
+    Extract (mount, size, used) from a file system usage response.
+
+    Args:
+        response: `/api/system-info/fs` response
+
+    Returns:
+        One entry per mount with `mount`, `size` and `used` in the response's unit
+    """
+    if isinstance(response, dict):
+        entries = next((v for v in response.values() if isinstance(v, list)), None)
+        if entries is None:
+            entries = [dict(value, mount=key) for key, value in response.items() if isinstance(value, dict)]
+    else:
+        entries = response if isinstance(response, list) else []
+
+    mounts = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        mount = next((str(entry[k]) for k in _MOUNT_KEYS if entry.get(k)), None)
+        used = _first(entry, _USED_KEYS)
+        size = _first(entry, _SIZE_KEYS)
+        if size is None and used is not None:
+            available = _first(entry, _AVAILABLE_KEYS)
+            size = used + available if available is not None else None
+        if mount and used is not None and size:
+            mounts.append({"mount": mount, "size": size, "used": used})
+    return mounts
+
+
+def linear_trend(points: List[tuple]) -> Optional[tuple]:
+    """
+    Least squares fit of `value = slope * time + intercept`.
+
+    Args:
+        points: (time, value) pairs
+
+    Returns:
+        (slope, intercept, r2), or None with fewer than two distinct times
+    """
+    n = len(points)
+    if n < 2:
+        return None
+    mean_t = sum(t for t, _ in points) / n
+    mean_v = sum(v for _, v in points) / n
+    var_t = sum((t - mean_t) ** 2 for t, _ in points)
+    if var_t == 0:
+        return None
+    slope = sum((t - mean_t) * (v - mean_v) for t, v in points) / var_t
+    intercept = mean_v - slope * mean_t
+    var_v = sum((v - mean_v) ** 2 for _, v in points)
+    residual = sum((v - (slope * t + intercept)) ** 2 for t, v in points)
+    r2 = 1 - residual / var_v if var_v else 1.0
+    return slope, intercept, r2
+
+
+class FsHistory:
+    """File system usage samples stored in SQLite."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.last_sample: Optional[float] = None
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS fs_samples ("
+                "mount TEXT NOT NULL, ts REAL NOT NULL, size REAL NOT NULL, used REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS fs_samples_mount_ts ON fs_samples (mount, ts)")
+            row = db.execute("SELECT MAX(ts) FROM fs_samples").fetchone()
+            self.last_sample = row[0]
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # sqlite3's own context manager only commits; the connection is closed here
+        db = sqlite3.connect(self.path)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def add(self, mounts: List[Dict[str, Any]], timestamp: float):
+        """Store one sample per mount and drop samples past the retention period."""
+        with self._connect() as db:
+            db.executemany(
+                "INSERT INTO fs_samples (mount, ts, size, used) VALUES (?, ?, ?, ?)",
+                [(m["mount"], timestamp, m["size"], m["used"]) for m in mounts],
+            )
+            db.execute(
+                "DELETE FROM fs_samples WHERE ts < ?",
+                (timestamp - settings.FS_HISTORY_DAYS * 86400,),
+            )
+        self.last_sample = timestamp
+
+    def series(self, since: float) -> Dict[str, List[tuple]]:
+        """Samples since `since`, as mount -> [(ts, size, used)] in time order."""
+        series: Dict[str, List[tuple]] = {}
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT mount, ts, size, used FROM fs_samples WHERE ts >= ? ORDER BY mount, ts",
+                (since,),
+            )
+            for mount, ts, size, used in rows:
+                series.setdefault(mount, []).append((ts, size, used))
+        return series
+
+    async def sample(self):
+        """Fetch current file system usage and store it."""
+        response = await call_da_api("/api/system-info/fs", method="GET")
+        mounts = parse_fs(response)
+        if mounts:
+            self.add(mounts, time.time())
+
+
+history = FsHistory(data_path("fs_history.sqlite3"))
+
+
+def forecast_mount(mount: str, samples: List[tuple], now: float) -> Dict[str, Any]:
+    """
+    Forecast when a mount fills up from its samples.
+
+    Args:
+        mount: Mount point
+        samples: (ts, size, used) in time order
+        now: Current time
+
+    Returns:
+        Current usage, growth per day and predicted time to full
+    """
+    _, size, used = samples[-1]
+    result: Dict[str, Any] = {
+        "mount": mount,
+        "size": size,
+        "used": used,
+        "used_pct": round(100 * used / size, 1),
+        "samples": len(samples),
+        "growth_per_day": None,
+        "days_to_full": None,
+        "full_at": None,
+    }
+
+    trend = linear_trend([(ts, u) for ts, _, u in samples])
+    if trend is None:
+        return result
+
+    slope, _, r2 = trend
+    result["growth_per_day"] = round(slope * 86400, 1)
+    result["fit_r2"] = round(r2, 3)
+    if slope > 0:
+        seconds = max(0.0, (size - used) / slope)
+        result["days_to_full"] = round(seconds / 86400, 1)
+        result["full_at"] = datetime.fromtimestamp(now + seconds, tz=timezone.utc).isoformat()
+    return result
+
+
+@background_task
+async def sample_fs_history():
+    """Background loop feeding the file system history."""
+    await run_periodically("file system history sampler", settings.FS_SAMPLE_INTERVAL, history.sample)
+
+
+@mcp.tool()
+@log_tool_call
+@server_account_only
+async def system_fs_forecast(horizon_days: float = 30, window_days: float = 7, include_all: bool = False):
+    """
+    Forecast file system capacity from the recorded usage history.
+
+    Fits a linear growth trend per mount over the last `window_days` of samples
+    and predicts when each mount fills up. Mounts at risk (full within
+    `horizon_days` or already over 90% used) are returned first, soonest first.
+
+    Args:
+        horizon_days: Mounts predicted to be full within this many days are at risk
+        window_days: Days of history used to fit the trend
+        include_all: Also return mounts that are not at risk
+
+    Returns:
+        Ranked list of mounts with usage, growth per day and predicted time to full
+    """
+    now = time.time()
+    if history.last_sample is None or now - history.last_sample > max(settings.FS_SAMPLE_INTERVAL, 60):
+        # Sampler disabled or not run yet: record the current usage now
+        await history.sample()
+        now = time.time()
+
+    forecasts = [
+        forecast_mount(mount, samples, now)
+        for mount, samples in history.series(now - window_days * 86400).items()
+    ]
+    for forecast in forecasts:
+        days = forecast["days_to_full"]
+        forecast["at_risk"] = (days is not None and days <= horizon_days) or forecast["used_pct"] >= 90
+
+    forecasts.sort(key=lambda f: (not f["at_risk"], f["days_to_full"] if f["days_to_full"] is not None else float("inf")))
+    at_risk = [f for f in forecasts if f["at_risk"]]
+
+    return format_response({
+        "horizon_days": horizon_days,
+        "window_days": window_days,
+        "at_risk": len(at_risk),
+        "mounts": forecasts if include_all else at_risk,
+    })
@@ -5,10 +5,12 @@ MCP tools for managing DirectAdmin server hostname.
 import logging
 from mcp_instance import mcp
 from da import call_da_api
+from tools.common import compact_response
 
 logger = logging.getLogger(__name__)
 
 @mcp.tool()
+@compact_response
 async def api_server_settings_change_hostname(data):
     """
     Change the server hostname.
@@ -23,7 +25,7 @@ async def api_server_settings_change_hostname(data):
         A confirmation message or error from the DirectAdmin API.
     """
     try:
-        response = await call_da_api("/api/server-settings/change-hostname", method="POST", data={"data": data})
+        response = await call_da_api("/api/server-settings/change-hostname", method="POST", data={"data": data}, raw=True)
         return response
     except Exception as e:
         logger.error(f"Error in api_server_settings_change_hostname: {e}")
@@ -10,15 +10,17 @@ for HTTP requests.
 import logging
 from mcp_instance import mcp
 from da import call_da_api
+from tools.common import compact_response
 
 logger = logging.getLogger(__name__)
 
 
 @mcp.tool()
+@compact_response
 async def api_info():
     """Get basic server info."""
     try:
-        response = await call_da_api("/api/info", method="GET")
+        response = await call_da_api("/api/info", method="GET", raw=True)
         return response
     except Exception as e:
         logger.error(f"Error in api_info: {e}")
@@ -26,10 +28,11 @@ async def api_info():
 
 
 @mcp.tool()
+@compact_response
 async def api_system_info_cpu():
     """Get system CPU."""
     try:
-        response = await call_da_api("/api/system-info/cpu", method="GET")
+        response = await call_da_api("/api/system-info/cpu", method="GET", raw=True)
         return response
     except Exception as e:
         logger.error(f"Error in api_system_info_cpu: {e}")
@@ -37,10 +40,11 @@ async def api_system_info_cpu():
 
 
 @mcp.tool()
+@compact_response
 async def api_system_info_fs():
     """Get file system space usage."""
     try:
-        response = await call_da_api("/api/system-info/fs", method="GET")
+        response = await call_da_api("/api/system-info/fs", method="GET", raw=True)
         return response
     except Exception as e:
         logger.error(f"Error in api_system_info_fs: {e}")
@@ -48,10 +52,11 @@ async def api_system_info_fs():
 
 
 @mcp.tool()
+@compact_response
 async def api_system_info_load():
     """Get system load."""
     try:
-        response = await call_da_api("/api/system-info/load", method="GET")
+        response = await call_da_api("/api/system-info/load", method="GET", raw=True)
         return response
     except Exception as e:
         logger.error(f"Error in api_system_info_load: {e}")
@@ -59,10 +64,11 @@ async def api_system_info_load():
 
 
 @mcp.tool()
+@compact_response
 async def api_system_info_memory():
     """Get system memory."""
     try:
-        response = await call_da_api("/api/system-info/memory", method="GET")
+        response = await call_da_api("/api/system-info/memory", method="GET", raw=True)
         return response
     except Exception as e:
         logger.error(f"Error in api_system_info_memory: {e}")
@@ -70,10 +76,11 @@ async def api_system_info_memory():
 
 
 @mcp.tool()
+@compact_response
 async def api_system_info_services():
     """Get system services."""
     try:
-        response = await call_da_api("/api/system-info/services", method="GET")
+        response = await call_da_api("/api/system-info/services", method="GET", raw=True)
         return response
     except Exception as e:
         logger.error(f"Error in api_system_info_services: {e}")
@@ -81,10 +88,11 @@ async def api_system_info_services():
 
 
 @mcp.tool()
+@compact_response
 async def api_system_info_uptime():
     """Get system uptime."""
     try:
-        response = await call_da_api("/api/system-info/uptime", method="GET")
+        response = await call_da_api("/api/system-info/uptime", method="GET", raw=True)
         return response
     except Exception as e:
         logger.error(f"Error in api_system_info_uptime: {e}")
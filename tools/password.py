@@ -7,10 +7,12 @@ endpoints in the DirectAdmin API.
 import logging
 from mcp_instance import mcp
 from da import call_da_api
+from tools.common import compact_response
 
 logger = logging.getLogger(__name__)
 
 @mcp.tool()
+@compact_response
 async def api_change_password(data):
     """
     Change user password.
@@ -22,7 +24,7 @@ async def api_change_password(data):
         API response after attempting to change the password.
     """
     try:
-        response = await call_da_api("/api/change-password", method="POST", data={"data": data})
+        response = await call_da_api("/api/change-password", method="POST", data={"data": data}, raw=True)
         return response
     except Exception as e:
         logger.error(f"Error in api_change_password: {e}")
@@ -5,10 +5,12 @@ MCP tools for managing DirectAdmin resellers.
 import logging
 from mcp_instance import mcp
 from da import call_da_api
+from tools.common import compact_response
 
 logger = logging.getLogger(__name__)
 
 @mcp.tool()
+@compact_response
 async def api_resellers_username_config(username):
     """
     Get reseller configuration settings.
@@ -22,13 +24,14 @@ async def api_resellers_username_config(username):
         The reseller's configuration settings.
     """
     try:
-        response = await call_da_api(f"/api/resellers/{username}/config", method="GET")
+        response = await call_da_api(f"/api/resellers/{username}/config", method="GET", raw=True)
         return response
     except Exception as e:
         logger.error(f"Error in api_resellers_username_config: {e}")
         raise
 
 @mcp.tool()
+@compact_response
 async def api_resellers_username_usage(username):
     """
     Get reseller usage information.
@@ -43,7 +46,7 @@ async def api_resellers_username_usage(username):
         Usage statistics.
     """
     try:
-        response = await call_da_api(f"/api/resellers/{username}/usage", method="GET")
+        response = await call_da_api(f"/api/resellers/{username}/usage", method="GET", raw=True)
         return response
     except Exception as e:
         logger.error(f"Error in api_resellers_username_usage: {e}")
@@ -0,0 +1,198 @@
+"""
+MCP tools for tracking service state changes.
+
+A background watcher snapshots `/api/system-info/services`, keeps one short
+hash per service and records transitions, so callers can ask for what
+changed since their last call instead of diffing the full service list.
+"""
+
+import hashlib
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from config import settings
+from mcp_instance import mcp
+from da import call_da_api, json_dumps
+from tools.common import background_task, log_tool_call, format_response, run_periodically, server_account_only
+
+logger = logging.getLogger(__name__)
+
+# Fields that change without the service changing state
+_VOLATILE_KEYS = {"pid", "memory", "mem", "cpu", "uptime", "started", "start_time", "threads"}
+
+_STATUS_KEYS = ("status", "state", "running", "active")
+
+
+def _service_states(response: Any) -> Dict[str, Any]:
+    """Normalize a services response into service name -> state."""
+    if isinstance(response, dict):
+        services = response.get("services", response)
+        if isinstance(services, dict):
+            return services
+        response = services
+    if isinstance(response, list):
+        return {
+            str(item.get("name") or item.get("service")): item
+            for item in response
+            if isinstance(item, dict) and (item.get("name") or item.get("service"))
+        }
+    return {}
+
+
+def _status(state: Any) -> str:
+    """Short human readable status of a service state."""
+    if isinstance(state, dict):
+        for key in _STATUS_KEYS:
+            if key in state:
+                value = state[key]
+                if isinstance(value, bool):
+                    return "running" if value else "stopped"
+                return str(value)
+        return "unknown"
+    if isinstance(state, bool):
+        return "running" if state else "stopped"
+    return str(state)
+
+
+def _fingerprint(state: Any) -> bytes:
+    """Short hash of the stable part of a service state."""
+    if isinstance(state, dict):
+        state = {key: value for key, value in state.items() if key not in _VOLATILE_KEYS}
+    return hashlib.blake2b(json_dumps(state).encode(), digest_size=8).digest()
+
+
+class ServiceWatcher:
+    """Keeps hashed service states and a bounded log of transitions."""
+
+    def __init__(self, history_size: int):
+        # Service name -> (state hash, status)
+        self.states: Dict[str, Tuple[bytes, str]] = {}
+        self.transitions: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self.sequence = 0
+        self.last_snapshot: Optional[float] = None
+
+    def apply(self, services: Dict[str, Any], timestamp: float) -> int:
+        """
+        Compare a snapshot with the previous one and record transitions.
+
+        The first snapshot only sets the baseline.
+
+        Args:
+            services: Service name -> state
+            timestamp: Snapshot time
+
+        Returns:
+            Number of transitions recorded
+        """
+        current = {name: (_fingerprint(state), _status(state)) for name, state in services.items()}
+        recorded = 0
+
+        if self.last_snapshot is not None:
+            for name in sorted(current.keys() | self.states.keys()):
+                old = self.states.get(name)
+                new = current.get(name)
+                if old is not None and new is not None and old[0] == new[0]:
+                    continue
+                if old is None:
+                    change = "added"
+                elif new is None:
+                    change = "removed"
+                elif old[1] != new[1]:
+                    change = "status"
+                else:
+                    # Same status but other stable fields changed, typically after a restart
+                    change = "restart"
+                self.sequence += 1
+                recorded += 1
+                self.transitions.append({
+                    "cursor": self.sequence,
+                    "service": name,
+                    "change": change,
+                    "old": old[1] if old else None,
+                    "new": new[1] if new else None,
+                    "timestamp": timestamp,
+                })
+
+        self.states = current
+        self.last_snapshot = timestamp
+        return recorded
+
+    async def snapshot(self):
+        """Fetch the service list and record transitions."""
+        response = await call_da_api("/api/system-info/services", method="GET")
+        recorded = self.apply(_service_states(response), time.time())
+        if recorded:
+            logger.info(f"Recorded {recorded} service state transitions")
+
+    def since(self, cursor: int, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Transitions after `cursor`.
+
+        Args:
+            cursor: Last cursor seen by the caller
+            limit: Maximum number of transitions to return
+
+        Returns:
+            Transitions, and whether older ones were already discarded
+
+        A cursor past the current sequence was issued before the server
+        restarted; it is reported as missed and all retained transitions are returned.
+        """
+        if cursor > self.sequence:
+            return list(self.transitions)[:limit], True
+        missed = bool(self.transitions) and cursor < self.transitions[0]["cursor"] - 1
+        changes = [t for t in self.transitions if t["cursor"] > cursor]
+        return changes[:limit], missed
+
+
+watcher = ServiceWatcher(settings.SERVICES_HISTORY_SIZE)
+
+
+@background_task
+async def watch_services():
+    """Background loop feeding the service watcher."""
+    await run_periodically("service watcher", settings.SERVICES_WATCH_INTERVAL, watcher.snapshot)
+
+
+@mcp.tool()
+@log_tool_call
+@server_account_only
+async def system_services_changes(cursor: int = 0, limit: int = 100):
+    """
+    Get service state transitions since a cursor.
+
+    Pass the `cursor` returned by the previous call to receive only what changed
+    since then; use 0 on the first call. Each transition lists the service, the
+    kind of change (added, removed, status or restart), its old and new status
+    and when the change was seen. `missed` is true when transitions since the
+    cursor were discarded or lost with a server restart.
+
+    Args:
+        cursor: Cursor returned by the previous call (0 for all retained transitions)
+        limit: Maximum number of transitions to return
+
+    Returns:
+        Transitions, the next cursor and the services currently not running
+    """
+    stale_after = settings.SERVICES_WATCH_INTERVAL or 0
+    if watcher.last_snapshot is None or time.time() - watcher.last_snapshot > stale_after * 2:
+        # Watcher disabled or not running yet: take the snapshot now
+        await watcher.snapshot()
+
+    changes, missed = watcher.since(cursor, limit)
+    next_cursor = changes[-1]["cursor"] if changes else watcher.sequence
+
+    return format_response({
+        "cursor": next_cursor,
+        "transitions": changes,
+        "more": next_cursor < watcher.sequence,
+        "missed": missed,
+        "last_snapshot": watcher.last_snapshot,
+        "services": len(watcher.states),
+        "not_running": sorted(
+            name for name, (_, status) in watcher.states.items()
+            if status.lower() not in ("running", "active", "1", "true", "ok")
+        ),
+    })
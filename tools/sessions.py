@@ -19,7 +19,7 @@ Get current session info
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/session", method="GET")
+    response = await call_da_api(f"/api/session", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -31,7 +31,7 @@ Drop out of Login-as session
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/session/login-as/return", method="POST")
+    response = await call_da_api(f"/api/session/login-as/return", method="POST", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -46,7 +46,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/session/login-as/switch", method="POST", data=payload)
+    response = await call_da_api(f"/api/session/login-as/switch", method="POST", data=payload, raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -62,7 +62,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/session/login-as/user-list", method="GET")
+    response = await call_da_api(f"/api/session/login-as/user-list", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -74,7 +74,7 @@ Get reseller config
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/session/reseller-config", method="GET")
+    response = await call_da_api(f"/api/session/reseller-config", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -89,7 +89,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/session/skin-customization/{skin}", method="GET")
+    response = await call_da_api(f"/api/session/skin-customization/{skin}", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -104,7 +104,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/session/skin-customization/{skin}/images/favicon", method="GET")
+    response = await call_da_api(f"/api/session/skin-customization/{skin}/images/favicon", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -119,7 +119,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/session/skin-customization/{skin}/images/logo", method="GET")
+    response = await call_da_api(f"/api/session/skin-customization/{skin}/images/logo", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -134,7 +134,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/session/skin-customization/{skin}/images/logo2", method="GET")
+    response = await call_da_api(f"/api/session/skin-customization/{skin}/images/logo2", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -149,7 +149,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/session/skin-customization/{skin}/images/symbol", method="GET")
+    response = await call_da_api(f"/api/session/skin-customization/{skin}/images/symbol", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -164,7 +164,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/session/skin-customization/{skin}/images/symbol2", method="GET")
+    response = await call_da_api(f"/api/session/skin-customization/{skin}/images/symbol2", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -180,7 +180,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/session/skin-customization/{skin}/{filename}", method="GET")
+    response = await call_da_api(f"/api/session/skin-customization/{skin}/{filename}", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -192,7 +192,7 @@ Get server state
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/session/state", method="GET")
+    response = await call_da_api(f"/api/session/state", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -207,7 +207,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/session/switch-active-domain", method="POST", data=payload)
+    response = await call_da_api(f"/api/session/switch-active-domain", method="POST", data=payload, raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -219,7 +219,7 @@ Current user config
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/session/user-config", method="GET")
+    response = await call_da_api(f"/api/session/user-config", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -231,7 +231,7 @@ Get user's usage
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/session/user-usage", method="GET")
+    response = await call_da_api(f"/api/session/user-usage", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -243,7 +243,7 @@ List active user sessions
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/sessions", method="GET")
+    response = await call_da_api(f"/api/sessions", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -255,7 +255,7 @@ Destroy all active sessions except current
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/sessions/destroy-all-other", method="POST")
+    response = await call_da_api(f"/api/sessions/destroy-all-other", method="POST", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -270,5 +270,5 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/sessions/destroy/{public_id}", method="POST")
+    response = await call_da_api(f"/api/sessions/destroy/{public_id}", method="POST", raw=True)
     return format_response(response)
\ No newline at end of file
@@ -0,0 +1,249 @@
+"""
+MCP tools for historical system metrics.
+
+A background sampler polls the DirectAdmin system-info endpoints (CPU, load,
+memory, file systems) and keeps every numeric value in a fixed-size ring
+buffer, so ranges can be answered locally instead of by repeated polling.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+from mcp_instance import mcp
+from da import call_da_api
+from tools.common import background_task, log_tool_call, format_response, run_periodically, server_account_only
+
+logger = logging.getLogger(__name__)
+
+# Metric name -> DirectAdmin endpoint
+SAMPLED_ENDPOINTS = {
+    "cpu": "/api/system-info/cpu",
+    "load": "/api/system-info/load",
+    "memory": "/api/system-info/memory",
+    "fs": "/api/system-info/fs",
+}
+
+# Keys identifying list items (e.g. file systems by mount point)
+_NAME_KEYS = ("mount", "mountpoint", "mounted_on", "name", "filesystem", "device")
+
+# Upper bound on the number of series, in case an endpoint returns unbounded keys
+MAX_SERIES = 1000
+
+
+class RingBuffer:
+    """Fixed-size time series backed by two arrays of doubles."""
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self.times = array("d", bytes(8 * self.size))
+        self.values = array("d", bytes(8 * self.size))
+        self.count = 0
+        self.head = 0
+
+    def append(self, timestamp: float, value: float):
+        """Add a sample, overwriting the oldest one when full."""
+        self.times[self.head] = timestamp
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def _index(self, position: int) -> int:
+        """Array index of the `position`-th oldest sample."""
+        return (self.head - self.count + position) % self.size
+
+    def since(self, start: float) -> Tuple[List[float], List[float]]:
+        """
+        Samples taken at or after `start`, oldest first.
+
+        Args:
+            start: UNIX timestamp
+
+        Returns:
+            Timestamps and values
+        """
+        # Samples are appended in time order, so binary search the logical positions
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if self.times[self._index(mid)] < start:
+                low = mid + 1
+            else:
+                high = mid
+        indexes = [self._index(position) for position in range(low, self.count)]
+        return [self.times[i] for i in indexes], [self.values[i] for i in indexes]
+
+
+class MetricsSampler:
+    """Samples system-info endpoints into per-series ring buffers."""
+
+    def __init__(self, buffer_size: int):
+        self.buffer_size = buffer_size
+        self.series: Dict[str, RingBuffer] = {}
+        self.last_sample: Optional[float] = None
+
+    def record(self, name: str, timestamp: float, value: float):
+        """Append a value to a series, creating it if needed."""
+        buffer = self.series.get(name)
+        if buffer is None:
+            if len(self.series) >= MAX_SERIES:
+                return
+            buffer = self.series[name] = RingBuffer(self.buffer_size)
+        buffer.append(timestamp, value)
+
+    async def sample(self):
+        """Poll every endpoint once and record its numeric values."""
+        timestamp = time.time()
+        responses = await asyncio.gather(
+            *(call_da_api(path, method="GET") for path in SAMPLED_ENDPOINTS.values()),
+            return_exceptions=True,
+        )
+        for metric, response in zip(SAMPLED_ENDPOINTS, responses):
+            if isinstance(response, Exception):
+                logger.warning(f"Failed to sample {metric}: {str(response)}")
+                continue
+            for name, value in flatten_numeric(response, metric).items():
+                self.record(name, timestamp, value)
+        self.last_sample = timestamp
+
+    def select(self, metric: str) -> Dict[str, RingBuffer]:
+        """Series named `metric` or nested below it."""
+        return {
+            name: buffer
+            for name, buffer in self.series.items()
+            if name == metric or name.startswith(f"{metric}.")
+        }
+
+
+def flatten_numeric(data: Any, prefix: str) -> Dict[str, float]:
+    """
+    Flatten the numeric leaves of a response into dotted series names.
+
+    List items are named after an identifying key (e.g. the mount point)
+    when they have one, otherwise after their position.
+
+    Args:
+        data: Response data
+        prefix: Name of the series root
+
+    Returns:
+        Series name -> value
+    """
+    flat: Dict[str, float] = {}
+    if isinstance(data, bool):
+        return flat
+    if isinstance(data, (int, float)):
+        flat[prefix] = float(data)
+    elif isinstance(data, str):
+        try:
+            flat[prefix] = float(data.rstrip("%"))
+        except ValueError:
+            pass
+    elif isinstance(data, dict):
+        for key, value in data.items():
+            flat.update(flatten_numeric(value, f"{prefix}.{key}"))
+    elif isinstance(data, list):
+        for position, item in enumerate(data):
+            name = str(position)
+            if isinstance(item, dict):
+                name = next((str(item[k]) for k in _NAME_KEYS if item.get(k)), name)
+            flat.update(flatten_numeric(item, f"{prefix}.{name}"))
+    return flat
+
+
+def series_stats(times: List[float], values: List[float], step: float) -> Dict[str, Any]:
+    """
+    Downsample a series into `step`-second buckets and compute statistics.
+
+    Args:
+        times: Sample timestamps, oldest first
+        values: Sample values
+        step: Bucket size in seconds
+
+    Returns:
+        Averaged points as [timestamp, value] pairs and min/max/avg/p95
+    """
+    points: List[List[float]] = []
+    bucket_start, bucket_sum, bucket_count = None, 0.0, 0
+    for timestamp, value in zip(times, values):
+        start = timestamp - timestamp % step
+        if start != bucket_start and bucket_count:
+            points.append([bucket_start, round(bucket_sum / bucket_count, 4)])
+            bucket_sum, bucket_count = 0.0, 0
+        bucket_start = start
+        bucket_sum += value
+        bucket_count += 1
+    if bucket_count:
+        points.append([bucket_start, round(bucket_sum / bucket_count, 4)])
+
+    ordered = sorted(values)
+    return {
+        "samples": len(values),
+        "min": ordered[0],
+        "max": ordered[-1],
+        "avg": round(sum(values) / len(values), 4),
+        "p95": ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)],
+        "points": points,
+    }
+
+
+sampler = MetricsSampler(settings.METRICS_BUFFER_SIZE)
+
+
+@background_task
+async def sample_system_metrics():
+    """Background loop feeding the metrics sampler."""
+    await run_periodically("system metrics sampler", settings.METRICS_SAMPLE_INTERVAL, sampler.sample)
+
+
+@mcp.tool()
+@log_tool_call
+@server_account_only
+async def system_metrics_range(metric: str, since: float = 3600, step: float = 60):
+    """
+    Get the history of a system metric from the local sampler.
+
+    Values are sampled in the background from the cpu, load, memory and fs
+    system-info endpoints. Each numeric field is its own series, named by its
+    path (e.g. "load.load1", "fs./.used"); asking for "load" returns all load series.
+
+    Args:
+        metric: Series name or prefix (e.g. "load", "memory.used", "fs")
+        since: Seconds back from now, or a UNIX timestamp
+        step: Downsampling bucket size in seconds
+
+    Returns:
+        Downsampled points and min/max/avg/p95 per series
+    """
+    if settings.METRICS_SAMPLE_INTERVAL <= 0:
+        return {"error": True, "message": "System metrics sampler is disabled (METRICS_SAMPLE_INTERVAL=0)"}
+
+    start = since if since > 1e9 else time.time() - since
+    step = max(step, settings.METRICS_SAMPLE_INTERVAL)
+
+    selected = sampler.select(metric)
+    if not selected:
+        return {
+            "error": True,
+            "message": f"Unknown metric: {metric}",
+            "available": sorted({name.split(".", 1)[0] for name in sampler.series}) or list(SAMPLED_ENDPOINTS),
+        }
+
+    series = {}
+    for name, buffer in sorted(selected.items()):
+        times, values = buffer.since(start)
+        if values:
+            series[name] = series_stats(times, values, step)
+
+    return format_response({
+        "metric": metric,
+        "since": start,
+        "step": step,
+        "interval": settings.METRICS_SAMPLE_INTERVAL,
+        "last_sample": sampler.last_sample,
+        "series": series,
+    })
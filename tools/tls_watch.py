@@ -0,0 +1,242 @@
+"""
+MCP tools for watching TLS certificate expiry.
+
+A background watcher collects the server certificate from the server-tls
+endpoint and the certificate served for every domain (by a TLS handshake with
+the domain as SNI name), parses expiry, issuer and SANs locally and keeps the
+metadata in memory, so expiry questions never need full certificates.
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+import ssl
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from cryptography import x509
+from cryptography.x509.oid import NameOID
+
+from config import settings
+from mcp_instance import mcp
+from da import call_da_api
+from tools.backend_search import index as search_index
+from tools.common import background_task, gather_limited, log_tool_call, format_response, run_periodically, server_account_only
+
+logger = logging.getLogger(__name__)
+
+_PEM = re.compile(r"-----BEGIN CERTIFICATE-----[A-Za-z0-9+/=\s]+?-----END CERTIFICATE-----")
+
+SERVER = "server"
+
+
+def _name(name: x509.Name) -> Optional[str]:
+    """Common name (or full name) of a certificate subject/issuer."""
+    common_names = name.get_attributes_for_oid(NameOID.COMMON_NAME)
+    return str(common_names[0].value) if common_names else name.rfc4514_string()
+
+
+def _utc(cert: Any, attribute: str) -> datetime:
+    """Validity bound of a `cryptography` certificate as an aware datetime."""
+    value = getattr(cert, f"{attribute}_utc", None)
+    return value if value is not None else getattr(cert, attribute).replace(tzinfo=timezone.utc)
+
+
+def parse_certificate(pem: str) -> Dict[str, Any]:
+    """
+    Parse the metadata of a PEM certificate.
+
+    Args:
+        pem: PEM encoded certificate
+
+    Returns:
+        Subject, issuer, SANs, validity, serial and SHA-256 fingerprint
+    """
+    der = ssl.PEM_cert_to_DER_cert(pem)
+    cert = x509.load_der_x509_certificate(der)
+    try:
+        sans = cert.extensions.get_extension_for_class(x509.SubjectAlternativeName).value
+        names = sans.get_values_for_type(x509.DNSName)
+    except x509.ExtensionNotFound:
+        names = []
+    return {
+        "fingerprint": hashlib.sha256(der).hexdigest(),
+        "subject": _name(cert.subject),
+        "issuer": _name(cert.issuer),
+        "sans": names,
+        "not_before": _utc(cert, "not_valid_before").timestamp(),
+        "not_after": _utc(cert, "not_valid_after").timestamp(),
+        "serial": format(cert.serial_number, "X"),
+    }
+
+
+def find_pems(data: Any) -> List[str]:
+    """All PEM certificates found in the strings of a response."""
+    if isinstance(data, str):
+        return _PEM.findall(data)
+    if isinstance(data, dict):
+        data = list(data.values())
+    if isinstance(data, list):
+        return [pem for item in data for pem in find_pems(item)]
+    return []
+
+
+def matches_name(domain: str, sans: List[str], subject: Optional[str]) -> bool:
+    """Whether a certificate's SANs (or subject) cover a domain, wildcards included."""
+    domain = domain.lower()
+    for name in sans or ([subject] if subject else []):
+        name = name.lower()
+        if name == domain or (name.startswith("*.") and domain.partition(".")[2] == name[2:]):
+            return True
+    return False
+
+
+async def fetch_served_certificate(host: str, port: int, server_name: str) -> str:
+    """
+    Certificate served for `server_name`, as PEM, via a TLS handshake.
+
+    The certificate is not verified, so expired and self-signed certificates
+    are reported instead of failing the handshake.
+    """
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    _, writer = await asyncio.wait_for(
+        asyncio.open_connection(host, port, ssl=context, server_hostname=server_name),
+        settings.TLS_WATCH_TIMEOUT,
+    )
+    try:
+        der = writer.get_extra_info("ssl_object").getpeercert(binary_form=True)
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (OSError, ssl.SSLError):
+            # The peer may drop the connection without a TLS close_notify
+            pass
+    return ssl.DER_cert_to_PEM_cert(der)
+
+
+class CertificateWatcher:
+    """Certificate metadata of the server and its domains."""
+
+    def __init__(self):
+        # Name ("server" or a domain) -> metadata, or an error
+        self.certificates: Dict[str, Dict[str, Any]] = {}
+        # Parsed metadata by fingerprint, so unchanged certificates are not parsed again
+        self.parsed: Dict[str, Dict[str, Any]] = {}
+        self.last_check: Optional[float] = None
+        self.lock = asyncio.Lock()
+
+    def parse(self, pem: str) -> Dict[str, Any]:
+        """Parse a certificate, reusing the result for a known fingerprint."""
+        fingerprint = hashlib.sha256(ssl.PEM_cert_to_DER_cert(pem)).hexdigest()
+        if fingerprint not in self.parsed:
+            self.parsed[fingerprint] = parse_certificate(pem)
+        return self.parsed[fingerprint]
+
+    async def server_certificate(self) -> Dict[str, Any]:
+        """Metadata of the server certificate from the server-tls endpoint."""
+        pems = find_pems(await call_da_api("/api/server-tls/certificate", method="GET"))
+        if not pems:
+            raise ValueError("No certificate in /api/server-tls/certificate response")
+        return dict(self.parse(pems[0]), source="server-tls")
+
+    async def domain_certificate(self, host: str, port: int, domain: str) -> Dict[str, Any]:
+        """Metadata of the certificate served for a domain."""
+        meta = dict(self.parse(await fetch_served_certificate(host, port, domain)), source="handshake")
+        meta["name_mismatch"] = not matches_name(domain, meta["sans"], meta["subject"])
+        return meta
+
+    async def check(self):
+        """Collect the certificates of the server and all domains."""
+        async with self.lock:
+            if search_index.built_at is None:
+                await search_index.refresh()
+            owners = search_index.owners("domain")
+            host = settings.TLS_WATCH_HOST or urlparse(settings.DA_URL).hostname
+            names = [SERVER] + sorted(owners)
+
+            results = await gather_limited(
+                [self.server_certificate()] + [
+                    self.domain_certificate(host, settings.TLS_WATCH_PORT, domain) for domain in names[1:]
+                ],
+                settings.BATCH_CONCURRENCY,
+            )
+
+            now = time.time()
+            certificates = {}
+            for name, result in zip(names, results):
+                if isinstance(result, Exception):
+                    result = {"error": str(result) or type(result).__name__}
+                certificates[name] = dict(result, name=name, owner=owners.get(name), checked_at=now)
+            self.certificates = certificates
+            live = {meta.get("fingerprint") for meta in certificates.values()}
+            self.parsed = {fingerprint: meta for fingerprint, meta in self.parsed.items() if fingerprint in live}
+            self.last_check = now
+            logger.info(f"TLS certificates checked: {len(names)} names, {len(self.parsed)} distinct certificates")
+
+
+watcher = CertificateWatcher()
+
+
+@background_task
+async def watch_tls_certificates():
+    """Background loop feeding the certificate watcher."""
+    await run_periodically("TLS certificate watcher", settings.TLS_WATCH_INTERVAL, watcher.check)
+
+
+@mcp.tool()
+@log_tool_call
+@server_account_only
+async def tls_expiring(days: float = 30, include_errors: bool = False, refresh: bool = False):
+    """
+    List TLS certificates of the server and its domains expiring within `days`.
+
+    Certificates are collected by a background watcher (the server certificate
+    from server-tls, domain certificates by a TLS handshake with the domain as
+    SNI name) and parsed locally. Expired certificates are included, and
+    domains served a certificate that does not cover them are flagged.
+
+    Args:
+        days: Report certificates expiring within this many days
+        include_errors: Also list names whose certificate could not be fetched
+        refresh: Check all certificates now instead of using the cached results
+
+    Returns:
+        Expiring certificates, soonest first, with issuer, SANs and days left
+    """
+    if refresh or watcher.last_check is None:
+        await watcher.check()
+
+    now = time.time()
+    expiring = []
+    errors = []
+    for meta in watcher.certificates.values():
+        if "error" in meta:
+            errors.append({"name": meta["name"], "owner": meta["owner"], "error": meta["error"]})
+            continue
+        days_left = (meta["not_after"] - now) / 86400
+        if days_left <= days:
+            expiring.append(dict(
+                {key: value for key, value in meta.items() if key not in ("not_before", "not_after", "checked_at")},
+                expires=datetime.fromtimestamp(meta["not_after"], tz=timezone.utc).isoformat(),
+                days_left=round(days_left, 1),
+                expired=days_left < 0,
+            ))
+    expiring.sort(key=lambda meta: meta["days_left"])
+
+    result = {
+        "days": days,
+        "last_check": watcher.last_check,
+        "checked": len(watcher.certificates),
+        "expiring": len(expiring),
+        "errors": len(errors),
+        "certificates": expiring,
+    }
+    if include_errors:
+        result["failed"] = errors
+    return format_response(result)
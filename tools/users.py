@@ -3,12 +3,25 @@ MCP tools for DirectAdmin user-related operations.
 """
 
 import logging
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from config import settings
 from mcp_instance import mcp
 from da import call_da_api
+from tools.common import compact_response, gather_limited, list_usernames
 
 logger = logging.getLogger(__name__)
 
+# Keys DirectAdmin login events may use for the same information
+_IP_KEYS = ("ip", "remote_ip", "address", "host")
+_TIME_KEYS = ("timestamp", "time", "date", "created")
+_USER_KEYS = ("username", "user")
+
 @mcp.tool()
+@compact_response
 async def api_login_history():
     """
     Get login history.
@@ -19,13 +32,14 @@ async def api_login_history():
         List of login events and associated metadata.
     """
     try:
-        response = await call_da_api("/api/login-history", method="GET")
+        response = await call_da_api("/api/login-history", method="GET", raw=True)
         return response
     except Exception as e:
         logger.error(f"Error in api_login_history: {e}")
         raise
 
 @mcp.tool()
+@compact_response
 async def api_users_username_config(username):
     """
     Get user configuration.
@@ -39,13 +53,14 @@ async def api_users_username_config(username):
         Configuration information for the specified user.
     """
     try:
-        response = await call_da_api(f"/api/users/{username}/config", method="GET")
+        response = await call_da_api(f"/api/users/{username}/config", method="GET", raw=True)
         return response
     except Exception as e:
         logger.error(f"Error in api_users_username_config: {e}")
         raise
 
 @mcp.tool()
+@compact_response
 async def api_users_username_login_history(username):
     """
     Get user login history.
@@ -59,13 +74,14 @@ async def api_users_username_login_history(username):
         List of login entries for the user.
     """
     try:
-        response = await call_da_api(f"/api/users/{username}/login-history", method="GET")
+        response = await call_da_api(f"/api/users/{username}/login-history", method="GET", raw=True)
         return response
     except Exception as e:
         logger.error(f"Error in api_users_username_login_history: {e}")
         raise
 
 @mcp.tool()
+@compact_response
 async def api_users_username_usage(username):
     """
     Get user usage statistics.
@@ -79,8 +95,211 @@ async def api_users_username_usage(username):
         Usage metrics for the user.
     """
     try:
-        response = await call_da_api(f"/api/users/{username}/usage", method="GET")
+        response = await call_da_api(f"/api/users/{username}/usage", method="GET", raw=True)
         return response
     except Exception as e:
         logger.error(f"Error in api_users_username_usage: {e}")
-        raise
\ No newline at end of file
+        raise
+
+def _event_list(response: Any) -> List[Dict[str, Any]]:
+    """Extract the list of events from a login history response."""
+    if isinstance(response, list):
+        return [event for event in response if isinstance(event, dict)]
+    if isinstance(response, dict):
+        for value in response.values():
+            if isinstance(value, list):
+                return _event_list(value)
+    return []
+
+
+def _event_time(event: Dict[str, Any]) -> Optional[float]:
+    """Event time as a UNIX timestamp, if it can be determined."""
+    for key in _TIME_KEYS:
+        value = event.get(key)
+        if value in (None, ""):
+            continue
+        if isinstance(value, (int, float)):
+            return float(value)
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            return datetime.fromisoformat(str(value)).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+def _event_failed(event: Dict[str, Any]) -> bool:
+    """Whether a login event is a failed attempt."""
+    if "success" in event:
+        return str(event["success"]).lower() in ("false", "0", "no", "")
+    if "failed" in event:
+        return str(event["failed"]).lower() in ("true", "1", "yes")
+    status = str(event.get("status") or event.get("result") or "").lower()
+    return any(word in status for word in ("fail", "denied", "invalid", "block"))
+
+
+def _normalize_events(username: str, response: Any) -> List[Dict[str, Any]]:
+    """Convert a login history response into compact (user, ip, time, failed) events."""
+    events = []
+    for event in _event_list(response):
+        timestamp = _event_time(event)
+        if timestamp is None:
+            continue
+        events.append({
+            "user": next((str(event[k]) for k in _USER_KEYS if event.get(k)), username),
+            "ip": next((str(event[k]) for k in _IP_KEYS if event.get(k)), "unknown"),
+            "time": timestamp,
+            "failed": _event_failed(event),
+        })
+    return events
+
+
+def _max_in_window(times: List[float], window: float) -> tuple:
+    """Largest number of sorted timestamps within `window` seconds, with its bounds."""
+    best = (0, None, None)
+    start = 0
+    for end, timestamp in enumerate(times):
+        while timestamp - times[start] > window:
+            start += 1
+        if end - start + 1 > best[0]:
+            best = (end - start + 1, times[start], timestamp)
+    return best
+
+
+def summarize_login_events(
+    events: List[Dict[str, Any]],
+    since: float,
+    burst_window: float,
+    burst_threshold: int,
+    top: int
+) -> Dict[str, Any]:
+    """
+    Aggregate normalized login events into a security summary.
+    
+    Args:
+        events: Events from `_normalize_events`
+        since: Start of the reporting window (UNIX timestamp); older events
+            only serve as the baseline of known IPs
+        burst_window: Burst detection window in seconds
+        burst_threshold: Failed attempts within the window that count as a burst
+        top: Number of entries to return in each ranking
+        
+    Returns:
+        Aggregated summary
+    """
+    by_ip: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    by_user: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for event in sorted(events, key=lambda e: e["time"]):
+        by_ip[event["ip"]].append(event)
+        by_user[event["user"]].append(event)
+    
+    recent = [event for event in events if event["time"] >= since]
+    failed_per_ip = Counter(event["ip"] for event in recent if event["failed"])
+    
+    failed_by_ip = [
+        {
+            "ip": ip,
+            "failed": count,
+            "succeeded": sum(1 for e in by_ip[ip] if e["time"] >= since and not e["failed"]),
+            "users": len({e["user"] for e in by_ip[ip] if e["time"] >= since}),
+        }
+        for ip, count in failed_per_ip.most_common(top)
+    ]
+    
+    # IPs with a successful login in the window that the user never used before it
+    new_ips = {}
+    for user, user_events in by_user.items():
+        known = {e["ip"] for e in user_events if e["time"] < since}
+        if not known:
+            continue
+        fresh = sorted({e["ip"] for e in user_events if e["time"] >= since and not e["failed"]} - known)
+        if fresh:
+            new_ips[user] = fresh
+    
+    bursts = []
+    for kind, index in (("ip", by_ip), ("user", by_user)):
+        for key, key_events in index.items():
+            times = [e["time"] for e in key_events if e["failed"] and e["time"] >= since]
+            count, start, end = _max_in_window(times, burst_window)
+            if count >= burst_threshold:
+                bursts.append({"kind": kind, "key": key, "failed": count, "start": start, "end": end})
+    bursts.sort(key=lambda burst: burst["failed"], reverse=True)
+    
+    return {
+        "window": {"since": since, "events": len(recent)},
+        "totals": {
+            "events": len(events),
+            "failed": sum(1 for event in recent if event["failed"]),
+            "users": len({event["user"] for event in recent}),
+            "ips": len({event["ip"] for event in recent}),
+        },
+        "failed_by_ip": failed_by_ip,
+        "new_ips_by_user": dict(sorted(new_ips.items())[:top]),
+        "new_ips_users": len(new_ips),
+        "bursts": bursts[:top],
+    }
+
+
+@mcp.tool()
+@compact_response
+async def api_login_history_summary(
+    usernames: Optional[List[str]] = None,
+    since_hours: float = 24,
+    burst_window: int = 300,
+    burst_threshold: int = 10,
+    top: int = 10,
+    concurrency: Optional[int] = None
+):
+    """
+    Summarize login history across all users.
+
+    Fetches the login history of every user concurrently and returns aggregates
+    computed locally instead of the raw events: failed logins per IP, new IPs per
+    user and bursts of failed logins per IP or per user.
+
+    Args:
+        usernames: Users to include (default: all users).
+        since_hours: Size of the reporting window in hours; older events are only
+            used as the baseline of known IPs.
+        burst_window: Burst detection window in seconds.
+        burst_threshold: Failed logins within the window that count as a burst.
+        top: Number of entries to return in each ranking.
+        concurrency: Maximum number of concurrent requests (capped at BATCH_CONCURRENCY).
+
+    Returns:
+        Aggregated login summary.
+    """
+    try:
+        if not usernames:
+            usernames = await list_usernames()
+        
+        responses = await gather_limited(
+            (call_da_api(f"/api/users/{username}/login-history", method="GET") for username in usernames),
+            min(concurrency or settings.BATCH_CONCURRENCY, settings.BATCH_CONCURRENCY),
+        )
+        
+        events = []
+        errors = {}
+        for username, response in zip(usernames, responses):
+            if isinstance(response, Exception):
+                errors[username] = str(response)
+            else:
+                events.extend(_normalize_events(username, response))
+        
+        summary = summarize_login_events(
+            events,
+            since=time.time() - since_hours * 3600,
+            burst_window=burst_window,
+            burst_threshold=burst_threshold,
+            top=top,
+        )
+        summary["users_fetched"] = len(usernames) - len(errors)
+        if errors:
+            summary["errors"] = errors
+        return summary
+    except Exception as e:
+        logger.error(f"Error in api_login_history_summary: {e}")
+        raise
@@ -20,7 +20,7 @@ async def api_get_version():
     Returns:
         Version information for DirectAdmin
     """
-    response = await call_da_api("/api/version", method="GET")
+    response = await call_da_api("/api/version", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -38,7 +38,7 @@ async def api_change_update_channel(channel):
     Returns:
         Result of the channel change operation
     """
-    response = await call_da_api("/api/version", method="PATCH", data={"channel": channel})
+    response = await call_da_api("/api/version", method="PATCH", data={"channel": channel}, raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -54,5 +54,5 @@ async def api_version_update():
     Returns:
         Result of the update operation
     """
-    response = await call_da_api("/api/version/update", method="POST")
+    response = await call_da_api("/api/version/update", method="POST", raw=True)
     return format_response(response)
\ No newline at end of file
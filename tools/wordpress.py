@@ -22,7 +22,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/wordpress/install", method="POST", data=payload)
+    response = await call_da_api(f"/api/wordpress/install", method="POST", data=payload, raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -37,7 +37,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/wordpress/install-quick", method="POST", data=payload)
+    response = await call_da_api(f"/api/wordpress/install-quick", method="POST", data=payload, raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -52,7 +52,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/wordpress/locations", method="GET")
+    response = await call_da_api(f"/api/wordpress/locations", method="GET", data={"domain": domain} if domain else None, raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -67,7 +67,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/wordpress/locations/{location_id}", method="DELETE")
+    response = await call_da_api(f"/api/wordpress/locations/{location_id}", method="DELETE", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -82,7 +82,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/wordpress/locations/{location_id}/config", method="GET")
+    response = await call_da_api(f"/api/wordpress/locations/{location_id}/config", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -98,7 +98,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/wordpress/locations/{location_id}/config", method="PUT", data=payload)
+    response = await call_da_api(f"/api/wordpress/locations/{location_id}/config", method="PUT", data=payload, raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -114,7 +114,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/wordpress/locations/{location_id}/config/auto-update", method="PUT", data=payload)
+    response = await call_da_api(f"/api/wordpress/locations/{location_id}/config/auto-update", method="PUT", data=payload, raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -129,7 +129,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/wordpress/locations/{location_id}/options", method="GET")
+    response = await call_da_api(f"/api/wordpress/locations/{location_id}/options", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -145,7 +145,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/wordpress/locations/{location_id}/options", method="PATCH", data=payload)
+    response = await call_da_api(f"/api/wordpress/locations/{location_id}/options", method="PATCH", data=payload, raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -160,7 +160,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/wordpress/locations/{location_id}/users", method="GET")
+    response = await call_da_api(f"/api/wordpress/locations/{location_id}/users", method="GET", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -177,7 +177,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/wordpress/locations/{location_id}/users/{user_id}/change-password", method="POST", data=payload)
+    response = await call_da_api(f"/api/wordpress/locations/{location_id}/users/{user_id}/change-password", method="POST", data=payload, raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -193,7 +193,7 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/wordpress/locations/{location_id}/users/{user_id}/sso-login", method="POST")
+    response = await call_da_api(f"/api/wordpress/locations/{location_id}/users/{user_id}/sso-login", method="POST", raw=True)
     return format_response(response)
 
 @mcp.tool()
@@ -208,5 +208,5 @@ Args:
 Returns:
     dict: API response from DirectAdmin.
 """
-    response = await call_da_api(f"/api/wordpress/locations/{location_id}/wordpress", method="GET")
+    response = await call_da_api(f"/api/wordpress/locations/{location_id}/wordpress", method="GET", raw=True)
     return format_response(response)
\ No newline at end of file
@@ -0,0 +1,447 @@
+"""
+MCP tools for the WordPress fleet inventory.
+
+WordPress locations of every domain are scanned with bounded parallelism and
+their core version and auto-update state are kept in a small SQLite database
+in the data directory. The inventory is refreshed incrementally in the
+background, so fleet-wide questions ("which sites are outdated?") are answered
+locally instead of by one round of API calls per domain.
+"""
+
+import asyncio
+import logging
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import settings
+from mcp_instance import mcp
+from da import get_client
+from tools.backend_search import index as search_index
+from tools.common import (
+    background_task,
+    data_path,
+    format_response,
+    gather_limited,
+    log_tool_call,
+    run_periodically,
+    server_account_only,
+)
+
+logger = logging.getLogger(__name__)
+
+_ID_KEYS = ("id", "locationId", "location_id")
+_VERSION_KEYS = ("version", "coreVersion", "core_version")
+_UPDATE_KEYS = ("updateAvailable", "update_available", "availableUpdate", "newVersion", "latestVersion")
+
+
+def parse_version(value: Any) -> Tuple[int, ...]:
+    """Parse a version such as "6.4.3" into a comparable tuple."""
+    return tuple(int(part) for part in re.findall(r"\d+", str(value or "")))
+
+
+def _as_bool(value: Any) -> Optional[bool]:
+    """Interpret a DirectAdmin flag ("yes", "on", 1, true) as a boolean."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+    return str(value).strip().lower() in ("1", "yes", "on", "true", "enabled", "minor", "major")
+
+
+def _unwrap(response: Any) -> Any:
+    """Strip a `{"data": ...}` envelope."""
+    if isinstance(response, dict) and "data" in response and len(response) <= 2:
+        return response["data"]
+    return response
+
+
+def parse_locations(response: Any) -> List[Dict[str, Any]]:
+    """
+    Extract WordPress installations from a `/api/wordpress/locations` response.
+
+    Potential installation locations without WordPress are skipped.
+
+    Args:
+        response: Locations response
+
+    Returns:
+        One entry per installation with `id`, `domain`, `path` and the
+        inline `wordpress` details when the response has them
+    """
+    response = _unwrap(response)
+    if isinstance(response, dict):
+        response = next((v for v in response.values() if isinstance(v, list)), [])
+
+    installs = []
+    for item in response if isinstance(response, list) else []:
+        if not isinstance(item, dict):
+            continue
+        location_id = next((str(item[k]) for k in _ID_KEYS if item.get(k)), None)
+        wordpress = item.get("wordpress")
+        installed = bool(wordpress) or bool(item.get("installed")) or any(item.get(k) for k in _VERSION_KEYS)
+        if location_id and installed:
+            installs.append({
+                "id": location_id,
+                "domain": item.get("domain"),
+                "path": item.get("path") or item.get("webPath") or item.get("fullPath"),
+                "wordpress": wordpress if isinstance(wordpress, dict) else item,
+            })
+    return installs
+
+
+def parse_wordpress(info: Any) -> Dict[str, Any]:
+    """
+    Extract the core version and pending update from WordPress details.
+
+    Args:
+        info: `/api/wordpress/locations/{id}/wordpress` response
+
+    Returns:
+        `version` and `update` (the newer version offered, True when only a
+        flag is reported, None when unknown)
+    """
+    info = _unwrap(info)
+    if not isinstance(info, dict):
+        return {"version": None, "update": None}
+    version = next((str(info[k]) for k in _VERSION_KEYS if info.get(k)), None)
+    update = next((info[k] for k in _UPDATE_KEYS if k in info), None)
+    if isinstance(update, dict):
+        update = next((update[k] for k in _VERSION_KEYS if update.get(k)), True)
+    if isinstance(update, str) and not parse_version(update):
+        update = _as_bool(update)
+    return {"version": version, "update": update}
+
+
+def parse_auto_update(config: Any) -> Optional[bool]:
+    """
+    Extract the core auto-update state from a location's configuration.
+
+    Args:
+        config: `/api/wordpress/locations/{id}/config` response
+
+    Returns:
+        True/False, or None when the configuration does not report it
+    """
+    config = _unwrap(config)
+    if not isinstance(config, dict):
+        return None
+    for key, value in config.items():
+        normalized = key.lower().replace("_", "").replace("-", "")
+        if "autoupdate" in normalized:
+            if isinstance(value, dict):
+                return any(_as_bool(v) for v in value.values())
+            return _as_bool(value)
+    return None
+
+
+class WordPressInventory:
+    """WordPress installations of all domains, stored in SQLite."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.last_refresh: Optional[float] = None
+        self.lock = asyncio.Lock()
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS wp_domains ("
+                "domain TEXT PRIMARY KEY, owner TEXT, scanned_at REAL NOT NULL, error TEXT)"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS wp_installs ("
+                "location_id TEXT PRIMARY KEY, domain TEXT NOT NULL, owner TEXT, path TEXT, "
+                "version TEXT, update_available INTEGER, update_version TEXT, auto_update INTEGER, "
+                "scanned_at REAL NOT NULL, error TEXT)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS wp_installs_domain ON wp_installs (domain)")
+            db.execute("CREATE INDEX IF NOT EXISTS wp_installs_owner ON wp_installs (owner)")
+            row = db.execute("SELECT MAX(scanned_at) FROM wp_domains").fetchone()
+            self.last_refresh = row[0]
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # sqlite3's own context manager only commits; the connection is closed here
+        connection = sqlite3.connect(self.path)
+        connection.row_factory = sqlite3.Row
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def scanned(self) -> Dict[str, float]:
+        """Scanned domains and when they were last scanned."""
+        with self._connect() as db:
+            return {row["domain"]: row["scanned_at"] for row in db.execute("SELECT domain, scanned_at FROM wp_domains")}
+
+    def set_auto_update(self, location_ids: List[str], enabled: bool):
+        """Record a change of the auto-update state made through the API."""
+        with self._connect() as db:
+            db.executemany(
+                "UPDATE wp_installs SET auto_update = ? WHERE location_id = ?",
+                [(int(enabled), location_id) for location_id in location_ids],
+            )
+
+    def installs(self) -> List[Dict[str, Any]]:
+        """All stored installations."""
+        with self._connect() as db:
+            rows = db.execute("SELECT * FROM wp_installs ORDER BY owner, domain, path")
+            return [dict(row) for row in rows]
+
+    async def scan(self, domains: Dict[str, Optional[str]]) -> Dict[str, Any]:
+        """
+        Scan the WordPress locations of some domains and store the results.
+
+        Locations are listed per domain, then the WordPress details and
+        configuration of every installation are fetched, both stages with at
+        most `BATCH_CONCURRENCY` requests in flight. Requests are made logged
+        in as the domain owner, whose WordPress installations they are.
+
+        Args:
+            domains: Domain -> owner
+
+        Returns:
+            Number of domains scanned, installations found and errors
+        """
+        names = list(domains)
+        responses = await gather_limited(
+            (
+                get_client(domains[domain]).call_api("/api/wordpress/locations", method="GET", data={"domain": domain})
+                for domain in names
+            ),
+            settings.BATCH_CONCURRENCY,
+        )
+
+        found: List[Dict[str, Any]] = []
+        domain_errors: Dict[str, Optional[str]] = {}
+        for domain, response in zip(names, responses):
+            if isinstance(response, Exception):
+                domain_errors[domain] = str(response)
+                continue
+            domain_errors[domain] = None
+            for install in parse_locations(response):
+                install["domain"] = install["domain"] or domain
+                install["owner"] = domains[domain]
+                found.append(install)
+
+        # Two requests per installation, flattened so the limit applies to both
+        details = await gather_limited(
+            (
+                get_client(install["owner"]).call_api(f"/api/wordpress/locations/{install['id']}/{part}", method="GET")
+                for install in found
+                for part in ("wordpress", "config")
+            ),
+            settings.BATCH_CONCURRENCY,
+        )
+
+        now = time.time()
+        rows = []
+        for position, install in enumerate(found):
+            info, config = details[2 * position], details[2 * position + 1]
+            errors = [str(result) for result in (info, config) if isinstance(result, Exception)]
+            wordpress = parse_wordpress(install["wordpress"] if isinstance(info, Exception) else info)
+            auto_update = None if isinstance(config, Exception) else parse_auto_update(config)
+            rows.append((
+                install["id"],
+                install["domain"],
+                install["owner"],
+                install["path"],
+                wordpress["version"],
+                None if wordpress["update"] is None else int(bool(wordpress["update"])),
+                wordpress["update"] if isinstance(wordpress["update"], str) else None,
+                None if auto_update is None else int(auto_update),
+                now,
+                "; ".join(errors) or None,
+            ))
+
+        with self._connect() as db:
+            scanned = [domain for domain, error in domain_errors.items() if error is None]
+            db.executemany("DELETE FROM wp_installs WHERE domain = ?", [(domain,) for domain in scanned])
+            db.executemany(
+                "INSERT OR REPLACE INTO wp_installs "
+                "(location_id, domain, owner, path, version, update_available, update_version, auto_update, scanned_at, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            db.executemany(
+                "INSERT OR REPLACE INTO wp_domains (domain, owner, scanned_at, error) VALUES (?, ?, ?, ?)",
+                [(domain, domains[domain], now, error) for domain, error in domain_errors.items()],
+            )
+        self.last_refresh = now
+
+        return {
+            "domains": len(names),
+            "installs": len(rows),
+            "errors": sum(1 for error in domain_errors.values() if error) + sum(1 for row in rows if row[-1]),
+        }
+
+    def forget(self, domains: List[str]):
+        """Drop domains (and their installations) that no longer exist."""
+        with self._connect() as db:
+            db.executemany("DELETE FROM wp_installs WHERE domain = ?", [(domain,) for domain in domains])
+            db.executemany("DELETE FROM wp_domains WHERE domain = ?", [(domain,) for domain in domains])
+
+    async def refresh(self) -> Dict[str, Any]:
+        """
+        Bring the inventory up to date.
+
+        Domains come from the search index. New domains are scanned, removed
+        domains are dropped and a batch of the least recently scanned domains
+        is rescanned, so the whole fleet is never scanned at once after the
+        first pass.
+
+        Returns:
+            Scan statistics
+        """
+        async with self.lock:
+            if search_index.built_at is None:
+                await search_index.refresh()
+            domains = search_index.owners("domain")
+            scanned = self.scanned()
+
+            removed = [domain for domain in scanned if domain not in domains]
+            if removed:
+                self.forget(removed)
+
+            new = [domain for domain in domains if domain not in scanned]
+            stale = sorted((domain for domain in domains if domain in scanned), key=scanned.get)
+            to_scan = new + stale[:settings.WP_INVENTORY_REFRESH_BATCH]
+
+            stats = await self.scan({domain: domains[domain] for domain in to_scan})
+            stats["removed"] = len(removed)
+            logger.info(
+                f"WordPress inventory refreshed: {stats['domains']} domains scanned, "
+                f"{stats['installs']} installations, {stats['errors']} errors"
+            )
+            return stats
+
+
+inventory = WordPressInventory(data_path("wp_inventory.sqlite3"))
+
+
+def reference_version(installs: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Core version installations are compared against.
+
+    `WP_LATEST_VERSION` when set, otherwise the newest version offered as an
+    update or installed anywhere in the fleet.
+    """
+    if settings.WP_LATEST_VERSION:
+        return settings.WP_LATEST_VERSION
+    versions = [v for i in installs for v in (i["version"], i["update_version"]) if parse_version(v)]
+    return max(versions, key=parse_version, default=None)
+
+
+def annotate_installs(installs: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Add the `outdated` flag to stored installations and decode their flags.
+
+    Args:
+        installs: Installations as returned by `WordPressInventory.installs()`
+
+    Returns:
+        The reference version they were compared against
+    """
+    latest = reference_version(installs)
+    for install in installs:
+        install["outdated"] = bool(install["update_available"]) or (
+            bool(latest) and parse_version(install["version"]) < parse_version(latest)
+        )
+        for flag in ("update_available", "auto_update"):
+            install[flag] = None if install[flag] is None else bool(install[flag])
+    return latest
+
+
+def select_installs(
+    installs: List[Dict[str, Any]],
+    outdated: bool = False,
+    auto_update_disabled: bool = False,
+    owner: Optional[str] = None,
+    domains: Optional[List[str]] = None,
+    location_ids: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Filter annotated installations; every given criterion must match.
+
+    Args:
+        installs: Installations annotated by `annotate_installs()`
+        outdated: Only installations with an outdated core
+        auto_update_disabled: Only installations with core auto-updates turned off
+        owner: Only installations of this user
+        domains: Only installations on these domains
+        location_ids: Only these locations
+
+    Returns:
+        Matching installations
+    """
+    return [
+        install for install in installs
+        if (not outdated or install["outdated"])
+        and (not auto_update_disabled or install["auto_update"] is False)
+        and (owner is None or install["owner"] == owner)
+        and (domains is None or install["domain"] in domains)
+        and (location_ids is None or install["location_id"] in location_ids)
+    ]
+
+
+@background_task
+async def refresh_wordpress_inventory():
+    """Background loop keeping the WordPress inventory up to date."""
+    await run_periodically("WordPress inventory refresh", settings.WP_INVENTORY_REFRESH_INTERVAL, inventory.refresh)
+
+
+@mcp.tool()
+@log_tool_call
+@server_account_only
+async def wordpress_inventory(
+    outdated: bool = False,
+    auto_update_disabled: bool = False,
+    owner: Optional[str] = None,
+    refresh: bool = False
+):
+    """
+    Query the WordPress installations of all users from the local inventory.
+
+    The inventory is scanned on first use and refreshed incrementally in the
+    background. An installation is outdated when DirectAdmin offers a core
+    update for it or its version is older than the reference version.
+
+    Args:
+        outdated: Only installations with an outdated core
+        auto_update_disabled: Only installations with core auto-updates turned off
+        owner: Only installations of this user
+        refresh: Refresh the inventory before answering
+
+    Returns:
+        Matching installations and per-owner counts
+    """
+    stats = None
+    if refresh or inventory.last_refresh is None:
+        stats = await inventory.refresh()
+
+    installs = inventory.installs()
+    latest = annotate_installs(installs)
+    matched = select_installs(installs, outdated=outdated, auto_update_disabled=auto_update_disabled, owner=owner)
+
+    by_owner: Dict[str, Dict[str, int]] = {}
+    for install in matched:
+        counts = by_owner.setdefault(install["owner"] or "", {"installs": 0, "outdated": 0, "auto_update_disabled": 0})
+        counts["installs"] += 1
+        counts["outdated"] += install["outdated"]
+        counts["auto_update_disabled"] += install["auto_update"] is False
+
+    result = {
+        "reference_version": latest,
+        "last_refresh": inventory.last_refresh,
+        "total": len(installs),
+        "matched": len(matched),
+        "by_owner": by_owner,
+        "installs": matched,
+    }
+    if stats is not None:
+        result["refresh"] = stats
+    return format_response(result)
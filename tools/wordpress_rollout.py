@@ -0,0 +1,220 @@
+"""
+MCP tools for rolling out WordPress configuration changes across the fleet.
+
+A rollout applies one auto-update or options change to every installation
+matched by a selector over the WordPress inventory. A few canaries go first,
+the rest follow with bounded concurrency, and the rollout stops starting new
+changes once the error rate gets too high.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config import settings
+from mcp_instance import mcp
+from da import get_client
+from tools.common import log_tool_call, format_response, server_account_only
+from tools.wordpress_inventory import annotate_installs, inventory, parse_auto_update, select_installs
+
+logger = logging.getLogger(__name__)
+
+# Action -> (HTTP method, location sub-path)
+ACTIONS = {
+    "auto_update": ("PUT", "config/auto-update"),
+    "options": ("PATCH", "options"),
+}
+
+# Changes completed before the error rate can halt a rollout
+MIN_SAMPLE = 5
+
+
+def pick_canaries(targets: List[Dict[str, Any]], count: int) -> List[Dict[str, Any]]:
+    """
+    Choose canaries spread over as many owners as possible.
+
+    Args:
+        targets: Selected installations
+        count: Number of canaries
+
+    Returns:
+        Canary installations, at most one per owner until every owner has one
+    """
+    canaries: List[Dict[str, Any]] = []
+    owners = set()
+    for target in targets:
+        if len(canaries) >= count:
+            break
+        if target["owner"] not in owners:
+            owners.add(target["owner"])
+            canaries.append(target)
+    for target in targets:
+        if len(canaries) >= count:
+            break
+        if target not in canaries:
+            canaries.append(target)
+    return canaries
+
+
+async def run_rollout(
+    targets: List[Dict[str, Any]],
+    apply: Callable[[Dict[str, Any]], Awaitable[Any]],
+    concurrency: int,
+    max_error_rate: float,
+) -> Dict[str, Any]:
+    """
+    Apply a change to targets concurrently, halting on a high error rate.
+
+    Once `MIN_SAMPLE` changes completed, no new change is started when the
+    share of failures exceeds `max_error_rate`; changes in flight still finish.
+
+    Args:
+        targets: Installations to change, in order
+        apply: Coroutine function applying the change to one installation
+        concurrency: Maximum number of changes in flight
+        max_error_rate: Highest tolerated share of failed changes (0-1)
+
+    Returns:
+        Applied and failed location IDs, failures and whether the rollout halted
+    """
+    pending = iter(targets)
+    applied: List[str] = []
+    failures: List[Dict[str, Any]] = []
+    halted: Optional[str] = None
+
+    async def worker():
+        nonlocal halted
+        for target in pending:
+            if halted:
+                return
+            try:
+                await apply(target)
+                applied.append(target["location_id"])
+            except Exception as e:
+                failures.append({"location_id": target["location_id"], "domain": target["domain"], "error": str(e)})
+            done = len(applied) + len(failures)
+            if not halted and done >= min(MIN_SAMPLE, len(targets)) and len(failures) / done > max_error_rate:
+                halted = f"error rate {len(failures)}/{done} exceeds {max_error_rate:.0%}"
+
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(targets))))))
+    return {"applied": applied, "failures": failures, "halted": halted}
+
+
+@mcp.tool()
+@log_tool_call
+@server_account_only
+async def wordpress_rollout(
+    action: str,
+    payload: Dict[str, Any],
+    outdated: bool = False,
+    auto_update_disabled: bool = False,
+    owner: Optional[str] = None,
+    domains: Optional[List[str]] = None,
+    location_ids: Optional[List[str]] = None,
+    canaries: int = 1,
+    concurrency: Optional[int] = None,
+    max_error_rate: float = 0.1,
+    dry_run: bool = True
+):
+    """
+    Apply an auto-update or options change to many WordPress installations.
+
+    Installations are selected from the WordPress inventory (see
+    `wordpress_inventory`); every given criterion must match. Canaries, spread
+    over different owners, are changed first and any canary failure stops the
+    rollout. The remaining installations are changed concurrently, and no new
+    change is started once the failure rate exceeds `max_error_rate`.
+
+    Args:
+        action: "auto_update" (same payload as api_wp_cfg_autoupdate) or
+            "options" (same payload as the options PATCH)
+        payload: Change to apply to every selected installation
+        outdated: Only installations with an outdated core
+        auto_update_disabled: Only installations with core auto-updates turned off
+        owner: Only installations of this user
+        domains: Only installations on these domains
+        location_ids: Only these locations
+        canaries: Number of installations changed before the rest
+        concurrency: Maximum number of changes in flight (default: BATCH_CONCURRENCY)
+        max_error_rate: Highest tolerated share of failed changes (0-1)
+        dry_run: Only report what would be changed (default)
+
+    Returns:
+        Report with applied, failed and skipped installations
+    """
+    if action not in ACTIONS:
+        return {"error": True, "message": f"Unknown action: {action}", "actions": list(ACTIONS)}
+    if not payload:
+        return {"error": True, "message": "Empty payload"}
+
+    if inventory.last_refresh is None:
+        await inventory.refresh()
+    installs = inventory.installs()
+    annotate_installs(installs)
+    targets = select_installs(
+        installs,
+        outdated=outdated,
+        auto_update_disabled=auto_update_disabled,
+        owner=owner,
+        domains=domains,
+        location_ids=location_ids,
+    )
+
+    canary_targets = pick_canaries(targets, max(0, canaries))
+    rest = [target for target in targets if target not in canary_targets]
+    report: Dict[str, Any] = {
+        "action": action,
+        "dry_run": dry_run,
+        "selected": len(targets),
+        "canaries": [target["location_id"] for target in canary_targets],
+    }
+
+    if dry_run:
+        report["targets"] = [
+            {key: target[key] for key in ("location_id", "domain", "path", "owner", "version", "auto_update")}
+            for target in canary_targets + rest
+        ]
+        return format_response(report)
+
+    method, sub_path = ACTIONS[action]
+
+    async def apply(target: Dict[str, Any]):
+        # As the owner, so installations of different users are changed concurrently
+        await get_client(target["owner"]).call_api(
+            f"/api/wordpress/locations/{target['location_id']}/{sub_path}", method=method, data=payload
+        )
+
+    started = time.perf_counter()
+    concurrency = concurrency or settings.BATCH_CONCURRENCY
+
+    canary_result = await run_rollout(canary_targets, apply, concurrency, max_error_rate=0.0)
+    if canary_result["failures"]:
+        result = canary_result
+        result["halted"] = "canary failed"
+    else:
+        result = await run_rollout(rest, apply, concurrency, max_error_rate)
+        result["applied"] = canary_result["applied"] + result["applied"]
+
+    if action == "auto_update":
+        enabled = parse_auto_update(payload)
+        if enabled is None and len(payload) == 1:
+            # e.g. {"enabled": true} or {"mode": "minor"}
+            enabled = parse_auto_update({"autoUpdate": next(iter(payload.values()))})
+        if enabled is not None:
+            inventory.set_auto_update(result["applied"], enabled)
+
+    done = len(result["applied"]) + len(result["failures"])
+    logger.info(
+        f"WordPress rollout {action}: {len(result['applied'])} applied, {len(result['failures'])} failed, "
+        f"{len(targets) - done} skipped" + (f", halted: {result['halted']}" if result["halted"] else "")
+    )
+    report.update({
+        "applied": len(result["applied"]),
+        "failed": len(result["failures"]),
+        "skipped": len(targets) - done,
+        "halted": result["halted"],
+        "failures": result["failures"],
+        "elapsed_s": round(time.perf_counter() - started, 3),
+    })
+    return format_response(report)
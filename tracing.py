@@ -0,0 +1,391 @@
+"""
+Lightweight tracing with OpenTelemetry-compatible export.
+
+Spans are recorded for SSE messages, tool executions and DirectAdmin API
+requests and exported in the OTLP/JSON format, either appended to a local
+file or posted to an OTLP/HTTP collector. Tracing is off by default; while
+off, spans are shared no-op objects and nothing is recorded.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+
+# Spans kept between exports; further spans are dropped
+MAX_BUFFERED = 4096
+# SSE message spans kept for parenting the tool spans they trigger
+MAX_PENDING_MESSAGES = 1024
+
+# Span of the running operation; NOOP_SPAN inside a trace that is not sampled
+current_span: ContextVar[Optional[Any]] = ContextVar("current_span", default=None)
+
+# Holder of the SSE session ID of the current MCP connection, filled in by main.handle_sse
+sse_session: ContextVar[Optional[Dict[str, str]]] = ContextVar("sse_session", default=None)
+
+_SESSION_ID = re.compile(rb"session_id=([0-9a-fA-F]+)")
+
+
+class Span:
+    """A timed operation with attributes and events."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "events", "error")
+
+    recording = True
+
+    def __init__(self, name: str, kind: int, parent: Optional["Span"], attributes: Optional[Dict[str, Any]]):
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Tuple[str, int, Dict[str, Any]]] = []
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None, timestamp_ns: Optional[int] = None):
+        self.events.append((name, timestamp_ns or time.time_ns(), attributes or {}))
+
+    def set_error(self, message: str):
+        self.error = message
+
+    def record_exception(self, exc: BaseException):
+        self.error = str(exc) or type(exc).__name__
+        self.add_event("exception", {"exception.type": type(exc).__name__, "exception.message": str(exc)})
+
+
+class _NoopSpan:
+    """Span used while tracing is off or a trace is not sampled."""
+
+    recording = False
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None, timestamp_ns: Optional[int] = None):
+        pass
+
+    def set_error(self, message: str):
+        pass
+
+    def record_exception(self, exc: BaseException):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _value(value: Any) -> Dict[str, Any]:
+    """OTLP AnyValue of an attribute value."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _value(value)} for key, value in attributes.items() if value is not None]
+
+
+def otlp_payload(spans: List[Span]) -> Dict[str, Any]:
+    """
+    OTLP/JSON ExportTraceServiceRequest for finished spans.
+
+    Args:
+        spans: Finished spans
+
+    Returns:
+        Request body as accepted by an OTLP/HTTP collector at /v1/traces
+    """
+    encoded = []
+    for span in spans:
+        item: Dict[str, Any] = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": span.kind,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": _attributes(span.attributes),
+            "events": [
+                {"name": name, "timeUnixNano": str(timestamp), "attributes": _attributes(attributes)}
+                for name, timestamp, attributes in span.events
+            ],
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 0},
+        }
+        if span.parent_id:
+            item["parentSpanId"] = span.parent_id
+        encoded.append(item)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _attributes({"service.name": settings.TRACING_SERVICE_NAME or settings.MCP_NAME})},
+            "scopeSpans": [{"scope": {"name": "directadmin-mcp"}, "spans": encoded}],
+        }]
+    }
+
+
+class FileExporter:
+    """Appends one OTLP/JSON request per flush to a JSONL file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _write(self, line: str):
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+
+    async def export(self, payload: Dict[str, Any]):
+        await asyncio.to_thread(self._write, json.dumps(payload, separators=(",", ":")))
+
+    async def aclose(self):
+        pass
+
+
+class OtlpExporter:
+    """Posts OTLP/JSON requests to an OTLP/HTTP collector."""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.client = httpx.AsyncClient(timeout=10)
+
+    async def export(self, payload: Dict[str, Any]):
+        response = await self.client.post(
+            self.endpoint,
+            content=json.dumps(payload, separators=(",", ":")),
+            headers={"Content-Type": "application/json"},
+        )
+        response.raise_for_status()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class Tracer:
+    """Creates spans and exports them in batches."""
+
+    def __init__(self):
+        self.exporter: Any = None
+        self.sample_rate = 1.0
+        self.buffer: List[Span] = []
+        self.dropped = 0
+        # (SSE session ID, JSON-RPC request ID) -> message span
+        self.messages: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def configure(self):
+        """Set up the exporter chosen in the settings."""
+        exporter = settings.TRACING_EXPORTER.lower()
+        if exporter == "file":
+            self.exporter = FileExporter(settings.TRACING_FILE or os.path.join(settings.DATA_DIR, "traces.jsonl"))
+        elif exporter == "otlp":
+            self.exporter = OtlpExporter(settings.TRACING_OTLP_ENDPOINT)
+        elif exporter not in ("", "none"):
+            logger.warning(f"Unknown TRACING_EXPORTER: {settings.TRACING_EXPORTER}, tracing disabled")
+        self.sample_rate = settings.TRACING_SAMPLE_RATE
+
+    def start_span(
+        self,
+        name: str,
+        kind: int = INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+        parent: Optional[Any] = None
+    ) -> Tuple[Any, Optional[Token]]:
+        """
+        Start a span and make it current.
+
+        New traces are sampled at `TRACING_SAMPLE_RATE`; child spans follow
+        their parent. A trace that is not sampled makes NOOP_SPAN current, so
+        nothing below it is recorded either.
+
+        Args:
+            name: Span name
+            kind: INTERNAL, SERVER or CLIENT
+            attributes: Initial attributes
+            parent: Parent span (default: the current span)
+
+        Returns:
+            The span (NOOP_SPAN when not recording) and the token for `end_span`
+        """
+        if self.exporter is None:
+            return NOOP_SPAN, None
+        parent = parent or current_span.get()
+        sampled = random.random() < self.sample_rate if parent is None else parent.recording
+        if not sampled:
+            # Keep the decision in the context for the spans started below this one
+            return NOOP_SPAN, current_span.set(NOOP_SPAN)
+        span = Span(name, kind, parent, attributes)
+        return span, current_span.set(span)
+
+    def end_span(self, span: Any, token: Optional[Token]):
+        """End a span started with `start_span` and queue it for export."""
+        if not span.recording:
+            if token is not None:
+                current_span.reset(token)
+            return
+        span.end_ns = time.time_ns()
+        current_span.reset(token)
+        if len(self.buffer) >= MAX_BUFFERED:
+            self.dropped += 1
+            return
+        self.buffer.append(span)
+        if self._task is None and not self._stopped:
+            # Entry points without the FastAPI lifespan (server.py) start the export here
+            self.start()
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        kind: int = INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+        parent: Optional[Any] = None
+    ) -> Iterator[Any]:
+        """Span around a block; exceptions are recorded on it and re-raised."""
+        span, token = self.start_span(name, kind, attributes, parent)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            self.end_span(span, token)
+
+    def remember_message(self, session_id: str, request_id: Any, span: Any):
+        """
+        Keep an SSE message span to parent the tool call it delivers.
+
+        Spans of messages that are not sampled are kept too, so the tool call
+        is not sampled on its own.
+        """
+        if request_id is None:
+            return
+        self.messages[(session_id, str(request_id))] = span
+        while len(self.messages) > MAX_PENDING_MESSAGES:
+            self.messages.popitem(last=False)
+
+    def message_span(self) -> Optional[Any]:
+        """SSE message span of the MCP request being handled, if it was traced."""
+        holder = sse_session.get()
+        if not self.messages or not holder or "id" not in holder:
+            return None
+        try:
+            from mcp.server.lowlevel.server import request_ctx
+            request_id = request_ctx.get().request_id
+        except (ImportError, LookupError):
+            return None
+        return self.messages.pop((holder["id"], str(request_id)), None)
+
+    async def flush(self):
+        """Export the buffered spans."""
+        if not self.buffer or self.exporter is None:
+            return
+        spans, self.buffer = self.buffer, []
+        try:
+            await self.exporter.export(otlp_payload(spans))
+        except Exception as e:
+            self.dropped += len(spans)
+            logger.warning(f"Failed to export {len(spans)} spans: {str(e)}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.TRACING_FLUSH_INTERVAL)
+            await self.flush()
+
+    def start(self):
+        """Start the periodic export (call from the running event loop)."""
+        if self.exporter is not None and self._task is None:
+            self._stopped = False
+            self._task = asyncio.create_task(self._run(), name="tracing-export")
+            logger.info(f"Tracing enabled with {type(self.exporter).__name__}")
+
+    async def shutdown(self):
+        """Stop the periodic export and flush the remaining spans."""
+        self._stopped = True
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        if self.exporter is not None:
+            await self.exporter.aclose()
+
+
+def find_session_id(chunk: bytes) -> Optional[str]:
+    """SSE session ID announced in the endpoint event of an SSE response chunk."""
+    match = _SESSION_ID.search(chunk)
+    return match.group(1).decode() if match else None
+
+
+# httpx trace events delimiting the phases of a request: phase -> (start event, end event)
+_PHASES = {
+    "connect_ms": ("connection.connect_tcp.started", "connection.connect_tcp.complete"),
+    "tls_ms": ("connection.start_tls.started", "connection.start_tls.complete"),
+    "ttfb_ms": ("send_request_headers.started", "receive_response_headers.complete"),
+}
+
+
+def httpx_trace_hook(span: Any):
+    """
+    httpx `trace` extension recording connection and request phases on a span.
+
+    Returns:
+        Async callback for `extensions={"trace": ...}`
+    """
+    async def trace(event_name: str, info: Dict[str, Any]):
+        if event_name.endswith((".started", ".complete", ".failed")):
+            span.add_event(event_name)
+
+    return trace
+
+
+def record_phases(span: Any):
+    """
+    Set phase durations from the httpx events recorded on a span.
+
+    DNS resolution happens inside the TCP connect in httpcore, so it is part
+    of `connect_ms`; requests on a pooled connection have no connect phase.
+    """
+    if not span.recording:
+        return
+    times: Dict[str, int] = {}
+    for name, timestamp, _ in span.events:
+        # http11.* and http2.* events share the phase names after the protocol prefix
+        key = name.split(".", 1)[1] if name.startswith(("http11.", "http2.")) else name
+        times.setdefault(key, timestamp)
+    for attribute, (start, end) in _PHASES.items():
+        if start in times and end in times:
+            span.set_attribute(f"http.{attribute}", round((times[end] - times[start]) / 1e6, 3))
+    if "send_request_headers.started" in times:
+        span.set_attribute("http.connection_reused", "connection.connect_tcp.started" not in times)
+
+
+tracer = Tracer()
+tracer.configure()